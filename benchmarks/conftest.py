@@ -0,0 +1,79 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import glob
+import logging
+import os
+import pytest
+from pendulum import duration, today
+from pytest_benchmark.utils import get_machine_id
+
+from d3a.constants import TIME_ZONE
+from d3a.d3a_core.simulation import Simulation
+from d3a.models.config import SimulationConfig
+from d3a_interface.constants_limits import ConstSettings
+
+import scaled_houses
+
+FILE_STORAGE_PREFIX = "file://"
+
+
+def pytest_configure(config):
+    """
+    pytest-benchmark only warns if --benchmark-compare finds no stored run, therefore the
+    regression check fails here unless a baseline of this machine exists or is being saved.
+    """
+    storage = config.getoption("benchmark_storage")
+    if not config.getoption("benchmark_compare") or \
+            config.getoption("benchmark_save") or config.getoption("benchmark_autosave") or \
+            not storage.startswith(FILE_STORAGE_PREFIX):
+        return
+    baseline_dir = os.path.join(storage[len(FILE_STORAGE_PREFIX):], get_machine_id())
+    if not glob.glob(os.path.join(baseline_dir, "*.json")):
+        raise pytest.UsageError(
+            f"No benchmark baseline in {baseline_dir}, save one first with "
+            f"'tox -e benchmarks -- --benchmark-save=<release>'.")
+
+
+@pytest.fixture(autouse=True)
+def restore_settings():
+    logging.getLogger().setLevel(logging.CRITICAL)
+    market_type = ConstSettings.IAASettings.MARKET_TYPE
+    setup_file_path = ConstSettings.GeneralSettings.SETUP_FILE_PATH
+    yield
+    ConstSettings.IAASettings.MARKET_TYPE = market_type
+    ConstSettings.GeneralSettings.SETUP_FILE_PATH = setup_file_path
+
+
+@pytest.fixture
+def create_simulation():
+    """
+    Returns a factory for simulations of the setup/1000_houses.py grid with house_count houses
+    """
+    def _create_simulation(house_count, hours=4):
+        scaled_houses.HOUSE_COUNT = house_count
+        ConstSettings.GeneralSettings.SETUP_FILE_PATH = os.path.dirname(__file__)
+        config = SimulationConfig(duration(hours=hours),
+                                  duration(minutes=60),
+                                  duration(minutes=5),
+                                  market_count=1,
+                                  cloud_coverage=0,
+                                  market_maker_rate=30,
+                                  start_date=today(tz=TIME_ZONE),
+                                  external_connection_enabled=False)
+        return Simulation("scaled_houses", config, seed=0, no_export=True)
+    return _create_simulation
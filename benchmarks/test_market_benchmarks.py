@@ -0,0 +1,97 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import pytest
+from pendulum import today
+
+from d3a.constants import TIME_ZONE
+from d3a.models.area import Area
+from d3a.models.market.one_sided import OneSidedMarket
+from d3a.models.market.two_sided_pay_as_bid import TwoSidedPayAsBid
+from d3a.models.market.two_sided_pay_as_clear import TwoSidedPayAsClear
+from d3a.models.strategy.area_agents.one_sided_agent import OneSidedAgent
+from d3a_interface.constants_limits import ConstSettings
+
+TIME_SLOT = today(tz=TIME_ZONE)
+ORDER_COUNTS = [100, 1000]
+ROUNDS = 5
+
+
+def _add_offers(market, offer_count):
+    return [market.offer(price=10 + i % 20, energy=1, seller=f"Seller {i}",
+                         seller_origin=f"Seller {i}", dispatch_event=False)
+            for i in range(offer_count)]
+
+
+def _add_bids(market, bid_count):
+    return [market.bid(price=20 + i % 20, energy=1, buyer=f"Buyer {i}", seller=market.name,
+                       buyer_origin=f"Buyer {i}")
+            for i in range(bid_count)]
+
+
+@pytest.mark.parametrize("offer_count", ORDER_COUNTS)
+def test_one_sided_offer_and_accept_offer(benchmark, offer_count):
+    def offer_and_accept_offers(market):
+        for offer in _add_offers(market, offer_count):
+            market.accept_offer(offer, "Buyer", energy=0.5, buyer_origin="Buyer")
+
+    benchmark.pedantic(offer_and_accept_offers,
+                       setup=lambda: ((OneSidedMarket(time_slot=TIME_SLOT),), {}),
+                       rounds=ROUNDS)
+
+
+@pytest.mark.parametrize("order_count", ORDER_COUNTS)
+def test_two_sided_pay_as_bid_match_offers_bids(benchmark, order_count):
+    ConstSettings.IAASettings.MARKET_TYPE = 2
+
+    def create_market():
+        market = TwoSidedPayAsBid(time_slot=TIME_SLOT, name="Grid")
+        _add_offers(market, order_count)
+        _add_bids(market, order_count)
+        return (market,), {}
+
+    benchmark.pedantic(lambda market: market.match_offers_bids(), setup=create_market,
+                       rounds=ROUNDS)
+
+
+@pytest.mark.parametrize("order_count", ORDER_COUNTS)
+def test_two_sided_pay_as_clear_match_offers_bids(benchmark, order_count):
+    ConstSettings.IAASettings.MARKET_TYPE = 3
+
+    def create_market():
+        market = TwoSidedPayAsClear(time_slot=TIME_SLOT, name="Grid")
+        market.mcp_update_point = 1
+        _add_offers(market, order_count)
+        _add_bids(market, order_count)
+        return (market,), {}
+
+    benchmark.pedantic(lambda market: market.match_offers_bids(), setup=create_market,
+                       rounds=ROUNDS)
+
+
+@pytest.mark.parametrize("offer_count", ORDER_COUNTS)
+def test_iaa_engine_propagate_offer(benchmark, offer_count):
+    def create_engine():
+        lower_market = OneSidedMarket(time_slot=TIME_SLOT, name="House")
+        higher_market = OneSidedMarket(time_slot=TIME_SLOT, name="Grid")
+        iaa = OneSidedAgent(owner=Area("House"), higher_market=higher_market,
+                            lower_market=lower_market, min_offer_age=0)
+        _add_offers(lower_market, offer_count)
+        return (iaa.engines[1],), {}
+
+    benchmark.pedantic(lambda engine: engine.propagate_offer(current_tick=0),
+                       setup=create_engine, rounds=ROUNDS)
@@ -0,0 +1,84 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import os
+import pytest
+
+from d3a import constants
+from d3a.d3a_core.util import d3a_path
+from d3a.models import read_user_profile
+from d3a.models.read_user_profile import read_arbitrary_profile, InputProfileTypes
+
+PROFILES = {
+    "csv": (InputProfileTypes.POWER,
+            os.path.join(d3a_path, "resources", "Solar_Curve_W_sunny.csv")),
+    "hourly_dict": (InputProfileTypes.IDENTITY, {hour: hour * 10. for hour in range(24)}),
+}
+HOUSE_COUNTS = [10, 100]
+# GC_THRESHOLDS and GC_FREEZE_SETUP_OBJECTS of the compared garbage collection policies
+GC_POLICIES = {
+    "python_defaults": (None, False),
+    "thresholds": ((50000, 20, 100), False),
+    "thresholds_and_freeze": ((50000, 20, 100), True),
+}
+GC_HOUSE_COUNT = 999
+
+
+def _clear_profile_caches():
+    read_user_profile._profile_source_cache.clear()
+    read_user_profile._slot_values_cache.clear()
+    return (), {}
+
+
+@pytest.mark.parametrize("profile", PROFILES.keys())
+def test_read_arbitrary_profile(benchmark, profile):
+    profile_type, input_profile = PROFILES[profile]
+    benchmark.pedantic(read_arbitrary_profile, args=(profile_type, input_profile), rounds=20)
+
+
+@pytest.mark.parametrize("profile", PROFILES.keys())
+def test_read_arbitrary_profile_uncached(benchmark, profile):
+    profile_type, input_profile = PROFILES[profile]
+    benchmark.pedantic(lambda: read_arbitrary_profile(profile_type, input_profile),
+                       setup=_clear_profile_caches, rounds=20)
+
+
+@pytest.mark.parametrize("house_count", HOUSE_COUNTS)
+def test_endpoint_buffer_update_stats(benchmark, create_simulation, house_count):
+    simulation = create_simulation(house_count, hours=2)
+    simulation.run()
+    benchmark.pedantic(simulation.endpoint_buffer.update_stats,
+                       args=(simulation.area, simulation.status, simulation.progress_info,
+                             simulation.current_state),
+                       rounds=5)
+
+
+@pytest.mark.parametrize("house_count", HOUSE_COUNTS)
+def test_simulation_run(benchmark, create_simulation, house_count):
+    benchmark.pedantic(lambda simulation: simulation.run(),
+                       setup=lambda: ((create_simulation(house_count),), {}),
+                       rounds=3)
+
+
+@pytest.mark.parametrize("gc_policy", GC_POLICIES.keys())
+def test_simulation_run_gc_policy(benchmark, create_simulation, monkeypatch, gc_policy):
+    gc_thresholds, gc_freeze_setup_objects = GC_POLICIES[gc_policy]
+    monkeypatch.setattr(constants, "GC_THRESHOLDS", gc_thresholds)
+    monkeypatch.setattr(constants, "GC_FREEZE_SETUP_OBJECTS", gc_freeze_setup_objects)
+    benchmark.pedantic(lambda simulation: simulation.run(),
+                       setup=lambda: ((create_simulation(GC_HOUSE_COUNT, hours=2),), {}),
+                       rounds=3)
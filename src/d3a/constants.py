@@ -27,6 +27,21 @@ FLOATING_POINT_TOLERANCE = 0.00001
 
 REDIS_PUBLISH_RESPONSE_TIMEOUT = 1
 MAX_WORKER_THREADS = 10
+# Wire format of the payloads that the areas, markets and strategies exchange via Redis,
+# "json" or "msgpack" (requires the msgpack package). Receivers accept both formats.
+REDIS_WIRE_FORMAT = "json"
+# Publish the events of an area to all its children (and the clearing events to all its
+# markets) with one Redis pipeline and wait for all responses at once, instead of waiting for
+# the response of every receiver before publishing to the next one. Receivers then process
+# the event concurrently, so the order in which they handle it is no longer fixed.
+REDIS_PIPELINED_DISPATCH = False
+# Number of pubsub connections (each with one listener thread) that serve the subscriptions
+# of the markets and of the publishers that wait for market responses, shared by the process
+REDIS_PUBSUB_LISTENER_THREADS = 2
+
+# Directory in which parsed csv profiles are cached across simulations (as .npz files, one per
+# file content). Disabled if set to None, parsed profiles are then only cached in memory.
+PROFILE_CACHE_DIR = None
 
 DISPATCH_EVENTS_BOTTOM_TO_TOP = True
 # Controls how often will event tick be dispatched to external connections. Defaults to
@@ -43,6 +58,22 @@ PV_PENALTY_RATE = 0
 
 SIMULATION_PAUSE_TIMEOUT = 600
 
+# Memory usage is logged at the start of every MEMORY_SAMPLE_INTERVAL_SLOTS-th market slot and
+# every MEMORY_SAMPLE_INTERVAL_SECONDS from a background thread. 0 disables the sampling.
+MEMORY_SAMPLE_INTERVAL_SLOTS = 96
+MEMORY_SAMPLE_INTERVAL_SECONDS = 0
+# Thresholds of the generational garbage collector (gc.set_threshold) during the simulation,
+# None keeps the defaults of Python. Measured with benchmarks/test_simulation_benchmarks.py
+GC_THRESHOLDS = (50000, 20, 100)
+# Exclude the objects that are created by the setup from garbage collection (Python >= 3.7).
+# Off by default, it did not reduce the collection time on top of GC_THRESHOLDS
+GC_FREEZE_SETUP_OBJECTS = False
+
+# Number of processes that write the export plots, 0 writes them in the simulation process
+PLOT_RENDER_PROCESSES = 4
+# Write the figure json of the export plots (<plot name>.json) instead of html pages
+PLOT_DATA_ONLY = False
+
 D3A_TEST_RUN = False
 
 IS_CANARY_NETWORK = False
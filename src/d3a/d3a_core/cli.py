@@ -16,6 +16,7 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 import logging
+import os
 from logging import getLogger
 
 import click
@@ -34,6 +35,7 @@ from d3a.d3a_core.util import IntervalType, available_simulation_scenarios, \
     DateType
 
 from d3a.d3a_core.simulation import run_simulation
+from d3a.d3a_core.sweep import read_sweep_file, run_sweep
 from d3a.constants import TIME_ZONE, DATE_TIME_FORMAT, DATE_FORMAT, TIME_FORMAT
 from d3a_interface.settings_validators import validate_global_settings
 
@@ -95,6 +97,9 @@ _setup_modules = available_simulation_scenarios
 @click.option('--export-path',  type=str, default=None, show_default=False,
               help="Specify a path for the csv export files (default: ~/d3a-simulation)")
 @click.option('--enable-bc', is_flag=True, default=False, help="Run simulation on Blockchain")
+@click.option('--profile', is_flag=True, default=False,
+              help="Write a report of the time spent per simulation phase and of the number "
+                   "of offers, bids and trades per market")
 @click.option('--compare-alt-pricing', is_flag=True, default=False,
               help="Compare alternative pricing schemes")
 @click.option('--enable-external-connection', is_flag=True, default=False,
@@ -149,3 +154,27 @@ def run(setup_module_name, settings_file, slowdown, duration, slot_length, tick_
 
     except D3AException as ex:
         raise click.BadOptionUsage(ex.args[0])
+
+
+@main.command()
+@click.option('--setup', 'setup_module_name', default="default_2a",
+              help="Simulation setup module use. Available modules: [{}]".format(
+                  ', '.join(_setup_modules)))
+@click.option('-f', '--sweep-file', required=True,
+              help="Sweep file path (json) with the swept parameters and seeds")
+@click.option('-o', '--results-file', default="d3a-sweep-results.jsonl", show_default=True,
+              help="Results file, one json summary per run. Finished runs in an existing "
+                   "results file are skipped")
+@click.option('-w', '--workers', type=int, default=os.cpu_count(), show_default=True,
+              help="Number of simulations that run in parallel")
+@click.option('--seeds', type=int, default=None,
+              help="Run every parameter combination with the seeds 0 to SEEDS - 1, instead of "
+                   "the seeds of the sweep file")
+def sweep(setup_module_name, sweep_file, results_file, workers, seeds):
+    try:
+        sweep_settings = read_sweep_file(sweep_file)
+        if seeds is not None:
+            sweep_settings["seeds"] = list(range(seeds))
+        run_sweep(setup_module_name, sweep_settings, results_file, workers)
+    except D3AException as ex:
+        raise click.BadOptionUsage(ex.args[0])
@@ -15,7 +15,6 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
-import csv
 import logging
 import pathlib
 import os
@@ -37,6 +36,8 @@ from d3a.models.market.market_structures import MarketClearingState
 from d3a.models.strategy.storage import StorageStrategy
 from d3a.models.state import ESSEnergyOrigin
 from d3a.d3a_core.sim_results.plotly_graph import PlotlyGraph
+from d3a.d3a_core.sim_results.plot_renderer import plot_renderer
+from d3a.d3a_core.export_writer import CSVExportWriter, ExportedMarkets
 from functools import reduce  # forward compatibility for Python 3
 import d3a.constants
 
@@ -72,6 +73,8 @@ class ExportAndPlot:
         self.endpoint_buffer = endpoint_buffer
         self.file_stats_endpoint = file_stats_endpoint
         self.raw_data_subdir = None
+        self.export_writer = CSVExportWriter()
+        self.exported_markets = ExportedMarkets()
         try:
             if path is not None:
                 path = os.path.abspath(path)
@@ -107,11 +110,12 @@ class ExportAndPlot:
         file_name = ("%s.csv" % slug).replace(' ', '_')
         return directory.joinpath(file_name).as_posix()
 
-    def export(self, export_plots=True, power_flow=None):
+    def export(self, export_plots=True, power_flows=()):
         """Wrapping function, executes all export and plotting functions"""
+        self.export_writer.flush()
         if export_plots:
             self.plot_dir = os.path.join(self.directory, 'plot')
-            if power_flow is not None:
+            for power_flow in power_flows:
                 power_flow.export_power_flow_results(self.plot_dir)
 
             if not os.path.exists(self.plot_dir):
@@ -133,6 +137,7 @@ class ExportAndPlot:
             if ConstSettings.IAASettings.MARKET_TYPE == 3 and \
                     ConstSettings.GeneralSettings.EXPORT_SUPPLY_DEMAND_PLOTS:
                 self.plot_supply_demand_curve(self.area, self.plot_dir)
+            plot_renderer().render_pending()
             self.move_root_plot_folder()
 
     def data_to_csv(self, area, is_first):
@@ -203,17 +208,10 @@ class ExportAndPlot:
     def _export_area_clearing_rate(self, area, directory, file_suffix, is_first):
         file_path = self._file_path(directory, f"{area.slug}-{file_suffix}")
         labels = ("slot",) + MarketClearingState._csv_fields()
-        try:
-            with open(file_path, 'a') as csv_file:
-                writer = csv.writer(csv_file)
-                if is_first:
-                    writer.writerow(labels)
-                for market in area.past_markets:
-                    for time, clearing in market.state.clearing.items():
-                        row = (market.time_slot, time, clearing[0])
-                        writer.writerow(row)
-        except OSError:
-            _log.exception("Could not export area market_clearing_rate")
+        rows = [(market.time_slot, time, clearing[0])
+                for market in self.exported_markets.new_markets(file_path, area.past_markets)
+                for time, clearing in market.state.clearing.items()]
+        self.export_writer.append(file_path, rows, labels if is_first else None)
 
     def _export_area_offers_bids_csv_files(self, area, directory, file_suffix,
                                            offer_type, market_member, past_markets,
@@ -225,17 +223,10 @@ class ExportAndPlot:
         """
         file_path = self._file_path(directory, f"{area.slug}-{file_suffix}")
         labels = ("slot",) + offer_type._csv_fields()
-        try:
-            with open(file_path, 'a') as csv_file:
-                writer = csv.writer(csv_file)
-                if is_first:
-                    writer.writerow(labels)
-                for market in past_markets:
-                    for offer in getattr(market, market_member):
-                        row = (market.time_slot,) + offer._to_csv()
-                        writer.writerow(row)
-        except OSError:
-            _log.exception("Could not export area balancing offers")
+        rows = [(market.time_slot,) + offer._to_csv()
+                for market in self.exported_markets.new_markets(file_path, past_markets)
+                for offer in getattr(market, market_member)]
+        self.export_writer.append(file_path, rows, labels if is_first else None)
 
     def _export_trade_csv_files(self, area: Area, directory: dir, balancing: bool = False,
                                 is_first: bool = False):
@@ -253,17 +244,10 @@ class ExportAndPlot:
             labels = ("slot",) + Trade._csv_fields()
             past_markets = area.past_markets
 
-        try:
-            with open(file_path, 'a') as csv_file:
-                writer = csv.writer(csv_file)
-                if is_first:
-                    writer.writerow(labels)
-                for market in past_markets:
-                    for trade in market.trades:
-                        row = (market.time_slot,) + trade._to_csv()
-                        writer.writerow(row)
-        except OSError:
-            _log.exception("Could not export area trades")
+        rows = [(market.time_slot,) + trade._to_csv()
+                for market in self.exported_markets.new_markets(file_path, past_markets)
+                for trade in market.trades]
+        self.export_writer.append(file_path, rows, labels if is_first else None)
 
     def _export_area_stats_csv_file(self, area: Area, directory: dir,
                                     balancing: bool, is_first: bool):
@@ -274,20 +258,11 @@ class ExportAndPlot:
         area_name = area.slug
         if balancing:
             area_name += "-balancing"
+        file_path = self._file_path(directory, area_name)
         data = self.file_stats_endpoint.generate_market_export_data(area, balancing)
-        rows = data.rows()
-        if not rows and not is_first:
-            return
-
-        try:
-            with open(self._file_path(directory, area_name), 'a') as csv_file:
-                writer = csv.writer(csv_file)
-                if is_first:
-                    writer.writerow(data.labels())
-                for row in rows:
-                    writer.writerow(row)
-        except Exception as ex:
-            _log.error("Could not export area data: %s" % str(ex))
+        rows = data.market_rows(
+            self.exported_markets.new_markets(file_path, data.past_markets))
+        self.export_writer.append(file_path, rows, data.labels() if is_first else None)
 
     def plot_device_stats(self, area: Area, node_address_list: list):
         """
@@ -0,0 +1,108 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import csv
+import threading
+from collections import OrderedDict
+from logging import getLogger
+from queue import Queue, Empty
+
+log = getLogger(__name__)
+
+
+class ExportedMarkets:
+    """
+    Keeps track of the last market slot that was exported for every export target, so that
+    every closed market is exported exactly once, no matter how many past markets an area
+    keeps or how often the export is triggered.
+    """
+
+    def __init__(self):
+        self._last_exported_slot = {}
+
+    def new_markets(self, target, past_markets):
+        """
+        Returns the markets of past_markets that were not exported to target yet, in slot
+        order, and marks them as exported. Past markets are ordered by time slot, therefore
+        only the newest markets are visited.
+        """
+        last_exported_slot = self._last_exported_slot.get(target)
+        new_markets = []
+        for market in reversed(past_markets):
+            if last_exported_slot is not None and market.time_slot <= last_exported_slot:
+                break
+            new_markets.append(market)
+        if new_markets:
+            self._last_exported_slot[target] = new_markets[0].time_slot
+        new_markets.reverse()
+        return new_markets
+
+
+class CSVExportWriter:
+    """
+    Appends rows to csv files from a background thread.
+
+    The simulation only hands over the rows of the markets that closed in the last slot, the
+    files are written while the simulation continues. Batches that queued up in the
+    meantime are written together, opening every file once per batch.
+    """
+
+    def __init__(self):
+        self._queue = Queue()
+        self._thread = threading.Thread(target=self._write_batches, daemon=True,
+                                        name="d3a-csv-export-writer")
+        self._thread.start()
+
+    def append(self, file_path, rows, labels=None):
+        """
+        Queues rows to be appended to file_path, labels are written as header row before them
+        """
+        if rows or labels:
+            self._queue.put((file_path, rows, labels))
+
+    def flush(self):
+        """Waits until all queued rows are written"""
+        self._queue.join()
+
+    def _write_batches(self):
+        while True:
+            batches = [self._queue.get()]
+            while True:
+                try:
+                    batches.append(self._queue.get_nowait())
+                except Empty:
+                    break
+            try:
+                self._write(batches)
+            finally:
+                for _ in batches:
+                    self._queue.task_done()
+
+    @staticmethod
+    def _write(batches):
+        file_rows = OrderedDict()
+        for file_path, rows, labels in batches:
+            file_rows.setdefault(file_path, [])
+            if labels:
+                file_rows[file_path].append(labels)
+            file_rows[file_path].extend(rows)
+        for file_path, rows in file_rows.items():
+            try:
+                with open(file_path, 'a') as csv_file:
+                    csv.writer(csv_file).writerows(rows)
+            except Exception as ex:
+                log.error(f"Could not export to {file_path}: {ex}")
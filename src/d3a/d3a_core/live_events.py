@@ -137,8 +137,15 @@ class LiveEvents:
         return False
 
     def handle_all_events(self, root_area):
+        """
+        :return: True if an event was applied to the area tree
+        """
         with self.lock:
+            applied = False
             for event in self.event_buffer:
                 if self._handle_event(root_area, event) is False:
                     logging.warning(f"Event {event} not applied.")
+                else:
+                    applied = True
             self.event_buffer.clear()
+            return applied
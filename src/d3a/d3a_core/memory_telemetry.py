@@ -0,0 +1,114 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import gc
+import os
+import threading
+from logging import getLogger
+
+import psutil
+
+from d3a import constants
+
+log = getLogger(__name__)
+
+
+# Thresholds and frozen state of the garbage collector before configure_garbage_collection()
+_default_gc_thresholds = None
+_gc_frozen = False
+
+
+def configure_garbage_collection():
+    """
+    Applies the GC policy of the simulation. The simulation allocates many short-lived offers,
+    bids and events per tick, raising the generation 0 threshold reduces the number of
+    collections. Objects that exist after the setup is created (area tree, profiles) are
+    moved to the permanent generation, so that full collections do not traverse them.
+    Both are configured by GC_THRESHOLDS and GC_FREEZE_SETUP_OBJECTS and are reverted by
+    restore_garbage_collection().
+    """
+    global _default_gc_thresholds, _gc_frozen
+    if constants.GC_THRESHOLDS is not None:
+        if _default_gc_thresholds is None:
+            _default_gc_thresholds = gc.get_threshold()
+        gc.set_threshold(*constants.GC_THRESHOLDS)
+    if constants.GC_FREEZE_SETUP_OBJECTS and hasattr(gc, "freeze"):
+        gc.collect()
+        gc.freeze()
+        _gc_frozen = True
+
+
+def restore_garbage_collection():
+    """
+    Reverts configure_garbage_collection() when the simulation finishes: restores the previous
+    thresholds and moves the frozen objects back to the oldest generation.
+    """
+    global _default_gc_thresholds, _gc_frozen
+    if _default_gc_thresholds is not None:
+        gc.set_threshold(*_default_gc_thresholds)
+        _default_gc_thresholds = None
+    if _gc_frozen:
+        gc.unfreeze()
+        _gc_frozen = False
+
+
+class MemoryTelemetry:
+    """
+    Logs the memory usage (RSS) of the simulation process every sample_interval_slots market
+    slots, and optionally every background_interval_s seconds from a background thread.
+    """
+
+    def __init__(self, sample_interval_slots=None, background_interval_s=None):
+        self.sample_interval_slots = constants.MEMORY_SAMPLE_INTERVAL_SLOTS \
+            if sample_interval_slots is None else sample_interval_slots
+        self.background_interval_s = constants.MEMORY_SAMPLE_INTERVAL_SECONDS \
+            if background_interval_s is None else background_interval_s
+        self.last_sample_mb = None
+        self.peak_sample_mb = 0
+        self._process = psutil.Process(os.getpid())
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def sample(self):
+        mbs_used = self._process.memory_info().rss / 1000000.0
+        self.last_sample_mb = mbs_used
+        self.peak_sample_mb = max(self.peak_sample_mb, mbs_used)
+        log.debug(f"Used {mbs_used} MBs.")
+        return mbs_used
+
+    def slot_started(self, slot_no):
+        if self.sample_interval_slots > 0 and slot_no % self.sample_interval_slots == 0:
+            self.sample()
+
+    def start(self):
+        if self.background_interval_s <= 0 or self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._sample_periodically, daemon=True,
+                                        name="d3a-memory-telemetry")
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+    def _sample_periodically(self):
+        while not self._stop_event.wait(self.background_interval_s):
+            self.sample()
@@ -0,0 +1,114 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import csv
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from logging import getLogger
+from typing import Dict, List, Tuple  # noqa
+
+log = getLogger(__name__)
+
+
+class SimulationProfiler:
+    """
+    Accumulates the wall time of the simulation phases and the number of offers, bids and
+    trades per market. Disabled by default, enabled via the --profile CLI flag.
+
+    Phases can be nested (e.g. the IAA offer propagation is part of the IAA event_tick), the
+    reported time of a phase includes the time of its nested phases.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.phases = {}  # type: Dict[str, List]
+        self.market_counts = {}  # type: Dict[Tuple[str, str], Dict[str, int]]
+        # Events dispatched via Redis are handled in worker threads
+        self._lock = threading.Lock()
+
+    def reset(self):
+        self.phases = {}
+        self.market_counts = {}
+
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add_phase_time(name, time.perf_counter() - start_time)
+
+    def _add_phase_time(self, name, duration):
+        with self._lock:
+            calls_and_time = self.phases.setdefault(name, [0, 0.0])
+            calls_and_time[0] += 1
+            calls_and_time[1] += duration
+
+    def count_market_orders(self, area):
+        """Stores the number of offers, bids and trades of all spot markets of the area tree"""
+        if not self.enabled:
+            return
+        for market in area.all_markets:
+            self.market_counts[(area.name, market.time_slot_str)] = {
+                "offers": len(market.offer_history),
+                "bids": len(market.bid_history),
+                "trades": len(market.trades),
+            }
+        for child in area.children:
+            self.count_market_orders(child)
+
+    @property
+    def phase_report(self):
+        return [{"phase": name,
+                 "calls": calls,
+                 "total_seconds": total_seconds,
+                 "mean_seconds": total_seconds / calls}
+                for name, (calls, total_seconds) in
+                sorted(self.phases.items(), key=lambda item: item[1][1], reverse=True)]
+
+    @property
+    def market_report(self):
+        return [{"area": area_name, "time_slot": time_slot, **counts}
+                for (area_name, time_slot), counts in self.market_counts.items()]
+
+    def write_report(self, directory):
+        """Writes the timing report as json and csv files to directory"""
+        phase_report = self.phase_report
+        market_report = self.market_report
+        with open(os.path.join(directory, "profile.json"), "w") as json_file:
+            json.dump({"phases": phase_report, "markets": market_report}, json_file, indent=2)
+        self._write_csv(os.path.join(directory, "profile_phases.csv"),
+                        ("phase", "calls", "total_seconds", "mean_seconds"), phase_report)
+        self._write_csv(os.path.join(directory, "profile_markets.csv"),
+                        ("area", "time_slot", "offers", "bids", "trades"), market_report)
+        log.info("Profiling report written to %s", directory)
+
+    @staticmethod
+    def _write_csv(file_path, labels, rows):
+        with open(file_path, "w") as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=labels)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+profiler = SimulationProfiler()
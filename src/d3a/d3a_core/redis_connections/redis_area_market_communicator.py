@@ -15,11 +15,11 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
-from redis import StrictRedis
-from threading import Event, Lock
+from redis import StrictRedis, ConnectionPool
+from threading import Event, Lock, Condition
+from zlib import crc32
 import logging
 import json
-from time import time
 from d3a.d3a_core.redis_connections.redis_communication import REDIS_URL
 from d3a.d3a_core.redis_connections.aggregator_connection import AggregatorHandler
 from d3a.constants import REDIS_PUBLISH_RESPONSE_TIMEOUT
@@ -27,19 +27,182 @@ import d3a.constants
 
 log = logging.getLogger(__name__)
 REDIS_THREAD_JOIN_TIMEOUT = 2
-REDIS_POLL_TIMEOUT = 0.01
+# Upper bound for how long a multiplexer listener blocks while waiting for messages, it
+# returns as soon as a message arrives
+REDIS_LISTENER_POLL_TIMEOUT = 0.1
 
+_connection_pool = None
+_connection_pool_lock = Lock()
+_channel_multiplexer = None
+_channel_multiplexer_lock = Lock()
 
-class RedisCommunicator:
+
+def shared_redis_db():
+    """
+    Returns a Redis client on the connection pool that all communicators of the process share
+    """
+    global _connection_pool
+    with _connection_pool_lock:
+        if _connection_pool is None:
+            _connection_pool = ConnectionPool.from_url(REDIS_URL, retry_on_timeout=True)
+    return StrictRedis(connection_pool=_connection_pool)
+
+
+class RedisChannelMultiplexer:
+    """
+    Process-wide Redis subscriptions on a fixed number of pubsub connections.
+
+    Every channel is routed to one of the listeners by its name, and every listener receives
+    the messages of its channels on one thread. A channel is subscribed once in Redis, its
+    messages are handed to the callbacks of all subscribers of the channel, like Redis would
+    do for subscribers with own connections. The callbacks are not allowed to block (e.g. wait
+    for another Redis response), they should hand the work over to an executor instead.
+    """
+    def __init__(self, listener_count):
+        self.listener_count = listener_count
+        self._pubsubs = {}
+        self._threads = {}
+        self._channel_callbacks = {}
+        # Channels by the first segment of their name, e.g. the market id of
+        # "{market_id}/OFFER/RESPONSE"
+        self._prefix_channels = {}
+        self._lock = Lock()
+
+    def _listener_index(self, channel):
+        return crc32(channel.encode()) % self.listener_count
+
+    def _group_by_listener(self, channels):
+        listener_channels = {}
+        for channel in channels:
+            listener_channels.setdefault(self._listener_index(channel), []).append(channel)
+        return listener_channels
+
+    @staticmethod
+    def _channel_prefix(channel):
+        return channel.split("/", 1)[0]
+
+    def _fan_out(self, channel):
+        def fan_out_callback(payload):
+            # An exception would stop the listener thread, and with it all channels of the
+            # listener
+            for callback in list(self._channel_callbacks.get(channel, ())):
+                try:
+                    callback(payload)
+                except Exception as e:
+                    log.error(f"Error in the callback of channel {payload.get('channel')}: {e}")
+        return fan_out_callback
+
+    def subscribe(self, channel_callback_dict):
+        with self._lock:
+            new_channels = []
+            for channel, callback in channel_callback_dict.items():
+                if channel not in self._channel_callbacks:
+                    self._channel_callbacks[channel] = []
+                    self._prefix_channels.setdefault(
+                        self._channel_prefix(channel), set()).add(channel)
+                    new_channels.append(channel)
+                self._channel_callbacks[channel].append(callback)
+            for index, channels in self._group_by_listener(new_channels).items():
+                if index not in self._pubsubs:
+                    self._pubsubs[index] = shared_redis_db().pubsub()
+                self._pubsubs[index].subscribe(
+                    **{channel: self._fan_out(channel) for channel in channels})
+                if index not in self._threads:
+                    self._threads[index] = self._pubsubs[index].run_in_thread(
+                        sleep_time=REDIS_LISTENER_POLL_TIMEOUT, daemon=True)
+                    log.trace(f"Started multiplexer listener thread: {self._threads[index]}")
+
+    def unsubscribe(self, channel_callback_pairs):
+        """
+        Removes the callbacks from their channels, a channel is unsubscribed in Redis once its
+        last callback was removed
+        :param channel_callback_pairs: iterable of (channel, callback) tuples
+        """
+        with self._lock:
+            unused_channels = []
+            for channel, callback in channel_callback_pairs:
+                callbacks = self._channel_callbacks.get(channel)
+                if callbacks is None or callback not in callbacks:
+                    continue
+                callbacks.remove(callback)
+                if not callbacks:
+                    self._remove_channel(channel)
+                    unused_channels.append(channel)
+            self._unsubscribe_from_redis(unused_channels)
+
+    def unsubscribe_market(self, market_id):
+        """
+        Removes the callbacks of all subscribers from the channels of a deleted market, e.g.
+        the "{market_id}/OFFER/RESPONSE" channels of the strategies
+        """
+        with self._lock:
+            channels = list(self._prefix_channels.get(market_id, ()))
+            for channel in channels:
+                self._remove_channel(channel)
+            self._unsubscribe_from_redis(channels)
+
+    def is_subscribed(self, channel, callback):
+        return callback in self._channel_callbacks.get(channel, ())
+
+    def _remove_channel(self, channel):
+        del self._channel_callbacks[channel]
+        prefix = self._channel_prefix(channel)
+        self._prefix_channels[prefix].discard(channel)
+        if not self._prefix_channels[prefix]:
+            del self._prefix_channels[prefix]
+
+    def _unsubscribe_from_redis(self, channels):
+        for index, listener_channels in self._group_by_listener(channels).items():
+            if index in self._pubsubs:
+                self._pubsubs[index].unsubscribe(*listener_channels)
+
+    def stop(self):
+        with self._lock:
+            for thread in self._threads.values():
+                thread.stop()
+                thread.join(timeout=REDIS_THREAD_JOIN_TIMEOUT)
+            for pubsub in self._pubsubs.values():
+                pubsub.close()
+            self._threads = {}
+            self._pubsubs = {}
+            self._channel_callbacks = {}
+            self._prefix_channels = {}
+
+
+def channel_multiplexer():
+    """
+    Returns the RedisChannelMultiplexer of the process
+    """
+    global _channel_multiplexer
+    with _channel_multiplexer_lock:
+        if _channel_multiplexer is None:
+            _channel_multiplexer = RedisChannelMultiplexer(
+                d3a.constants.REDIS_PUBSUB_LISTENER_THREADS)
+    return _channel_multiplexer
+
+
+class RedisPublisherMixin:
+    def publish(self, channel, data):
+        self.redis_db.publish(channel, data)
+
+    def publish_pipelined(self, channel_data_pairs):
+        """
+        Publishes all messages with one round trip to Redis
+        :param channel_data_pairs: iterable of (channel, data) tuples
+        """
+        pipeline = self.redis_db.pipeline(transaction=False)
+        for channel, data in channel_data_pairs:
+            pipeline.publish(channel, data)
+        pipeline.execute()
+
+
+class RedisCommunicator(RedisPublisherMixin):
     def __init__(self):
-        self.redis_db = StrictRedis.from_url(REDIS_URL, retry_on_timeout=True)
+        self.redis_db = shared_redis_db()
         self.pubsub = self.redis_db.pubsub()
         self.pubsub_response = self.redis_db.pubsub()
         self.event = Event()
 
-    def publish(self, channel, data):
-        self.redis_db.publish(channel, data)
-
     def wait(self):
         self.event.wait()
         self.event.clear()
@@ -143,17 +306,126 @@ class ExternalConnectionCommunicator(ResettableCommunicator):
         self.aggregator.publish_all_events(self)
 
 
-class BlockingCommunicator(RedisCommunicator):
+class PendingResponses:
+    """
+    Transaction ids of published events whose responses have not been received yet.
+
+    Events that are published at once are correlated with their responses by transaction id,
+    waiting for the responses therefore takes as long as the slowest receiver.
+    """
+    def __init__(self):
+        self._transaction_uuids = set()
+        self._lock = Lock()
+        self._all_received = Event()
+        self._all_received.set()
+
+    def __len__(self):
+        return len(self._transaction_uuids)
+
+    def add(self, transaction_uuid):
+        with self._lock:
+            self._transaction_uuids.add(transaction_uuid)
+            self._all_received.clear()
+
+    def received(self, transaction_uuid):
+        """
+        Marks the response of transaction_uuid as received.
+        :return: False if no response was pending for this transaction id
+        """
+        with self._lock:
+            if transaction_uuid not in self._transaction_uuids:
+                return False
+            self._transaction_uuids.remove(transaction_uuid)
+            if not self._transaction_uuids:
+                self._all_received.set()
+            return True
+
+    def wait(self, timeout=None):
+        """
+        Waits until the responses for all pending transactions have been received.
+        :return: True if all responses were received before the timeout
+        """
+        return self._all_received.wait(timeout)
+
+    def discard_all(self):
+        """
+        Stops waiting for the pending responses.
+        :return: Transaction ids of the responses that were pending
+        """
+        with self._lock:
+            missing = self._transaction_uuids
+            self._transaction_uuids = set()
+            self._all_received.set()
+            return missing
+
+
+class MultiplexedCommunicator(RedisPublisherMixin):
+    """
+    Communicator whose subscriptions are served by the RedisChannelMultiplexer of the process
+    instead of own pubsub connections and threads. Its callbacks are not allowed to block.
+    """
+    def __init__(self):
+        self.redis_db = shared_redis_db()
+        self.subscribed_channels = set()
+        self._subscriptions = []
+
+    def sub_to_channel(self, channel, callback):
+        self.sub_to_multiple_channels({channel: callback})
+
+    def sub_to_multiple_channels(self, channel_callback_dict):
+        self._forget_removed_subscriptions()
+        channel_multiplexer().subscribe(channel_callback_dict)
+        self.subscribed_channels.update(channel_callback_dict)
+        self._subscriptions.extend(channel_callback_dict.items())
+
+    def _forget_removed_subscriptions(self):
+        """
+        Forgets the subscriptions that the multiplexer removed, e.g. of deleted markets
+        """
+        multiplexer = channel_multiplexer()
+        self._subscriptions = [(channel, callback) for channel, callback in self._subscriptions
+                               if multiplexer.is_subscribed(channel, callback)]
+        self.subscribed_channels = {channel for channel, _ in self._subscriptions}
+
+    def terminate_connection(self):
+        """Removes the subscriptions of this communicator, other subscribers keep theirs"""
+        if self._subscriptions:
+            channel_multiplexer().unsubscribe(self._subscriptions)
+        self.subscribed_channels = set()
+        self._subscriptions = []
+
+
+class BlockingCommunicator(MultiplexedCommunicator):
+    """
+    Communicator for publishers that wait for the response to their events. The responses are
+    delivered by the multiplexer, the publisher waits until it is notified about them.
+    """
     def __init__(self):
         super().__init__()
-        self.lock = Lock()
+        self.response_received = Condition()
+        self.callback_exception = None
 
     def sub_to_channel(self, channel, callback):
-        self.pubsub.subscribe(**{channel: callback})
+        # Publishers call this before every event, the subscription is only sent once
+        if channel in self.subscribed_channels:
+            return
+
+        def notifying_callback(payload):
+            try:
+                callback(payload)
+            except Exception as e:
+                # Raised in the thread of the publisher that waits for the response
+                self.callback_exception = e
+            with self.response_received:
+                self.response_received.notify_all()
+
+        super().sub_to_channel(channel, notifying_callback)
 
     def poll_until_response_received(self, response_received_callback):
-        start_time = time()
-        while not response_received_callback() and \
-                (time() - start_time < REDIS_PUBLISH_RESPONSE_TIMEOUT):
-            with self.lock:
-                self.pubsub.get_message(timeout=REDIS_POLL_TIMEOUT)
+        with self.response_received:
+            self.response_received.wait_for(
+                lambda: self.callback_exception is not None or response_received_callback(),
+                timeout=REDIS_PUBLISH_RESPONSE_TIMEOUT)
+        if self.callback_exception is not None:
+            callback_exception, self.callback_exception = self.callback_exception, None
+            raise callback_exception
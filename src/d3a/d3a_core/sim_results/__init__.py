@@ -62,3 +62,28 @@ def area_sells_to_child(trade, area_name, child_names):
 def child_buys_from_area(trade, area_name, child_names):
     return area_name_from_area_or_iaa_name(trade['buyer']) == \
         area_name and area_name_from_area_or_iaa_name(trade['seller']) in child_names
+
+
+def trades_by_participant(trades):
+    """
+    Index the serialized trades of a market by the names of their sellers and buyers,
+    keeping the order of the trades list.
+    """
+    index = {}
+    for trade in trades:
+        index.setdefault(trade['seller'], []).append(trade)
+        if trade['buyer'] != trade['seller']:
+            index.setdefault(trade['buyer'], []).append(trade)
+    return index
+
+
+def index_area_dicts(area_dict, index=None):
+    """
+    Maps the uuids of all areas of the area tree dict to their area dicts
+    """
+    if index is None:
+        index = {}
+    index[area_dict['uuid']] = area_dict
+    for child in area_dict['children']:
+        index_area_dicts(child, index)
+    return index
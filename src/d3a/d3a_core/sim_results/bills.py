@@ -20,12 +20,15 @@ from d3a.d3a_core.util import round_floats_for_ui
 from d3a.d3a_core.util import area_name_from_area_or_iaa_name
 from d3a.d3a_core.sim_results import is_load_node_type, is_pv_node_type
 from d3a.constants import LOAD_PENALTY_RATE, PV_PENALTY_RATE
-from d3a.d3a_core.sim_results import get_unified_area_type
+from d3a.d3a_core.sim_results import get_unified_area_type, trades_by_participant, \
+    index_area_dicts
 
 
 class CumulativeBills:
     def __init__(self):
         self.cumulative_bills_results = {}
+        self._area_dict = None
+        self._area_dicts = {}
 
     def _calculate_device_penalties(self, area, area_core_stats):
         if len(area['children']) > 0 or area_core_stats == {}:
@@ -51,9 +54,72 @@ class CumulativeBills:
             for uuid, results in self.cumulative_bills_results.items()
         }
 
-    def update_cumulative_bills(self, area_dict, core_stats, current_market_time_slot):
-        for child in area_dict['children']:
-            self.update_cumulative_bills(child, core_stats, current_market_time_slot)
+    def update_cumulative_bills(self, area_dict, core_stats, current_market_time_slot,
+                                traded_area_uuids=None, penalized_device_uuids=None):
+        """
+        :param traded_area_uuids: uuids of the areas whose markets had trades in the last
+        market slot
+        :param penalized_device_uuids: uuids of the devices that did not trade all their
+        energy in the last market slot
+        If both are given, only the bills of the devices that traded or were penalized, and
+        of their ancestors, are updated. Otherwise (and whenever the area tree changed) the
+        bills of all areas are updated.
+        """
+        if traded_area_uuids is None or penalized_device_uuids is None or \
+                area_dict is not self._area_dict:
+            parent_trades = core_stats.get(area_dict['parent_uuid'], {}).get('trades', [])
+            self._update_cumulative_bills(area_dict, core_stats,
+                                          trades_by_participant(parent_trades))
+            self._area_dict = area_dict
+            self._area_dicts = index_area_dicts(area_dict)
+        else:
+            self._update_changed_bills(core_stats, traded_area_uuids, penalized_device_uuids)
+
+    def _update_changed_bills(self, core_stats, traded_area_uuids, penalized_device_uuids):
+        # Bills of devices only change if the market of their parent had trades or if they
+        # are penalized, the bills of areas are the sums of their children
+        device_parents = {}
+        for area_uuid in traded_area_uuids:
+            for child in self._area_dicts[area_uuid]['children']:
+                device_parents[child['uuid']] = area_uuid
+        for device_uuid in penalized_device_uuids:
+            device_parents[device_uuid] = self._area_dicts[device_uuid]['parent_uuid']
+
+        parent_trades_by_participant = {}
+        changed_areas = {}
+        for device_uuid, parent_uuid in device_parents.items():
+            device = self._area_dicts[device_uuid]
+            if device['type'] == "Area":
+                continue
+            if parent_uuid not in parent_trades_by_participant:
+                parent_trades_by_participant[parent_uuid] = trades_by_participant(
+                    core_stats.get(parent_uuid, {}).get('trades', []))
+            self._update_cumulative_bills(device, core_stats,
+                                          parent_trades_by_participant[parent_uuid],
+                                          update_children=False)
+            ancestor = self._area_dicts.get(parent_uuid)
+            while ancestor is not None and ancestor['uuid'] not in changed_areas:
+                changed_areas[ancestor['uuid']] = self._depth(ancestor)
+                ancestor = self._area_dicts.get(ancestor['parent_uuid'])
+        # The sums of the children have to be updated before the sums of their parents
+        for area_uuid in sorted(changed_areas, key=changed_areas.get, reverse=True):
+            self._update_cumulative_bills(self._area_dicts[area_uuid], core_stats, {},
+                                          update_children=False)
+
+    def _depth(self, area_dict):
+        depth = 0
+        while area_dict['parent_uuid'] in self._area_dicts:
+            area_dict = self._area_dicts[area_dict['parent_uuid']]
+            depth += 1
+        return depth
+
+    def _update_cumulative_bills(self, area_dict, core_stats, parent_trades_by_participant,
+                                 update_children=True):
+        if area_dict['children'] and update_children:
+            area_trades_by_participant = trades_by_participant(
+                core_stats.get(area_dict['uuid'], {}).get('trades', []))
+            for child in area_dict['children']:
+                self._update_cumulative_bills(child, core_stats, area_trades_by_participant)
 
         if area_dict['uuid'] not in self.cumulative_bills_results:
             self.cumulative_bills_results[area_dict['uuid']] = {
@@ -79,8 +145,7 @@ class CumulativeBills:
                 "total": sum(c["total"] for c in all_child_results),
             }
         else:
-            parent_area_stats = core_stats.get(area_dict['parent_uuid'], {})
-            trades = parent_area_stats.get('trades', [])
+            trades = parent_trades_by_participant.get(area_dict['name'], [])
 
             spent_total = sum(trade['price']
                               for trade in trades
@@ -116,6 +181,8 @@ class MarketEnergyBills:
         self.market_fees = {}
         self.cumulative_fee_charged_per_market = 0.
         self.external_trades = {}
+        self._area_dict = None
+        self._area_dicts = {}
 
     @staticmethod
     def _store_bought_trade(result_dict, trade):
@@ -199,6 +266,15 @@ class MarketEnergyBills:
                 total_energy=0.0, total_cost=0.0, market_fee=0.0)
 
         result = self._get_child_data(area_dict)
+        self._store_area_trades(area_dict, area_core_stats, result)
+        for child in area_dict['children']:
+            child_result = self._energy_bills(child, area_core_stats)
+            if child_result is not None:
+                result[child['name']]['children'] = child_result
+
+        return result
+
+    def _store_area_trades(self, area_dict, area_core_stats, result):
         for trade in area_core_stats[area_dict['uuid']]['trades']:
             buyer = area_name_from_area_or_iaa_name(trade['buyer'])
             seller = area_name_from_area_or_iaa_name(trade['seller'])
@@ -212,12 +288,6 @@ class MarketEnergyBills:
             # Incoming external trades
             if seller == area_name_from_area_or_iaa_name(area_dict['name']) and buyer in result:
                 self._store_incoming_external_trade(trade, area_dict)
-        for child in area_dict['children']:
-            child_result = self._energy_bills(child, area_core_stats)
-            if child_result is not None:
-                result[child['name']]['children'] = child_result
-
-        return result
 
     def _accumulate_market_fees(self, area_dict, area_core_stats):
         if area_dict['name'] not in self.market_fees:
@@ -236,14 +306,47 @@ class MarketEnergyBills:
         for child in area_dict['children']:
             self._accumulate_grid_fee_charged(child, area_core_stats)
 
-    def update(self, area_dict, area_core_stats):
-        self._update_market_fees(area_dict, area_core_stats)
-        self._accumulate_grid_fee_charged(area_dict, area_core_stats)
-        bills = self._energy_bills(area_dict, area_core_stats)
-        flattened = {}
-        self._flatten_energy_bills(bills, flattened)
-        self.bills_results = self._accumulate_by_children(area_dict, flattened, {})
-        self._bills_for_redis(area_dict, deepcopy(self.bills_results))
+    def update(self, area_dict, area_core_stats, traded_area_uuids=None):
+        """
+        :param traded_area_uuids: uuids of the areas whose markets had trades or charged fees
+        in the last market slot, in the order of the area tree. If given, only the bills of
+        these markets are updated, otherwise (and whenever the area tree changed) the bills of
+        all areas are rebuilt.
+        """
+        if traded_area_uuids is None or area_dict is not self._area_dict:
+            self._update_market_fees(area_dict, area_core_stats)
+            self._accumulate_grid_fee_charged(area_dict, area_core_stats)
+            bills = self._energy_bills(area_dict, area_core_stats)
+            flattened = {}
+            self._flatten_energy_bills(bills, flattened)
+            self.bills_results = self._accumulate_by_children(area_dict, flattened, {})
+            self._bills_for_redis(area_dict, deepcopy(self.bills_results))
+            self._area_dict = area_dict
+            self._area_dicts = index_area_dicts(area_dict)
+        else:
+            for area_uuid in traded_area_uuids:
+                self._update_area_bills(self._area_dicts[area_uuid], area_core_stats)
+
+    def _update_area_bills(self, area_dict, area_core_stats):
+        """
+        Updates the bills of the children of area_dict with the trades and fees of its market,
+        the bills of the other areas do not change
+        """
+        market_fee = area_core_stats[area_dict['uuid']]['market_fee'] / 100.0
+        self.market_fees[area_dict['name']] += market_fee
+        self.cumulative_fee_charged_per_market += market_fee
+        result = self._get_child_data(area_dict)
+        self._store_area_trades(area_dict, area_core_stats, result)
+
+        self.bills_results[area_dict['name']] = \
+            {c['name']: result[c['name']] for c in area_dict['children']}
+        self._generate_external_and_total_bills(area_dict, self.bills_results)
+        self.bills_redis_results[area_dict['uuid']] = \
+            self._round_area_bill_result_redis(deepcopy(self.bills_results[area_dict['name']]))
+        for child in area_dict['children']:
+            if not child['children']:
+                self.bills_redis_results[child['uuid']] = \
+                    self._round_child_bill_results(deepcopy(result[child['name']]))
 
     @classmethod
     def _flatten_energy_bills(cls, energy_bills, flat_results):
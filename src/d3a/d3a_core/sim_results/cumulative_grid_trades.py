@@ -18,7 +18,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 from d3a.constants import FLOATING_POINT_TOLERANCE
 from d3a.d3a_core.sim_results import is_cell_tower_type, is_load_node_type, \
     is_producer_node_type, is_prosumer_node_type, is_buffer_node_type, area_sells_to_child, \
-    child_buys_from_area
+    child_buys_from_area, index_area_dicts
 from d3a.d3a_core.util import area_name_from_area_or_iaa_name, add_or_create_key, \
     make_iaa_name_from_dict, subtract_or_create_key, round_floats_for_ui
 
@@ -29,12 +29,46 @@ class CumulativeGridTrades:
         self.current_balancing_trades = {}
         self.accumulated_trades = {}
         self.accumulated_balancing_trades = {}
+        self._area_dict = None
+        self._area_dicts = {}
 
-    def update(self, area_dict, flattened_area_core_stats_dict):
-        self.accumulated_trades, self.current_trades = \
-            self.export_cumulative_grid_trades(
-                area_dict, flattened_area_core_stats_dict, self.accumulated_trades
-            )
+    def update(self, area_dict, flattened_area_core_stats_dict, traded_area_uuids=None):
+        """
+        :param traded_area_uuids: uuids of the areas whose markets had trades in the last
+        market slot. If given, only the results that these trades change are updated,
+        otherwise (and whenever the area tree changed) the results of all areas are rebuilt.
+        """
+        if traded_area_uuids is None or area_dict is not self._area_dict:
+            self.accumulated_trades, self.current_trades = \
+                self.export_cumulative_grid_trades(
+                    area_dict, flattened_area_core_stats_dict, self.accumulated_trades
+                )
+            self._area_dict = area_dict
+            self._area_dicts = index_area_dicts(area_dict)
+        else:
+            self._update_traded_areas(flattened_area_core_stats_dict, traded_area_uuids)
+
+    def _update_traded_areas(self, flattened_area_core_stats_dict, traded_area_uuids):
+        # The trades of a market change the results of the children of the area, and the
+        # results of the area itself (trades with the parent market)
+        updated_children = {}
+        for area_uuid in traded_area_uuids:
+            area = self._area_dicts[area_uuid]
+            for child in area['children']:
+                updated_children[child['uuid']] = (child, area)
+            if area['parent_uuid'] in self._area_dicts:
+                updated_children[area_uuid] = (area, self._area_dicts[area['parent_uuid']])
+
+        updated_areas = {}
+        for child, area in updated_children.values():
+            self._accumulate_child_trades(child, area, flattened_area_core_stats_dict,
+                                          self.accumulated_trades)
+            updated_areas[area['uuid']] = area
+            if child['children']:
+                updated_areas[child['uuid']] = child
+        for area in updated_areas.values():
+            self.current_trades[area['uuid']] = self._area_cumulative_trades(
+                self.accumulated_trades, area, self._area_dicts.get(area['parent_uuid']))
 
     @staticmethod
     def export_cumulative_grid_trades(area_dict, flattened_area_core_stats_dict,
@@ -51,38 +85,49 @@ class CumulativeGridTrades:
     def accumulate_grid_trades_all_devices(cls, area_dict, flattened_area_core_stats_dict,
                                            accumulated_trades):
         for child_dict in area_dict['children']:
-            if is_cell_tower_type(child_dict):
-                accumulated_trades = CumulativeGridTrades._accumulate_load_trades(
-                    child_dict, area_dict, flattened_area_core_stats_dict, accumulated_trades,
-                    is_cell_tower=True
-                )
-            if is_load_node_type(child_dict):
-                accumulated_trades = CumulativeGridTrades._accumulate_load_trades(
-                    child_dict, area_dict, flattened_area_core_stats_dict, accumulated_trades,
-                    is_cell_tower=False
-                )
-            if is_producer_node_type(child_dict):
-                accumulated_trades = CumulativeGridTrades._accumulate_producer_trades(
-                    child_dict, area_dict, flattened_area_core_stats_dict, accumulated_trades
-                )
-            elif is_prosumer_node_type(child_dict) or is_buffer_node_type(child_dict):
-                accumulated_trades = \
-                    CumulativeGridTrades._accumulate_storage_trade(
-                        child_dict, area_dict, flattened_area_core_stats_dict, accumulated_trades
-                    )
-
-            elif child_dict['children'] == []:
-                # Leaf node, no need for calculating cumulative trades, continue iteration
-                continue
-            else:
-                accumulated_trades = CumulativeGridTrades._accumulate_area_trades(
-                    child_dict, area_dict, flattened_area_core_stats_dict, accumulated_trades
-                )
+            if cls._accumulate_child_trades(child_dict, area_dict, flattened_area_core_stats_dict,
+                                            accumulated_trades):
                 accumulated_trades = cls.accumulate_grid_trades_all_devices(
                     child_dict, flattened_area_core_stats_dict, accumulated_trades
                 )
         return accumulated_trades
 
+    @classmethod
+    def _accumulate_child_trades(cls, child_dict, area_dict, flattened_area_core_stats_dict,
+                                 accumulated_trades):
+        """
+        Accumulates the trades of child_dict in the market of area_dict (and in its own market
+        if child_dict is an area).
+        :return: True if child_dict is an area, whose children have to be accumulated as well
+        """
+        if is_cell_tower_type(child_dict):
+            CumulativeGridTrades._accumulate_load_trades(
+                child_dict, area_dict, flattened_area_core_stats_dict, accumulated_trades,
+                is_cell_tower=True
+            )
+        if is_load_node_type(child_dict):
+            CumulativeGridTrades._accumulate_load_trades(
+                child_dict, area_dict, flattened_area_core_stats_dict, accumulated_trades,
+                is_cell_tower=False
+            )
+        if is_producer_node_type(child_dict):
+            CumulativeGridTrades._accumulate_producer_trades(
+                child_dict, area_dict, flattened_area_core_stats_dict, accumulated_trades
+            )
+        elif is_prosumer_node_type(child_dict) or is_buffer_node_type(child_dict):
+            CumulativeGridTrades._accumulate_storage_trade(
+                child_dict, area_dict, flattened_area_core_stats_dict, accumulated_trades
+            )
+        elif child_dict['children'] == []:
+            # Leaf node, no need for calculating cumulative trades
+            return False
+        else:
+            CumulativeGridTrades._accumulate_area_trades(
+                child_dict, area_dict, flattened_area_core_stats_dict, accumulated_trades
+            )
+            return True
+        return False
+
     @classmethod
     def _accumulate_load_trades(cls, load, grid, flattened_area_core_stats_dict,
                                 accumulated_trades, is_cell_tower):
@@ -170,7 +215,7 @@ class CumulativeGridTrades:
                 "spentToExternal": {},
             }
         area_IAA_name = make_iaa_name_from_dict(area)
-        child_names = [area_name_from_area_or_iaa_name(c['name']) for c in area['children']]
+        child_names = {area_name_from_area_or_iaa_name(c['name']) for c in area['children']}
         area_trades = flattened_area_core_stats_dict.get(area['uuid'], {}).get('trades', [])
 
         for trade in area_trades:
@@ -222,21 +267,26 @@ class CumulativeGridTrades:
         if area['children'] == []:
             return results
 
-        results[area['uuid']] = [CumulativeGridTrades.generate_area_cumulative_trade_redis(
+        results[area['uuid']] = cls._area_cumulative_trades(accumulated_trades, area, parent)
+
+        for child in area['children']:
+            results = cls.generate_cumulative_grid_trades_for_all_areas(
+                accumulated_trades, child, area, results
+            )
+        return results
+
+    @classmethod
+    def _area_cumulative_trades(cls, accumulated_trades, area, parent):
+        area_results = [CumulativeGridTrades.generate_area_cumulative_trade_redis(
                 child, area, accumulated_trades
             )
             for child in area['children']
             if child['name'] in accumulated_trades
         ]
         if parent is not None:
-            results[area['uuid']].append(CumulativeGridTrades._external_trade_entries(
+            area_results.append(CumulativeGridTrades._external_trade_entries(
                 area, accumulated_trades))
-
-        for child in area['children']:
-            results = cls.generate_cumulative_grid_trades_for_all_areas(
-                accumulated_trades, child, area, results
-            )
-        return results
+        return area_results
 
     @classmethod
     def _area_trade_from_parent(cls, area, parent, flattened_area_core_stats_dict,
@@ -15,31 +15,23 @@ class DeviceStatistics:
         self.should_export_plots = should_export_plots
 
     @staticmethod
-    def _calc_min_max_from_sim_dict(subdict: Dict, key: str):
+    def _calc_min_max_from_sim_dict(subdict: Dict, key: str, current_market_slot):
+        """
+        Update the min / max statistics of the current market slot only, the statistics of
+        the previous slots do not change anymore.
+        """
+        value = subdict[key].get(current_market_slot)
+        value = [] if value is None else value
+        value = [value] if not isinstance(value, list) else value
 
-        min_trade_stats_daily = {}
-        max_trade_stats_daily = {}
-        indict = subdict[key]
-
-        trade_stats_daily = dict((k, []) for k, v in indict.items())
-        for time, value in indict.items():
-            value = [] if value is None else value
-            value = [value] if not isinstance(value, list) else value
-            trade_stats_daily[time] += value
-
-        for time_str, value in trade_stats_daily.items():
-            min_trade_stats_daily[time_str] = limit_float_precision(min(value)) \
-                if len(value) > 0 else FILL_VALUE
-            max_trade_stats_daily[time_str] = limit_float_precision(max(value)) \
-                if len(value) > 0 else FILL_VALUE
-
-        min_trade_stats = dict((time, min_trade_stats_daily[time])
-                               for time in indict.keys())
-        max_trade_stats = dict((time, max_trade_stats_daily[time])
-                               for time in indict.keys())
-
-        create_or_update_subdict(subdict, f"min_{key}", min_trade_stats)
-        create_or_update_subdict(subdict, f"max_{key}", max_trade_stats)
+        create_or_update_subdict(
+            subdict, f"min_{key}",
+            {current_market_slot: limit_float_precision(min(value))
+             if len(value) > 0 else FILL_VALUE})
+        create_or_update_subdict(
+            subdict, f"max_{key}",
+            {current_market_slot: limit_float_precision(max(value))
+             if len(value) > 0 else FILL_VALUE})
 
     @classmethod
     def _device_price_stats(cls, area_dict: Dict, subdict: Dict, core_stats, current_market_slot):
@@ -60,7 +52,7 @@ class DeviceStatistics:
                 subdict, key_name,
                 {current_market_slot: FILL_VALUE})
 
-        cls._calc_min_max_from_sim_dict(subdict, key_name)
+        cls._calc_min_max_from_sim_dict(subdict, key_name, current_market_slot)
 
     @classmethod
     def _device_energy_stats(cls, area_dict: Dict, subdict: Dict, core_stats: Dict,
@@ -88,7 +80,7 @@ class DeviceStatistics:
         create_or_update_subdict(
             subdict, key_name,
             {current_market_slot: traded_energy})
-        cls._calc_min_max_from_sim_dict(subdict, key_name)
+        cls._calc_min_max_from_sim_dict(subdict, key_name, current_market_slot)
 
     @classmethod
     def calculate_stats_for_infinite_bus(cls, area_dict, subdict, core_stats, current_market_slot):
@@ -108,11 +100,11 @@ class DeviceStatistics:
         create_or_update_subdict(
             subdict, sold_key_name,
             {current_market_slot: sold_traded_energy})
-        cls._calc_min_max_from_sim_dict(subdict, sold_key_name)
+        cls._calc_min_max_from_sim_dict(subdict, sold_key_name, current_market_slot)
         create_or_update_subdict(
             subdict, bought_key_name,
             {current_market_slot: bought_traded_energy})
-        cls._calc_min_max_from_sim_dict(subdict, bought_key_name)
+        cls._calc_min_max_from_sim_dict(subdict, bought_key_name, current_market_slot)
 
     @classmethod
     def _pv_production_stats(cls, area_dict: Dict, subdict: Dict, core_stats=None,
@@ -127,7 +119,7 @@ class DeviceStatistics:
             subdict, key_name,
             {current_market_slot: core_stats[area_dict["uuid"]][key_name]})
 
-        cls._calc_min_max_from_sim_dict(subdict, key_name)
+        cls._calc_min_max_from_sim_dict(subdict, key_name, current_market_slot)
 
     @classmethod
     def _soc_stats(cls, area_dict: Dict, subdict: Dict, core_stats=None, current_market_slot=None):
@@ -140,7 +132,7 @@ class DeviceStatistics:
             subdict, key_name,
             {current_market_slot: core_stats[area_dict["uuid"]][key_name]})
 
-        cls._calc_min_max_from_sim_dict(subdict, key_name)
+        cls._calc_min_max_from_sim_dict(subdict, key_name, current_market_slot)
 
     @classmethod
     def _load_profile_stats(cls, area_dict: Dict, subdict: Dict, core_stats=None,
@@ -155,7 +147,7 @@ class DeviceStatistics:
             {current_market_slot: core_stats[area_dict["uuid"]][key_name]}
         )
 
-        cls._calc_min_max_from_sim_dict(subdict, key_name)
+        cls._calc_min_max_from_sim_dict(subdict, key_name, current_market_slot)
 
     def update(self, area_result_dict=None, core_stats=None, current_market_slot=None):
         if area_result_dict is None:
@@ -214,6 +206,6 @@ class DeviceStatistics:
                 subdict, "production_kWh",
                 {current_market_slot: core_stats[area_dict["uuid"]]["production_kWh"]}
             )
-            cls._calc_min_max_from_sim_dict(subdict, "production_kWh")
+            cls._calc_min_max_from_sim_dict(subdict, "production_kWh", current_market_slot)
 
         flat_result_dict[area_dict["uuid"]] = subdict.copy()
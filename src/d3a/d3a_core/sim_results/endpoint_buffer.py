@@ -27,6 +27,7 @@ from d3a.d3a_core.sim_results.area_market_stock_stats import OfferBidTradeGraphS
 from d3a_interface.utils import convert_pendulum_to_str_in_dict
 from d3a.d3a_core.sim_results.energy_trade_profile import EnergyTradeProfile
 from d3a.d3a_core.sim_results.cumulative_grid_trades import CumulativeGridTrades
+from d3a.d3a_core.sim_results import trades_by_participant
 from d3a.models.strategy.pv import PVStrategy
 from d3a.models.strategy.storage import StorageStrategy
 from d3a.models.strategy.load_hours import LoadHoursStrategy
@@ -52,7 +53,13 @@ class SimulationEndpointBuffer:
         self.random_seed = initial_params["seed"] if initial_params["seed"] is not None else ''
         self.status = {}
         self.area_result_dict = self._create_area_tree_dict(area)
+        self.update_results_area_uuids(area)
+        self._area_tree_changed = False
         self.flattened_area_core_stats_dict = {}
+        # Delta of the last market slot: areas whose markets had trades or charged fees (in
+        # the order of the area tree), and devices that did not trade all their energy
+        self.traded_area_uuids = []
+        self.penalized_device_uuids = []
         self.simulation_progress = {
             "eta_seconds": 0,
             "elapsed_time_seconds": 0,
@@ -100,6 +107,13 @@ class SimulationEndpointBuffer:
             )
         return area_result_dict
 
+    def area_tree_changed(self):
+        """
+        Marks the area tree as changed (e.g. by a live event), the tree dict and the result
+        area uuids are rebuilt with the next stats update instead of every market slot
+        """
+        self._area_tree_changed = True
+
     def update_results_area_uuids(self, area):
         if area.strategy is not None or (area.strategy is None and area.children):
             self.result_area_uuids.update({area.uuid})
@@ -154,7 +168,18 @@ class SimulationEndpointBuffer:
             "simulation_state": self.simulation_state
         }
 
-    def _populate_core_stats_and_sim_state(self, area):
+    @staticmethod
+    def _device_trades(area, parent_trades_by_participant):
+        if area.parent.current_market is None:
+            return []
+        if parent_trades_by_participant is None:
+            return [t.serializable_dict()
+                    for t in area.strategy.trades[area.parent.current_market]]
+        # The trades of the parent market have already been serialized, reuse them instead
+        # of scanning and serializing all parent trades once more for every device
+        return parent_trades_by_participant.get(area.name, [])
+
+    def _populate_core_stats_and_sim_state(self, area, parent_trades_by_participant=None):
         if area.uuid not in self.flattened_area_core_stats_dict:
             self.flattened_area_core_stats_dict[area.uuid] = {}
         if self.current_market_time_slot_str == "":
@@ -171,6 +196,8 @@ class SimulationEndpointBuffer:
                 core_stats_dict['trades'].append(trade.serializable_dict())
         if hasattr(area.current_market, 'market_fee'):
             core_stats_dict['market_fee'] = area.current_market.market_fee
+        if area.children and (core_stats_dict['trades'] or core_stats_dict['market_fee']):
+            self.traded_area_uuids.append(area.uuid)
         if area.strategy is None:
             core_stats_dict['area_throughput'] = {
                 'baseline_peak_energy_import_kWh': area.baseline_peak_energy_import_kWh,
@@ -193,16 +220,16 @@ class SimulationEndpointBuffer:
                                                                  0)
             core_stats_dict['available_energy_kWh'] = \
                 area.strategy.state.available_energy_kWh.get(self.current_market_time_slot, 0)
-            if area.parent.current_market is not None:
-                for t in area.strategy.trades[area.parent.current_market]:
-                    core_stats_dict['trades'].append(t.serializable_dict())
+            if core_stats_dict['available_energy_kWh']:
+                self.penalized_device_uuids.append(area.uuid)
+            core_stats_dict['trades'].extend(
+                self._device_trades(area, parent_trades_by_participant))
 
         elif isinstance(area.strategy, StorageStrategy):
             core_stats_dict['soc_history_%'] = \
                 area.strategy.state.charge_history.get(self.current_market_time_slot, 0)
-            if area.parent.current_market is not None:
-                for t in area.strategy.trades[area.parent.current_market]:
-                    core_stats_dict['trades'].append(t.serializable_dict())
+            core_stats_dict['trades'].extend(
+                self._device_trades(area, parent_trades_by_participant))
 
         elif isinstance(area.strategy, LoadHoursStrategy):
             core_stats_dict['load_profile_kWh'] = \
@@ -213,33 +240,38 @@ class SimulationEndpointBuffer:
             core_stats_dict['energy_requirement_kWh'] = \
                 area.strategy.energy_requirement_Wh.get(
                     self.current_market_time_slot, 0) / 1000.0
+            if core_stats_dict['energy_requirement_kWh']:
+                self.penalized_device_uuids.append(area.uuid)
 
-            if area.parent.current_market is not None:
-                for t in area.strategy.trades[area.parent.current_market]:
-                    core_stats_dict['trades'].append(t.serializable_dict())
+            core_stats_dict['trades'].extend(
+                self._device_trades(area, parent_trades_by_participant))
 
         elif type(area.strategy) == FinitePowerPlant:
             core_stats_dict['production_kWh'] = area.strategy.energy_per_slot_kWh
-            if area.parent.current_market is not None:
-                for t in area.strategy.trades[area.parent.current_market]:
-                    core_stats_dict['trades'].append(t.serializable_dict())
+            core_stats_dict['trades'].extend(
+                self._device_trades(area, parent_trades_by_participant))
 
         elif type(area.strategy) in [InfiniteBusStrategy, MarketMakerStrategy]:
             core_stats_dict['energy_rate'] = \
                 area.strategy.energy_rate[area.parent.current_market.time_slot]
-            if area.parent.current_market is not None:
-                for t in area.strategy.trades[area.parent.current_market]:
-                    core_stats_dict['trades'].append(t.serializable_dict())
+            core_stats_dict['trades'].extend(
+                self._device_trades(area, parent_trades_by_participant))
 
         self.flattened_area_core_stats_dict[area.uuid] = core_stats_dict
 
         self.simulation_state["areas"][area.uuid] = area.get_state()
 
-        for child in area.children:
-            self._populate_core_stats_and_sim_state(child)
+        if area.children:
+            area_trades_by_participant = trades_by_participant(core_stats_dict['trades'])
+            for child in area.children:
+                self._populate_core_stats_and_sim_state(child, area_trades_by_participant)
 
     def update_stats(self, area, simulation_status, progress_info, sim_state):
-        self.area_result_dict = self._create_area_tree_dict(area)
+        if self._area_tree_changed:
+            self.area_result_dict = self._create_area_tree_dict(area)
+            self.result_area_uuids = set()
+            self.update_results_area_uuids(area)
+            self._area_tree_changed = False
         self.status = simulation_status
         if area.current_market is not None:
             self.current_market_time_slot_str = area.current_market.time_slot_str
@@ -248,6 +280,8 @@ class SimulationEndpointBuffer:
             self.current_market_time_slot_unix = area.current_market.time_slot.timestamp()
             self.current_market_time_slot = area.current_market.time_slot
         self.simulation_state["general"] = sim_state
+        self.traded_area_uuids = []
+        self.penalized_device_uuids = []
         self._populate_core_stats_and_sim_state(area)
         self.simulation_progress = {
             "eta_seconds": progress_info.eta.seconds if progress_info.eta else None,
@@ -255,14 +289,20 @@ class SimulationEndpointBuffer:
             "percentage_completed": int(progress_info.percentage_completed)
         }
 
+        # The trade based results are only updated for the areas of the slot delta, they are
+        # rebuilt for all areas whenever the area tree dict changed
         self.cumulative_grid_trades.update(self.area_result_dict,
-                                           self.flattened_area_core_stats_dict)
+                                           self.flattened_area_core_stats_dict,
+                                           self.traded_area_uuids)
         if self.current_market_time_slot_str != "":
-            self.market_bills.update(self.area_result_dict, self.flattened_area_core_stats_dict)
+            self.market_bills.update(self.area_result_dict, self.flattened_area_core_stats_dict,
+                                     self.traded_area_uuids)
 
         self.cumulative_bills.update_cumulative_bills(self.area_result_dict,
                                                       self.flattened_area_core_stats_dict,
-                                                      self.current_market_time_slot_str)
+                                                      self.current_market_time_slot_str,
+                                                      self.traded_area_uuids,
+                                                      self.penalized_device_uuids)
 
         self.market_unmatched_loads.update_unmatched_loads(
             self.area_result_dict, self.flattened_area_core_stats_dict,
@@ -299,8 +339,6 @@ class SimulationEndpointBuffer:
                 ConstSettings.GeneralSettings.EXPORT_ENERGY_TRADE_PROFILE_HR:
             self.area_market_stocks_stats.update(area)
 
-        self.result_area_uuids = set()
-        self.update_results_area_uuids(area)
         self.update_offer_bid_trade()
 
     def update_area_aggregated_stats(self, area_dict):
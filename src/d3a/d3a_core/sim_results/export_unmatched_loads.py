@@ -61,49 +61,73 @@ class ExportUnmatchedLoads:
 
     def get_current_market_results(self, area_dict={}, core_stats={},
                                    current_market_time_slot_str=None):
-        unmatched_loads = self.arrange_output(self.append_device_type(
-            self.expand_to_ul_to_hours(
-                self.expand_ul_to_parents(
-                    self.find_unmatched_loads(area_dict, core_stats, {},
-                                              current_market_time_slot_str)[area_dict['name']],
-                    area_dict['name'], {}
-                ), current_market_time_slot_str)), area_dict)
+        """
+        Unmatched loads of the last market, for every area the unmatched load counts of its
+        children. The area tree is traversed once, whether a subtree contains an unmatched load
+        is passed up to the parents instead of being collected again for every ancestor.
+        """
+        unmatched_loads = {}
+        if not area_dict.get('children'):
+            return unmatched_loads, {}
+        self._add_area_results(area_dict, core_stats, current_market_time_slot_str,
+                               unmatched_loads)
         return unmatched_loads, self.change_name_to_uuid(unmatched_loads)
 
-    def find_unmatched_loads(self, area_dict, core_stats, indict, current_market_time_slot_str):
+    def _add_area_results(self, area_dict, core_stats, current_market_time_slot_str,
+                          unmatched_loads):
         """
-        Aggregates list of times for each unmatched time slot for each load
+        Adds the unmatched loads of the children of area_dict (and of their subtrees) to
+        unmatched_loads.
+        :return: Tuple with the result of the area for its parent (None if the area has no
+        loads to report) and whether a load in the subtree of the area is unmatched
         """
-        indict[area_dict['name']] = {}
+        unmatched_loads[area_dict['name']] = {}
+        area_results = {}
+        unmatched_times = {}
+        is_reported = False
         for child in area_dict['children']:
             self.name_uuid_map[child['name']] = child['uuid']
             self.name_type_map[child['name']] = child['type']
             if child['children']:
-                indict[area_dict['name']] = self.find_unmatched_loads(
-                    child, core_stats, indict[area_dict['name']], current_market_time_slot_str
-                )
+                child_results, is_unmatched = self._add_area_results(
+                    child, core_stats, current_market_time_slot_str, unmatched_loads)
+            elif (is_load_node_type(child) or is_cell_tower_type(child)) and \
+                    core_stats.get(child['uuid'], {}) != {}:
+                is_unmatched = self._is_unmatched_load(child, core_stats)
+                child_results = self._market_results(
+                    child, current_market_time_slot_str,
+                    {child['name']: [current_market_time_slot_str]} if is_unmatched else {})
+                unmatched_loads[child['name']] = child_results
             else:
-                if (is_load_node_type(child) or is_cell_tower_type(child)) and \
-                        core_stats.get(child['uuid'], {}) != {}:
-                    indict[area_dict['name']][child['name']] = \
-                        self._calculate_unmatched_loads_leaf_area(child, core_stats,
-                                                                  current_market_time_slot_str)
-        return indict
-
-    @classmethod
-    def _calculate_unmatched_loads_leaf_area(cls, area_dict, core_stats,
-                                             current_market_time_slot_str):
-        """
-        actually determines the unmatched loads
-        """
-        unmatched_times = []
+                continue
+            is_reported = True
+            if child_results is not None:
+                area_results[child['name']] = child_results
+            if is_unmatched:
+                unmatched_times[child['name']] = [current_market_time_slot_str]
+        unmatched_loads[area_dict['name']] = area_results
+        if not is_reported:
+            return None, False
+        return self._market_results(area_dict, current_market_time_slot_str, unmatched_times), \
+            len(unmatched_times) > 0
+
+    def _market_results(self, area_dict, current_market_time_slot_str, unmatched_times):
+        if unmatched_times:
+            market_results = {"unmatched_count": len(unmatched_times),
+                              "unmatched_times": unmatched_times}
+        else:
+            market_results = {"unmatched_count": 0}
+        return {
+            "unmatched_loads": {current_market_time_slot_str: market_results},
+            "type": self.name_type_map[area_dict['name']]
+        }
+
+    @staticmethod
+    def _is_unmatched_load(area_dict, core_stats):
         desired_energy_kWh = core_stats[area_dict['uuid']]['load_profile_kWh']
         traded_energy_kWh = sum(trade['energy']
                                 for trade in core_stats[area_dict['uuid']]['trades'])
-        deficit = desired_energy_kWh - traded_energy_kWh
-        if deficit > FLOATING_POINT_TOLERANCE:
-            unmatched_times.append(current_market_time_slot_str)
-        return {"unmatched_times": unmatched_times}
+        return desired_energy_kWh - traded_energy_kWh > FLOATING_POINT_TOLERANCE
 
     def change_name_to_uuid(self, indict):
         """
@@ -114,90 +138,6 @@ class ExportUnmatchedLoads:
             new[self.name_uuid_map[k]] = v
         return new
 
-    def _accumulate_all_uls_in_branch(self, subdict, unmatched_list) -> list:
-        """
-        aggregate all unmatched loads times in one branch into one list
-        """
-        for key in subdict.keys():
-            if key == "unmatched_times":
-                return unmatched_list + subdict[key]
-            else:
-                unmatched_list = self._accumulate_all_uls_in_branch(subdict[key], unmatched_list)
-        return unmatched_list
-
-    def expand_ul_to_parents(self, subdict, parent_name, outdict):
-        """
-        expand unmatched loads times to all nodes including all unmatched loads times of the
-        sub branch
-        """
-
-        for node_name, subsubdict in subdict.items():
-            if isinstance(subsubdict, dict):
-                # nodes
-                ul_list = self._accumulate_all_uls_in_branch(subsubdict, [])
-                sub_ul = sorted(list(set(ul_list)))
-                if parent_name in outdict:
-                    outdict[parent_name].update({node_name: sub_ul})
-                else:
-                    outdict[parent_name] = {node_name: sub_ul}
-                outdict.update(self.expand_ul_to_parents(subsubdict, node_name, {}))
-            else:
-                # leafs
-                outdict[parent_name] = {parent_name: subsubdict}
-
-        return outdict
-
-    @classmethod
-    def _get_hover_info(cls, indict, slot_time):
-        """
-        returns dict of UL for each subarea for the hover the UL graph
-        """
-        hover_dict = {}
-        ul_count = 0
-        for child_name, child_ul_list in indict.items():
-            for time in child_ul_list:
-                if time[11:13] == slot_time[11:13] and time[8:10] == slot_time[8:10] and \
-                   time[5:7] == slot_time[5:7] and time[:4] == slot_time[:4]:
-                    ul_count += 1
-                    if child_name in hover_dict:
-                        hover_dict[child_name].append(time)
-                    else:
-                        hover_dict[child_name] = [time]
-        if hover_dict == {}:
-            return {"unmatched_count": 0}
-        else:
-            return {"unmatched_count": ul_count, "unmatched_times": hover_dict}
-
-    def expand_to_ul_to_hours(self, indict, current_market_time_slot_str):
-        """
-        Changing format to dict of hour time stamps
-        """
-        outdict = {}
-        for node_name, subdict in indict.items():
-            outdict[node_name] = {}
-            outdict[node_name][current_market_time_slot_str] = \
-                self._get_hover_info(subdict, current_market_time_slot_str)
-        return outdict
-
-    def append_device_type(self, indict):
-        outdict = {}
-        for name, unmatched_times in indict.items():
-            outdict[name] = {
-                "unmatched_loads": unmatched_times,
-                "type": self.name_type_map[name]
-            }
-        return outdict
-
-    def arrange_output(self, indict, area_dict):
-        if area_dict['children']:
-            indict[area_dict['name']] = {}
-            for child in area_dict['children']:
-                if child['children'] or is_load_node_type(child) or is_cell_tower_type(child):
-                    if child['name'] in indict:
-                        indict[area_dict['name']][child['name']] = indict[child['name']]
-                    self.arrange_output(indict, child)
-        return indict
-
 
 class MarketUnmatchedLoads:
     """
@@ -20,6 +20,7 @@ from d3a.models.strategy.predefined_load import DefinedLoadStrategy
 from d3a.models.strategy.storage import StorageStrategy
 from d3a.models.strategy.pv import PVStrategy
 from d3a_interface.constants_limits import ConstSettings
+from d3a.d3a_core.export_writer import ExportedMarkets
 
 
 class FileExportEndpoints:
@@ -29,6 +30,7 @@ class FileExportEndpoints:
         self.cumulative_offers = {}
         self.cumulative_bids = {}
         self.clearing = {}
+        self.exported_markets = ExportedMarkets()
 
     def __call__(self, area):
         self._populate_area_children_data(area)
@@ -47,7 +49,9 @@ class FileExportEndpoints:
         data = self.generate_market_export_data(area, balancing)
         if area.slug not in out_dict:
             out_dict[area.slug] = dict((key, []) for key in data.labels())
-        for row in data.rows():
+        new_markets = self.exported_markets.new_markets((area.slug, balancing),
+                                                        data.past_markets)
+        for row in data.market_rows(new_markets):
             for ii, label in enumerate(data.labels()):
                 out_dict[area.slug][label].append(row[ii])
 
@@ -84,6 +88,12 @@ class ExportData:
     def create(area):
         return ExportUpperLevelData(area) if len(area.children) > 0 else ExportLeafData(area)
 
+    def rows(self):
+        return self.market_rows(self.past_markets)
+
+    def market_rows(self, markets):
+        return [self._row(m.time_slot, m) for m in markets]
+
 
 class ExportUpperLevelData(ExportData):
     def __init__(self, area):
@@ -98,8 +108,9 @@ class ExportUpperLevelData(ExportData):
                 'total energy traded [kWh]',
                 'total trade volume [EURO ct.]']
 
-    def rows(self):
-        return [self._row(m.time_slot, m) for m in self.area.past_markets]
+    @property
+    def past_markets(self):
+        return self.area.past_markets
 
     def _row(self, slot, market):
         return [slot,
@@ -111,17 +122,15 @@ class ExportUpperLevelData(ExportData):
                 sum(trade.offer.price for trade in market.trades)]
 
 
-class ExportBalancingData:
-    def __init__(self, area):
-        self.area = area
-
+class ExportBalancingData(ExportData):
     def labels(self):
         return ['slot',
                 'avg supply balancing trade rate [ct./kWh]',
                 'avg demand balancing trade rate [ct./kWh]']
 
-    def rows(self):
-        return [self._row(m.time_slot, m) for m in self.area.past_balancing_markets]
+    @property
+    def past_markets(self):
+        return self.area.past_balancing_markets
 
     def _row(self, slot, market):
         return [slot,
@@ -147,8 +156,9 @@ class ExportLeafData(ExportData):
             return ['produced to trade [kWh]', 'not sold [kWh]', 'forecast / generation [kWh]']
         return []
 
-    def rows(self):
-        return [self._row(m.time_slot, m) for m in self.area.parent.past_markets]
+    @property
+    def past_markets(self):
+        return self.area.parent.past_markets
 
     def _traded(self, market):
         return market.traded_energy[self.area.name] \
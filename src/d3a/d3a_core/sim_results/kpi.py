@@ -15,18 +15,21 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
-from d3a.d3a_core.util import if_not_in_list_append
 from d3a.d3a_core.sim_results import is_load_node_type, is_buffer_node_type, \
     is_prosumer_node_type, is_producer_node_type
 
+PRODUCER = "producer"
+CONSUMER = "consumer"
+ESS = "ess"
+BUFFER = "buffer"
+
 
 class KPIState:
     def __init__(self):
-        self.producer_list = list()
-        self.consumer_list = list()
-        self.areas_to_trace_list = list()
-        self.ess_list = list()
-        self.buffer_list = list()
+        # device name -> role of the device in the area (PRODUCER, CONSUMER, ESS or BUFFER)
+        self.device_roles = {}
+        # uuids of the areas whose trades are traced, in the order they were found
+        self.areas_to_trace = {}
         self.total_energy_demanded_wh = 0
         self.demanded_buffer_wh = 0
         self.total_energy_produced_wh = 0
@@ -36,15 +39,15 @@ class KPIState:
     def accumulate_devices(self, area_dict):
         for child in area_dict['children']:
             if is_producer_node_type(child):
-                if_not_in_list_append(self.producer_list, child['name'])
-                if_not_in_list_append(self.areas_to_trace_list, child['parent_uuid'])
+                self.device_roles.setdefault(child['name'], PRODUCER)
+                self.areas_to_trace.setdefault(child['parent_uuid'])
             elif is_load_node_type(child):
-                if_not_in_list_append(self.consumer_list, child['name'])
-                if_not_in_list_append(self.areas_to_trace_list, child['parent_uuid'])
+                self.device_roles.setdefault(child['name'], CONSUMER)
+                self.areas_to_trace.setdefault(child['parent_uuid'])
             elif is_prosumer_node_type(child):
-                if_not_in_list_append(self.ess_list, child['name'])
+                self.device_roles.setdefault(child['name'], ESS)
             elif is_buffer_node_type(child):
-                if_not_in_list_append(self.buffer_list, child['name'])
+                self.device_roles.setdefault(child['name'], BUFFER)
             if child['children']:
                 self.accumulate_devices(child)
 
@@ -56,49 +59,42 @@ class KPIState:
             if child['children']:
                 self._accumulate_total_energy_demanded(child, core_stats)
 
-    def _accumulate_self_production(self, trade):
-        # Trade seller origin should be equal to the trade seller in order to
-        # not double count trades in higher hierarchies
-        if trade['seller_origin'] in self.producer_list and \
-                trade['seller_origin'] == trade['seller']:
-            self.total_energy_produced_wh += trade['energy'] * 1000
-
-    def _accumulate_self_consumption(self, trade):
-        # Trade buyer origin should be equal to the trade buyer in order to
+    def _accumulate_producer_trade(self, trade, buyer_role, energy_wh):
+        # Trade seller / buyer origin should be equal to the trade seller / buyer in order to
         # not double count trades in higher hierarchies
-        if trade['seller_origin'] in self.producer_list and \
-                trade['buyer_origin'] in self.consumer_list and \
-                trade['buyer_origin'] == trade['buyer']:
-            self.total_self_consumption_wh += trade['energy'] * 1000
-
-    def _accumulate_self_consumption_buffer(self, trade):
-        if trade['seller_origin'] in self.producer_list and \
-                trade['buyer_origin'] in self.ess_list:
-            self.self_consumption_buffer_wh += trade['energy'] * 1000
-
-    def _dissipate_self_consumption_buffer(self, trade):
-        if trade['seller_origin'] in self.ess_list:
-            # self_consumption_buffer needs to be exhausted to total_self_consumption
-            # if sold to internal consumer
-            if trade['buyer_origin'] in self.consumer_list and \
-                    trade['buyer_origin'] == trade['buyer'] and \
-                    self.self_consumption_buffer_wh > 0:
-                if (self.self_consumption_buffer_wh - trade['energy'] * 1000) > 0:
-                    self.self_consumption_buffer_wh -= trade['energy'] * 1000
-                    self.total_self_consumption_wh += trade['energy'] * 1000
-                else:
-                    self.total_self_consumption_wh += self.self_consumption_buffer_wh
-                    self.self_consumption_buffer_wh = 0
-            # self_consumption_buffer needs to be exhausted if sold to any external agent
-            elif trade['buyer_origin'] not in [*self.ess_list, *self.consumer_list] and \
-                    trade['buyer_origin'] == trade['buyer'] and \
-                    self.self_consumption_buffer_wh > 0:
-                if (self.self_consumption_buffer_wh - trade['energy'] * 1000) > 0:
-                    self.self_consumption_buffer_wh -= trade['energy'] * 1000
-                else:
-                    self.self_consumption_buffer_wh = 0
-
-    def _accumulate_infinite_consumption(self, trade):
+        if trade['seller_origin'] == trade['seller']:
+            self.total_energy_produced_wh += energy_wh
+        if buyer_role == CONSUMER:
+            if trade['buyer_origin'] == trade['buyer']:
+                self.total_self_consumption_wh += energy_wh
+        elif buyer_role == ESS:
+            self.self_consumption_buffer_wh += energy_wh
+        elif buyer_role == BUFFER:
+            # The InfiniteBus below the referenced area bought from a child device,
+            # the energy is accounted as self consumption and as demand of the InfiniteBus
+            self.total_self_consumption_wh += energy_wh
+            self.demanded_buffer_wh += energy_wh
+
+    def _dissipate_self_consumption_buffer(self, trade, buyer_role, energy_wh):
+        if trade['buyer_origin'] != trade['buyer'] or self.self_consumption_buffer_wh <= 0:
+            return
+        # self_consumption_buffer needs to be exhausted to total_self_consumption
+        # if sold to internal consumer
+        if buyer_role == CONSUMER:
+            if (self.self_consumption_buffer_wh - energy_wh) > 0:
+                self.self_consumption_buffer_wh -= energy_wh
+                self.total_self_consumption_wh += energy_wh
+            else:
+                self.total_self_consumption_wh += self.self_consumption_buffer_wh
+                self.self_consumption_buffer_wh = 0
+        # self_consumption_buffer needs to be exhausted if sold to any external agent
+        elif buyer_role != ESS:
+            if (self.self_consumption_buffer_wh - energy_wh) > 0:
+                self.self_consumption_buffer_wh -= energy_wh
+            else:
+                self.self_consumption_buffer_wh = 0
+
+    def _accumulate_infinite_consumption(self, trade, buyer_role, energy_wh):
         """
         If the InfiniteBus is a seller of the trade when below the referenced area and bought
         by any of child devices.
@@ -106,35 +102,31 @@ class KPIState:
         * total_energy_produced_wh also needs to accumulated accounting of what
         the InfiniteBus has produced.
         """
-        if trade['seller_origin'] in self.buffer_list and \
-                trade['buyer_origin'] in self.consumer_list and \
-                trade['buyer_origin'] == trade['buyer']:
-            self.total_self_consumption_wh += trade['energy'] * 1000
-            self.total_energy_produced_wh += trade['energy'] * 1000
+        if buyer_role == CONSUMER and trade['buyer_origin'] == trade['buyer']:
+            self.total_self_consumption_wh += energy_wh
+            self.total_energy_produced_wh += energy_wh
 
-    def _dissipate_infinite_consumption(self, trade):
+    def _accumulate_trade(self, trade):
         """
-        If the InfiniteBus is a buyer of the trade when below the referenced area
-        and sold by any of child devices.
-        total_self_consumption_wh needs to accumulated.
-        demanded_buffer_wh also needs to accumulated accounting of what
-        the InfiniteBus has consumed/demanded.
+        Classifies the trade by the roles of its seller and buyer origin and applies it to the
+        accumulators of the seller role, every trade is therefore visited once.
         """
-        if trade['buyer_origin'] in self.buffer_list and \
-                trade['seller_origin'] in self.producer_list:
-            self.total_self_consumption_wh += trade['energy'] * 1000
-            self.demanded_buffer_wh += trade['energy'] * 1000
+        seller_role = self.device_roles.get(trade['seller_origin'])
+        if seller_role is None or seller_role == CONSUMER:
+            return
+        buyer_role = self.device_roles.get(trade['buyer_origin'])
+        energy_wh = trade['energy'] * 1000
+        if seller_role == PRODUCER:
+            self._accumulate_producer_trade(trade, buyer_role, energy_wh)
+        elif seller_role == ESS:
+            self._dissipate_self_consumption_buffer(trade, buyer_role, energy_wh)
+        else:
+            self._accumulate_infinite_consumption(trade, buyer_role, energy_wh)
 
     def _accumulate_energy_trace(self, core_stats):
-        for target_area_uuid in self.areas_to_trace_list:
-            target_core_stats = core_stats.get(target_area_uuid, {})
-            for trade in target_core_stats.get('trades', []):
-                self._accumulate_self_consumption(trade)
-                self._accumulate_self_production(trade)
-                self._accumulate_self_consumption_buffer(trade)
-                self._dissipate_self_consumption_buffer(trade)
-                self._accumulate_infinite_consumption(trade)
-                self._dissipate_infinite_consumption(trade)
+        for target_area_uuid in self.areas_to_trace:
+            for trade in core_stats.get(target_area_uuid, {}).get('trades', []):
+                self._accumulate_trade(trade)
 
     def update_area_kpi(self, area_dict, core_stats):
         self.total_energy_demanded_wh = 0
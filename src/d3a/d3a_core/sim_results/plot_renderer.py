@@ -0,0 +1,104 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from logging import getLogger
+
+import plotly as py
+import plotly.io as pio
+
+from d3a import constants
+
+log = getLogger(__name__)
+
+_plot_renderer = None
+
+
+def _write_plot(fig_json, output_file, data_only):
+    if data_only:
+        with open(output_file, 'w') as outfile:
+            outfile.write(fig_json)
+    else:
+        py.offline.plot(json.loads(fig_json), filename=output_file, auto_open=False,
+                        validate=False)
+
+
+class PlotRenderer:
+    """
+    Writes the figures of the export plots.
+
+    Figures are serialized when they are submitted and written to html files by a pool of
+    processes once render_pending() is called. A figure whose serialization did not change
+    since it was last written to the same file is not written again. In data-only mode the
+    figure json is written instead of the html page (<plot name>.json), which skips the html
+    writer completely.
+    """
+
+    def __init__(self, processes=None, data_only=None):
+        self._processes = processes
+        self._data_only = data_only
+        self._pending = {}
+        self._written_digests = {}
+
+    @property
+    def processes(self):
+        return constants.PLOT_RENDER_PROCESSES if self._processes is None else self._processes
+
+    @property
+    def data_only(self):
+        return constants.PLOT_DATA_ONLY if self._data_only is None else self._data_only
+
+    def submit(self, fig, output_file):
+        data_only = self.data_only
+        if data_only:
+            output_file = os.path.splitext(output_file)[0] + ".json"
+        fig_json = pio.to_json(fig, validate=False)
+        digest = hashlib.sha1(fig_json.encode()).hexdigest()
+        if self._written_digests.get(output_file) == digest and os.path.isfile(output_file):
+            return
+        self._pending[output_file] = (fig_json, digest, data_only)
+
+    def render_pending(self):
+        """Writes all submitted figures, returns when all files are written"""
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        jobs = [(fig_json, output_file, data_only)
+                for output_file, (fig_json, _, data_only) in pending.items()]
+        if self.processes == 0 or len(jobs) == 1:
+            for job in jobs:
+                _write_plot(*job)
+        else:
+            with ProcessPoolExecutor(max_workers=self.processes) as executor:
+                for _ in executor.map(_write_plot, *zip(*jobs)):
+                    pass
+        self._written_digests.update(
+            (output_file, digest) for output_file, (_, digest, _) in pending.items())
+        log.debug(f"Rendered {len(jobs)} plots.")
+
+
+def plot_renderer():
+    """
+    Returns the PlotRenderer of the process
+    """
+    global _plot_renderer
+    if _plot_renderer is None:
+        _plot_renderer = PlotRenderer()
+    return _plot_renderer
@@ -15,7 +15,6 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
-import plotly as py
 import plotly.graph_objs as go
 import pendulum
 import os
@@ -29,6 +28,7 @@ from d3a.models.strategy.infinite_bus import InfiniteBusStrategy
 from d3a.models.strategy.market_maker_strategy import MarketMakerStrategy
 from d3a.models.strategy.finite_power_plant import FinitePowerPlant
 from d3a import limit_float_precision
+from d3a.d3a_core.sim_results.plot_renderer import plot_renderer
 
 ENERGY_BUYER_SIGN_PLOTS = 1
 ENERGY_SELLER_SIGN_PLOTS = -1 * ENERGY_BUYER_SIGN_PLOTS
@@ -182,7 +182,7 @@ class PlotlyGraph:
                           yaxis=dict(title=ytitle), xaxis=dict(title=xtitle),
                           font=dict(size=16), showlegend=False, sliders=sliders)
 
-        py.offline.plot(fig, filename=output_file, auto_open=False)
+        plot_renderer().submit(fig, output_file)
 
     @classmethod
     def plot_bar_graph(cls, barmode: str, title: str, xtitle: str, ytitle: str, data, iname: str,
@@ -197,14 +197,14 @@ class PlotlyGraph:
             barmode, title, ytitle, xtitle, time_range, showlegend, hovermode=hovermode
         )
         fig = go.Figure(data=data, layout=layout)
-        py.offline.plot(fig, filename=iname, auto_open=False)
+        plot_renderer().submit(fig, iname)
 
     @classmethod
     def plot_line_graph(cls, title: str, xtitle: str, ytitle: str, data, iname: str, xmax: int):
         layout = cls.common_layout("group", title, ytitle, xtitle, [0, xmax])
 
         fig = go.Figure(data=data, layout=layout)
-        py.offline.plot(fig, filename=iname, auto_open=False)
+        plot_renderer().submit(fig, iname)
 
     def arrange_data(self):
         try:
@@ -236,7 +236,7 @@ class PlotlyGraph:
             fig["data"][0]["values"].append(value)
             fig["data"][0]["labels"].append(key)
 
-        py.offline.plot(fig, filename=filename, auto_open=False)
+        plot_renderer().submit(fig, filename)
 
     @classmethod
     def _plot_line_time_series(cls, device_dict, var_name, invert_y=False):
@@ -586,7 +586,7 @@ class PlotlyGraph:
             return
 
         fig = go.Figure(data=data, layout=layout)
-        py.offline.plot(fig, filename=output_file, auto_open=False)
+        plot_renderer().submit(fig, output_file)
 
     @staticmethod
     def _device_plot_layout(barmode, title, xaxis_caption, yaxis_caption_list):
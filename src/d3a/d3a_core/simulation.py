@@ -23,8 +23,6 @@ from time import sleep
 import click
 import platform
 import os
-import psutil
-import gc
 import sys
 import datetime
 
@@ -36,13 +34,14 @@ from d3a.constants import TIME_ZONE, DATE_TIME_FORMAT, SIMULATION_PAUSE_TIMEOUT
 from d3a.d3a_core.exceptions import SimulationException
 from d3a.d3a_core.export import ExportAndPlot
 from d3a.models.config import SimulationConfig
-from d3a.models.power_flow.pandapower import PandaPowerFlow
+from d3a.models.power_flow.linear import LinearPowerFlow
 # noinspection PyUnresolvedReferences
 from d3a import setup as d3a_setup  # noqa
 from d3a.d3a_core.util import NonBlockingConsole, validate_const_settings_for_simulation, \
     get_market_slot_time_str
 from d3a.d3a_core.sim_results.endpoint_buffer import SimulationEndpointBuffer
 from d3a.d3a_core.redis_connections.redis_communication import RedisSimulationCommunication
+from d3a.d3a_core.redis_connections.redis_area_market_communicator import channel_multiplexer
 from d3a_interface.constants_limits import ConstSettings, GlobalConfig
 from d3a_interface.exceptions import D3AException
 from d3a_interface.utils import format_datetime, str_to_pendulum_datetime
@@ -50,6 +49,9 @@ from d3a.models.area.event_deserializer import deserialize_events_to_areas
 from d3a.d3a_core.live_events import LiveEvents
 from d3a.d3a_core.sim_results.file_export_endpoints import FileExportEndpoints
 from d3a.d3a_core.global_objects import GlobalObjects
+from d3a.d3a_core.profiler import profiler
+from d3a.d3a_core.memory_telemetry import MemoryTelemetry, configure_garbage_collection, \
+    restore_garbage_collection
 import d3a.constants
 
 
@@ -84,7 +86,8 @@ class Simulation:
                  simulation_events: str = None, slowdown: int = 0, seed=None,
                  paused: bool = False, pause_after: duration = None, repl: bool = False,
                  no_export: bool = False, export_path: str = None,
-                 export_subdir: str = None, redis_job_id=None, enable_bc=False):
+                 export_subdir: str = None, redis_job_id=None, enable_bc=False,
+                 profile: bool = False):
         self.initial_params = dict(
             slowdown=slowdown,
             seed=seed,
@@ -97,6 +100,10 @@ class Simulation:
         self.use_repl = repl
         self.export_on_finish = not no_export
         self.export_path = export_path
+        self.profile = profile
+        profiler.enabled = profile
+        profiler.reset()
+        self.memory_telemetry = MemoryTelemetry()
 
         self.sim_status = "initializing"
         self.is_timed_out = False
@@ -183,9 +190,9 @@ class Simulation:
                                         self.file_stats_endpoint, self.endpoint_buffer)
         self._update_and_send_results()
 
+        self.power_flows = []
         if GlobalConfig.POWER_FLOW:
-            self.power_flow = PandaPowerFlow(self.area)
-            self.power_flow.run_power_flow()
+            self._init_power_flows()
         self.bc = None
         if self.use_bc:
             self.bc = BlockChainInterface()
@@ -194,6 +201,24 @@ class Simulation:
         self._set_traversal_length()
 
         self.area.activate(self.bc)
+        configure_garbage_collection()
+
+    def _init_power_flows(self):
+        """
+        The linear power flow is solved for every market slot, if pandapower is installed the
+        AC power flow of the nominal device powers is solved once as cross-check
+        """
+        from d3a.models.power_flow.pandapower import PandaPowerFlow, PANDAPOWER_INSTALLED
+        self.power_flows = [LinearPowerFlow(self.area)]
+        if PANDAPOWER_INSTALLED:
+            nominal_power_flow = PandaPowerFlow(self.area)
+            nominal_power_flow.run_power_flow()
+            self.power_flows.append(nominal_power_flow)
+
+    def _run_slot_power_flow(self):
+        for power_flow in self.power_flows:
+            if isinstance(power_flow, LinearPowerFlow):
+                power_flow.run_power_flow()
 
     @property
     def finished(self):
@@ -232,6 +257,7 @@ class Simulation:
                 self.paused_time = 0
 
             tick_resume = 0
+            self.memory_telemetry.start()
             try:
                 self._run_cli_execute_cycle(initial_slot, tick_resume) \
                     if self._started_from_cli \
@@ -242,6 +268,11 @@ class Simulation:
                 break
             else:
                 break
+            finally:
+                self.memory_telemetry.stop()
+                restore_garbage_collection()
+                if ConstSettings.GeneralSettings.EVENT_DISPATCHING_VIA_REDIS:
+                    channel_multiplexer().stop()
 
     def _run_cli_execute_cycle(self, slot_resume, tick_resume):
         with NonBlockingConsole() as console:
@@ -254,6 +285,7 @@ class Simulation:
         area.stats.update_aggregated_stats({"bills": bills})
         area.stats.kpi.update(endpoint_buffer.kpi.performance_indices_redis.get(area.uuid, {}))
 
+    @profiler.phase("update_and_send_results")
     def _update_and_send_results(self, is_final=False):
         self.endpoint_buffer.update_stats(
             self.area, self.status, self.progress_info, self.current_state)
@@ -351,16 +383,16 @@ class Simulation:
                 sleep(5)
                 break
 
-            self.live_events.handle_all_events(self.area)
+            if self.live_events.handle_all_events(self.area):
+                self.endpoint_buffer.area_tree_changed()
 
             self.global_objects.update(self.area)
 
-            self.area.cycle_markets()
+            with profiler.phase("market_cycle"):
+                self.area.cycle_markets()
+            self._run_slot_power_flow()
 
-            gc.collect()
-            process = psutil.Process(os.getpid())
-            mbs_used = process.memory_info().rss / 1000000.0
-            log.debug(f"Used {mbs_used} MBs.")
+            self.memory_telemetry.slot_started(slot_no)
 
             for tick_no in range(tick_resume, config.ticks_per_slot):
                 tick_start = time.time()
@@ -380,7 +412,8 @@ class Simulation:
                 self.simulation_config.external_redis_communicator.\
                     approve_aggregator_commands()
 
-                self.area.tick_and_dispatch()
+                with profiler.phase("tick"):
+                    self.area.tick_and_dispatch()
                 self.area.update_area_current_tick()
 
                 self.simulation_config.external_redis_communicator.\
@@ -401,12 +434,15 @@ class Simulation:
                 if d3a.constants.IS_CANARY_NETWORK:
                     sleep(abs(tick_lengths_s - realtime_tick_length))
 
+            profiler.count_market_orders(self.area)
             self._update_and_send_results()
             if self.export_on_finish and self.should_export_results:
-                self.export.data_to_csv(self.area, True if slot_no == 0 else False)
+                with profiler.phase("export"):
+                    self.export.data_to_csv(self.area, True if slot_no == 0 else False)
 
         self.sim_status = "finished"
         self.deactivate_areas(self.area)
+        self._run_slot_power_flow()
         self.simulation_config.external_redis_communicator.\
             publish_aggregator_commands_responses_events()
 
@@ -422,17 +458,24 @@ class Simulation:
         self._update_and_send_results(is_final=True)
         if self.export_on_finish and self.should_export_results:
             log.info("Exporting simulation data.")
-            self.export.data_to_csv(self.area, False)
-            self.export.area_tree_summary_to_json(self.endpoint_buffer.area_result_dict)
-            if GlobalConfig.POWER_FLOW:
+            with profiler.phase("export"):
+                self.export.data_to_csv(self.area, False)
+                self.export.area_tree_summary_to_json(self.endpoint_buffer.area_result_dict)
                 self.export.export(export_plots=self.should_export_results,
-                                   power_flow=self.power_flow)
-            else:
-                self.export.export(self.should_export_results)
+                                   power_flows=self.power_flows)
+
+        if self.profile:
+            profiler.write_report(self._profile_report_directory)
 
         if self.use_repl:
             self._start_repl()
 
+    @property
+    def _profile_report_directory(self):
+        if self.export_on_finish and self.should_export_results:
+            return str(self.export.directory)
+        return os.path.abspath(self.export_path or os.getcwd())
+
     @property
     def should_export_results(self):
         return not self.redis_connection.is_enabled()
@@ -0,0 +1,236 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import hashlib
+import json
+import os
+import time
+from itertools import product
+from logging import getLogger
+from multiprocessing import Pool
+
+from click.types import ParamType
+from pendulum import today
+
+from d3a_interface.constants_limits import ConstSettings
+from d3a_interface.exceptions import D3AException
+from d3a.constants import TIME_ZONE, DATE_FORMAT
+from d3a.d3a_core.util import IntervalType, DateType, update_advanced_settings
+from d3a.d3a_core.simulation import Simulation
+from d3a.models.config import SimulationConfig
+
+log = getLogger(__name__)
+
+# Basic settings that are passed to SimulationConfig, with their parsers
+BASIC_SETTINGS = {
+    "sim_duration": IntervalType('D:H'),
+    "slot_length": IntervalType('M:S'),
+    "tick_length": IntervalType('M:S'),
+    "market_count": int,
+    "cloud_coverage": int,
+    "start_date": DateType(DATE_FORMAT),
+}
+DEFAULT_BASIC_SETTINGS = {
+    "sim_duration": "1d",
+    "slot_length": "15m",
+    "tick_length": "1s",
+    "market_count": 1,
+    "cloud_coverage": ConstSettings.PVSettings.DEFAULT_POWER_PROFILE,
+}
+
+
+def read_sweep_file(sweep_file):
+    """
+    Reads a parameter sweep (json format):
+    {
+        "basic_settings": {"sim_duration": "1d", ...},
+        "advanced_settings": {"IAASettings": {"MARKET_TYPE": 2}, ...},
+        "parameters": {"slot_length": ["15m", "30m"], "IAASettings.MARKET_TYPE": [2, 3]},
+        "seeds": [0, 1, 2]
+    }
+    basic_settings and advanced_settings are the same as in the settings file and apply to all
+    runs. parameters contains the values of every swept basic setting or ConstSettings member
+    (dotted path), the sweep runs every combination of them with every seed.
+    """
+    if not os.path.isfile(sweep_file):
+        raise FileExistsError("Please provide a valid sweep file path")
+    with open(sweep_file, "r") as sf:
+        sweep = json.load(sf)
+    for name in sweep.get("parameters", {}):
+        validate_sweep_parameter(name)
+    return sweep
+
+
+def validate_sweep_parameter(name):
+    if name in BASIC_SETTINGS:
+        return
+    settings_class = ConstSettings
+    for attribute in name.split("."):
+        if not hasattr(settings_class, attribute):
+            raise D3AException(f"Sweep parameter {name} is neither a basic setting nor a "
+                               f"member of ConstSettings.")
+        settings_class = getattr(settings_class, attribute)
+
+
+def sweep_run_id(parameters, seed, setup_module_name="", basic_settings=None,
+                 advanced_settings=None):
+    """
+    Stable id of a run, used to skip runs that finished before the sweep was interrupted.
+    The setup and the fixed settings are part of the id, so that the runs are repeated once
+    they change.
+    """
+    run_key = json.dumps({"parameters": parameters, "seed": seed,
+                          "setup_module_name": setup_module_name,
+                          "basic_settings": basic_settings or {},
+                          "advanced_settings": advanced_settings or {}},
+                         sort_keys=True, default=str)
+    return hashlib.sha1(run_key.encode("utf-8")).hexdigest()[:12]
+
+
+def expand_sweep(sweep, setup_module_name=""):
+    """Returns one run dict per combination of the swept parameters and seeds"""
+    parameters = sweep.get("parameters", {})
+    names = sorted(parameters)
+    runs = []
+    for values in product(*(parameters[name] for name in names)):
+        run_parameters = dict(zip(names, values))
+        for seed in sweep.get("seeds", [0]):
+            runs.append({
+                "run_id": sweep_run_id(run_parameters, seed, setup_module_name,
+                                       sweep.get("basic_settings", {}),
+                                       sweep.get("advanced_settings", {})),
+                "parameters": run_parameters,
+                "seed": seed,
+            })
+    return runs
+
+
+def read_finished_run_ids(results_file):
+    """Ids of the runs that are already stored in the results file (json lines)"""
+    if not os.path.isfile(results_file):
+        return set()
+    finished_run_ids = set()
+    with open(results_file, "r") as rf:
+        for line in rf:
+            try:
+                summary = json.loads(line)
+            except ValueError:
+                # Last line of an interrupted write
+                continue
+            if summary.get("status") == "finished":
+                finished_run_ids.add(summary["run_id"])
+    return finished_run_ids
+
+
+def _ends_with_newline(file_path):
+    with open(file_path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def _advanced_settings_from_parameters(parameters):
+    advanced_settings = {}
+    for name, value in parameters.items():
+        if name in BASIC_SETTINGS:
+            continue
+        *class_names, attribute = name.split(".")
+        settings_dict = advanced_settings
+        for class_name in class_names:
+            settings_dict = settings_dict.setdefault(class_name, {})
+        settings_dict[attribute] = value
+    return advanced_settings
+
+
+def _parse_basic_setting(name, value):
+    parser = BASIC_SETTINGS[name]
+    return parser.convert(value, None, None) if isinstance(parser, ParamType) else parser(value)
+
+
+def _simulation_config(basic_settings, parameters):
+    settings = {**DEFAULT_BASIC_SETTINGS,
+                "start_date": today(tz=TIME_ZONE).format(DATE_FORMAT),
+                **basic_settings,
+                **{name: value for name, value in parameters.items() if name in BASIC_SETTINGS}}
+    config_arguments = {name: _parse_basic_setting(name, value)
+                        for name, value in settings.items() if name in BASIC_SETTINGS}
+    return SimulationConfig(**config_arguments, external_connection_enabled=False)
+
+
+def _run_summary(simulation):
+    endpoint_buffer = simulation.endpoint_buffer
+    return {
+        "kpi": endpoint_buffer.kpi.performance_indices,
+        "bills": endpoint_buffer.market_bills.bills_results.get(simulation.area.name, {}),
+    }
+
+
+def run_sweep_entry(setup_module_name, sweep, run):
+    """
+    Runs one simulation of the sweep. Has to be executed in its own worker process, because
+    the settings of the run are applied to the global ConstSettings / GlobalConfig.
+    """
+    summary = {"run_id": run["run_id"], "parameters": run["parameters"], "seed": run["seed"]}
+    start_time = time.time()
+    try:
+        update_advanced_settings(sweep.get("advanced_settings", {}))
+        update_advanced_settings(_advanced_settings_from_parameters(run["parameters"]))
+        simulation_config = _simulation_config(sweep.get("basic_settings", {}),
+                                               run["parameters"])
+        simulation = Simulation(setup_module_name, simulation_config, seed=run["seed"],
+                                no_export=True)
+        simulation.run()
+        summary.update(_run_summary(simulation))
+        summary["status"] = "finished"
+    except Exception as ex:
+        log.exception("Sweep run %s failed", run["run_id"])
+        summary["status"] = "failed"
+        summary["error"] = repr(ex)
+    summary["runtime_seconds"] = time.time() - start_time
+    return summary
+
+
+def _run_sweep_entry(arguments):
+    return run_sweep_entry(*arguments)
+
+
+def run_sweep(setup_module_name, sweep, results_file, workers):
+    """
+    Runs all runs of the sweep that are not yet finished in the results file, on a pool of
+    workers. Every run gets a fresh worker process (maxtasksperchild=1), therefore the
+    global settings of one run do not leak into the next one. The summary of every run is
+    appended to the results file as soon as the run is done.
+    """
+    runs = expand_sweep(sweep, setup_module_name)
+    finished_run_ids = read_finished_run_ids(results_file)
+    pending_runs = [run for run in runs if run["run_id"] not in finished_run_ids]
+    log.info("Sweep: %d runs, %d already finished, %d pending",
+             len(runs), len(runs) - len(pending_runs), len(pending_runs))
+    if not pending_runs:
+        return
+
+    with Pool(processes=workers, maxtasksperchild=1) as pool, \
+            open(results_file, "a") as rf:
+        if rf.tell() > 0 and not _ends_with_newline(results_file):
+            # Do not append to the incomplete summary of an interrupted run
+            rf.write("\n")
+        for summary in pool.imap_unordered(
+                _run_sweep_entry,
+                [(setup_module_name, sweep, run) for run in pending_runs]):
+            rf.write(json.dumps(summary, default=str) + "\n")
+            rf.flush()
+            log.info("Sweep run %s %s in %.1fs", summary["run_id"], summary["status"],
+                     summary["runtime_seconds"])
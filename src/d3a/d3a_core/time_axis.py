@@ -0,0 +1,212 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from array import array
+from collections.abc import MutableMapping, ItemsView, ValuesView
+
+from d3a_interface.constants_limits import GlobalConfig
+from d3a.d3a_core.util import generate_market_slot_list
+
+# value type -> typecode of the array that stores series of this type
+_ARRAY_TYPECODES = {float: 'd', int: 'q'}
+
+
+class TimeAxis:
+    """
+    Ordered market slots of a simulation, that maps every slot to its position.
+
+    Series on the same time axis store their values by position, so the slot list and the
+    slot index exist once per simulation instead of once per series.
+    """
+
+    def __init__(self, time_slots):
+        self.time_slots = time_slots
+        self.positions = {slot: position for position, slot in enumerate(self.time_slots)}
+
+    def __len__(self):
+        return len(self.time_slots)
+
+    def __iter__(self):
+        return iter(self.time_slots)
+
+    def __getitem__(self, position):
+        return self.time_slots[position]
+
+    def position(self, time_slot):
+        """Position of time_slot on the axis, None if the slot is not part of the axis"""
+        return self.positions.get(time_slot)
+
+
+def market_time_axis(area=None):
+    """
+    Returns the time axis of the market slots of the simulation, that is shared by all
+    series of the simulation. The axis is rebuilt when the market slot list is regenerated.
+    """
+    config = GlobalConfig if area is None else area.config
+    market_slots = generate_market_slot_list(area=area)
+    time_axis = getattr(config, "market_time_axis", None)
+    if time_axis is None or time_axis.time_slots is not market_slots:
+        time_axis = TimeAxis(market_slots)
+        config.market_time_axis = time_axis
+    return time_axis
+
+
+def _slot_storage(values, present):
+    """
+    Stores values in a typed array if all present values have the same numeric type,
+    otherwise in a list. Series without values start as float arrays.
+    """
+    value_types = {type(value) for value, is_present in zip(values, present) if is_present}
+    if not value_types:
+        return array('d', bytes(array('d').itemsize * len(values)))
+    if len(value_types) == 1:
+        value_type = value_types.pop()
+        typecode = _ARRAY_TYPECODES.get(value_type)
+        if typecode is not None:
+            try:
+                return array(typecode, (value if is_present else value_type()
+                                        for value, is_present in zip(values, present)))
+            except OverflowError:
+                pass
+    return list(values)
+
+
+class _SlotSeriesValues(ValuesView):
+    def __iter__(self):
+        for _, value in self._mapping.iter_items():
+            yield value
+
+
+class _SlotSeriesItems(ItemsView):
+    def __iter__(self):
+        return self._mapping.iter_items()
+
+
+class SlotSeries(MutableMapping):
+    """
+    Mapping of market slot -> value, that stores the values of the slots of a TimeAxis by
+    slot position.
+
+    Numeric series are stored in a typed array and change to a list once a value of a
+    different type is assigned. Slots that are not part of the time axis are kept in a
+    plain dict, so the series accepts any key a dict would accept.
+    """
+
+    def __init__(self, mapping=None, time_axis=None):
+        self.time_axis = market_time_axis() if time_axis is None else time_axis
+        size = len(self.time_axis)
+        values = [None] * size
+        self._present = bytearray(size)
+        self._extra = {}
+        if mapping is not None:
+            for time_slot, value in mapping.items():
+                position = self.time_axis.position(time_slot)
+                if position is None:
+                    self._extra[time_slot] = value
+                else:
+                    values[position] = value
+                    self._present[position] = 1
+        self._values = _slot_storage(values, self._present)
+
+    @classmethod
+    def from_values(cls, values, time_axis=None):
+        """Series with one value for every slot of the time axis, in slot order"""
+        series = cls(time_axis=time_axis)
+        values = list(values)
+        assert len(values) == len(series.time_axis)
+        series._present = bytearray(b'\x01') * len(values)
+        series._values = _slot_storage(values, series._present)
+        return series
+
+    @classmethod
+    def full(cls, value, time_axis=None):
+        """Series with the same value for every slot of the time axis"""
+        time_axis = market_time_axis() if time_axis is None else time_axis
+        return cls.from_values([value] * len(time_axis), time_axis)
+
+    def __getitem__(self, time_slot):
+        position = self.time_axis.positions.get(time_slot)
+        if position is None:
+            return self._extra[time_slot]
+        if self._present[position]:
+            return self._values[position]
+        raise KeyError(time_slot)
+
+    def __setitem__(self, time_slot, value):
+        position = self.time_axis.positions.get(time_slot)
+        if position is None:
+            self._extra[time_slot] = value
+            return
+        try:
+            self._values[position] = value
+        except (TypeError, OverflowError):
+            self._values = list(self._values)
+            self._values[position] = value
+        self._present[position] = 1
+
+    def __delitem__(self, time_slot):
+        position = self.time_axis.position(time_slot)
+        if position is None:
+            del self._extra[time_slot]
+        elif not self._present[position]:
+            raise KeyError(time_slot)
+        else:
+            self._present[position] = 0
+
+    def __contains__(self, time_slot):
+        position = self.time_axis.position(time_slot)
+        if position is None:
+            return time_slot in self._extra
+        return self._present[position] == 1
+
+    def __len__(self):
+        return self._present.count(1) + len(self._extra)
+
+    def __iter__(self):
+        for time_slot, is_present in zip(self.time_axis.time_slots, self._present):
+            if is_present:
+                yield time_slot
+        yield from self._extra
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({dict(self.iter_items())!r})"
+
+    def get(self, time_slot, default=None):
+        position = self.time_axis.positions.get(time_slot)
+        if position is None:
+            return self._extra.get(time_slot, default)
+        return self._values[position] if self._present[position] else default
+
+    def iter_items(self):
+        for time_slot, value, is_present in \
+                zip(self.time_axis.time_slots, self._values, self._present):
+            if is_present:
+                yield time_slot, value
+        yield from self._extra.items()
+
+    def items(self):
+        return _SlotSeriesItems(self)
+
+    def values(self):
+        return _SlotSeriesValues(self)
+
+    def copy(self):
+        series = self.__class__(time_axis=self.time_axis)
+        series._values = self._values[:]
+        series._present = self._present[:]
+        series._extra = self._extra.copy()
+        return series
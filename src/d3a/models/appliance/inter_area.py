@@ -17,6 +17,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 from d3a.models.appliance.simple import SimpleAppliance
 from d3a.d3a_core.util import make_iaa_name
+from d3a.models.market.trade_book import trades_of
 
 
 class InterAreaAppliance(SimpleAppliance):
@@ -59,7 +60,6 @@ class InterAreaAppliance(SimpleAppliance):
             return 0
         energy = sum(
             t.offer.energy * (1 if t.seller == self.own_name else -1)
-            for t in market.trades
-            if self.own_name in (t.buyer, t.seller)
+            for t in trades_of(market.trades, self.own_name)
         )
         return energy
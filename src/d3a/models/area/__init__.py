@@ -32,10 +32,11 @@ from d3a.d3a_core.util import TaggedLogWrapper, convert_area_throughput_kVA_to_k
 from d3a_interface.constants_limits import ConstSettings
 from d3a.d3a_core.device_registry import DeviceRegistry
 from d3a.d3a_core.global_objects import GlobalObjects
+from d3a.d3a_core.profiler import profiler
 from d3a.constants import TIME_FORMAT
 from d3a.models.area.stats import AreaStats
 from d3a.models.area.event_dispatcher import DispatcherFactory
-from d3a.models.area.markets import AreaMarkets
+from d3a.models.area.markets import AreaMarkets, last_market
 from d3a.models.area.events import Events
 from d3a_interface.constants_limits import GlobalConfig
 from d3a_interface.area_validator import validate_area
@@ -300,11 +301,12 @@ class Area:
             self.budget_keeper.process_market_cycle()
 
         self.log.debug("Cycling markets")
-        self._markets.rotate_markets(self.now, self.stats, self.dispatcher)
-        self.dispatcher._delete_past_agents(self.dispatcher._inter_area_agents)
+        if self._markets.rotate_markets(self.now, self.stats, self.dispatcher):
+            # Past agents and market stats only change when a market was closed
+            self.dispatcher._delete_past_agents(self.dispatcher._inter_area_agents)
 
-        # area_market_stats have to updated when cycling market of each area:
-        self.stats.update_area_market_stats()
+            # area_market_stats have to updated when cycling market of each area:
+            self.stats.update_area_market_stats()
 
         if deactivate:
             return
@@ -358,7 +360,8 @@ class Area:
                 self.dispatcher.publish_market_clearing()
             else:
                 for market in self.all_markets:
-                    market.match_offers_bids()
+                    with profiler.phase("match_offers_bids"):
+                        market.match_offers_bids()
 
         self.events.update_events(self.now)
 
@@ -476,37 +479,25 @@ class Area:
     @property
     def next_market(self):
         """Returns the 'current' market (i.e. the one currently 'running')"""
-        try:
-            return list(self._markets.markets.values())[0]
-        except IndexError:
-            return None
+        return next(iter(self._markets.markets.values()), None)
 
     @property
     def current_market(self):
         """Returns the 'most recent past market' market
         (i.e. the one that has been finished last)"""
-        try:
-            return list(self._markets.past_markets.values())[-1]
-        except IndexError:
-            return None
+        return last_market(self._markets.past_markets)
 
     @property
     def current_balancing_market(self):
         """Returns the 'current' balancing market (i.e. the one currently 'running')"""
-        try:
-            return list(self._markets.past_balancing_markets.values())[-1]
-        except IndexError:
-            return None
+        return last_market(self._markets.past_balancing_markets)
 
     def get_future_market_from_id(self, _id):
         return self._markets.indexed_future_markets.get(_id, None)
 
     @property
     def last_past_market(self):
-        try:
-            return list(self._markets.past_markets.values())[-1]
-        except IndexError:
-            return None
+        return last_market(self._markets.past_markets)
 
     @cached_property
     def available_triggers(self):
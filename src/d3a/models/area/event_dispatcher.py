@@ -218,11 +218,13 @@ class AreaDispatcher:
                         for engine in agent.engines:
                             del engine.forwarded_offers
                             del engine.offer_age
+                            del engine.pending_offers
                             del engine.trade_residual
                             del engine.ignored_offers
                             if hasattr(engine, "forwarded_bids"):
                                 del engine.forwarded_bids
                                 del engine.bid_age
+                                del engine.pending_bids
                                 del engine.bid_trade_residual
                         del agent.engines
                     agent.higher_market = None
@@ -15,6 +15,7 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
+from bisect import bisect_right
 
 from d3a.models.area.event_types import EnableAreaEvent, DisableAreaEvent, ConnectAreaEvent, \
     DisconnectAreaEvent, DisableIntervalAreaEvent, DisconnectIntervalAreaEvent, StrategyEvents, \
@@ -23,14 +24,16 @@ from d3a.models.area.event_types import EnableAreaEvent, DisableAreaEvent, Conne
 
 class IndividualEvents:
     def __init__(self, event_list, trigger_type):
-        self.event_list = event_list
+        self.event_list = sorted(event_list, key=lambda e: e.event_time)
+        self._event_times = [e.event_time for e in self.event_list]
         self.trigger_type = trigger_type
         self._active = True
 
     def tick(self, current_time):
-        event_list = sorted(self.event_list, key=lambda e: e.event_time)
-        past_events = list(filter(lambda e: e.event_time <= current_time.hour, event_list))
-        self._active = len(past_events) == 0 or type(past_events[-1]) == self.trigger_type
+        # The last event that happened until the current hour decides the state
+        past_event_count = bisect_right(self._event_times, current_time.hour)
+        self._active = past_event_count == 0 or \
+            type(self.event_list[past_event_count - 1]) == self.trigger_type
 
     @property
     def active(self):
@@ -96,8 +99,17 @@ class Events:
 
         self.strategy_events = [e for e in event_list if type(e) == StrategyEvents]
         self.config_events = [e for e in event_list if type(e) == ConfigEvents]
+        self._has_events = len(event_list) > 0
+        self._updated_hour = None
 
     def update_events(self, current_time):
+        """
+        The events take effect at the full hours of the day, the events are therefore only
+        updated once per hour and never for areas without events.
+        """
+        if not self._has_events or current_time.hour == self._updated_hour:
+            return
+        self._updated_hour = current_time.hour
         self.enable_disable_events.update_events(current_time)
         self.connect_disconnect_events.update_events(current_time)
         for ev in self.strategy_events:
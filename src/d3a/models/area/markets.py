@@ -27,9 +27,24 @@ from d3a.models.market import Market # noqa
 from d3a_interface.constants_limits import ConstSettings
 from collections import OrderedDict
 from d3a.d3a_core.util import is_timeslot_in_simulation_duration
+from d3a.d3a_core.redis_connections.redis_area_market_communicator import channel_multiplexer
 from d3a import constants
 
 
+def last_market(markets):
+    """
+    Returns the market of the latest time slot of a time ordered market dict without copying
+    the markets, None if there are no markets
+    """
+    if not markets:
+        return None
+    try:
+        return markets[next(reversed(markets))]
+    except TypeError:
+        # Plain dicts are not reversible before Python 3.8
+        return list(markets.values())[-1]
+
+
 class AreaMarkets:
     def __init__(self, area_log):
         # Children trade in `markets`
@@ -54,29 +69,36 @@ class AreaMarkets:
         return list(self.markets.values())
 
     def rotate_markets(self, current_time, stats, dispatcher):
-        # Move old and current markets & balancing_markets to
-        # `past_markets` & past_balancing_markets. We use `list()` here to get a copy since we
-        # modify the market list in-place
-        self._market_rotation(current_time=current_time, markets=self.markets,
-                              past_markets=self.past_markets,
-                              area_agent=dispatcher.interarea_agents)
+        """
+        Move old and current markets & balancing_markets to `past_markets` &
+        past_balancing_markets.
+        :return: True if a spot market was moved to the past markets
+        """
+        rotated_markets = self._market_rotation(current_time=current_time,
+                                                markets=self.markets,
+                                                past_markets=self.past_markets,
+                                                area_agent=dispatcher.interarea_agents)
         if self.balancing_markets is not None:
             self._market_rotation(current_time=current_time, markets=self.balancing_markets,
                                   past_markets=self.past_balancing_markets,
                                   area_agent=dispatcher.balancing_agents)
-        self._indexed_future_markets = {
-            m.id: m for m in self.all_future_spot_markets
-        }
+        for market in rotated_markets:
+            self._indexed_future_markets.pop(market.id, None)
+        return len(rotated_markets) > 0
 
     def _market_rotation(self, current_time, markets, past_markets, area_agent):
+        # We use `list()` here to get a copy since we modify the market list in-place
+        rotated_markets = []
         for timeframe in list(markets.keys()):
             if timeframe < current_time:
                 market = markets.pop(timeframe)
                 market.readonly = True
                 self._delete_past_markets(past_markets, timeframe)
                 past_markets[timeframe] = market
+                rotated_markets.append(market)
                 self.log.trace("Moving {t:%H:%M} {m} to past"
                                .format(t=timeframe, m=past_markets[timeframe].name))
+        return rotated_markets
 
     def _delete_past_markets(self, past_markets, timeframe):
         if not constants.D3A_TEST_RUN:
@@ -85,6 +107,9 @@ class AreaMarkets:
             for pm in delete_markets:
                 if ConstSettings.GeneralSettings.EVENT_DISPATCHING_VIA_REDIS:
                     past_markets[pm].redis_api.stop()
+                    past_markets[pm].redis_publisher.stop()
+                    # Response channels of the strategies and area publishers
+                    channel_multiplexer().unsubscribe_market(past_markets[pm].id)
                 del past_markets[pm].offers
                 del past_markets[pm].trades
                 del past_markets[pm].offer_history
@@ -130,6 +155,8 @@ class AreaMarkets:
 
                 area.dispatcher.create_area_agents(is_spot_market, market)
                 markets[timeframe] = market
+                if is_spot_market:
+                    self._indexed_future_markets[market.id] = market
                 changed = True
                 self.log.trace("Adding {t:{format}} market".format(
                     t=timeframe,
@@ -137,7 +164,4 @@ class AreaMarkets:
                            if area.config.slot_length.total_seconds() > 60
                     else "%H:%M:%S"
                 ))
-        self._indexed_future_markets = {
-            m.id: m for m in self.all_future_spot_markets
-        }
         return changed
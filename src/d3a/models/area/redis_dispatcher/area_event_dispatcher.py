@@ -1,7 +1,10 @@
 import json
 from random import random
+from uuid import uuid4
+import d3a.constants
 from d3a.events import AreaEvent
 from d3a.d3a_core.exceptions import D3ARedisException
+from d3a.d3a_core.redis_connections.redis_area_market_communicator import PendingResponses
 from d3a.models.area.redis_dispatcher import RedisEventDispatcherBase
 
 
@@ -9,6 +12,7 @@ class RedisAreaEventDispatcher(RedisEventDispatcherBase):
     def __init__(self, area, root_dispatcher, redis):
         super().__init__(area, root_dispatcher, redis)
         self.str_area_events = [event.name.lower() for event in AreaEvent]
+        self.pending_responses = PendingResponses()
 
     def event_channel_name(self):
         return f"{self.area.uuid}/area_event"
@@ -20,22 +24,44 @@ class RedisAreaEventDispatcher(RedisEventDispatcherBase):
         data = json.loads(payload["data"])
         if "response" in data:
             event_type = data["response"]
-            if event_type in self.str_area_events:
-                self.redis.resume()
-            else:
+            if event_type not in self.str_area_events:
                 raise D3ARedisException("RedisAreaDispatcher: Should never reach this point")
+            elif "transaction_uuid" in data:
+                self.pending_responses.received(data["transaction_uuid"])
+            else:
+                self.redis.resume()
 
     def publish_area_event(self, area_uuid, event_type: AreaEvent, **kwargs):
         send_data = {"event_type": event_type.value, "kwargs": kwargs}
         dispatch_chanel = f"{area_uuid}/area_event"
         self.redis.publish(dispatch_chanel, json.dumps(send_data))
 
-    def broadcast_event_redis(self, event_type: AreaEvent, **kwargs):
+    def publish_area_event_to_children(self, event_type: AreaEvent, **kwargs):
+        """
+        Publishes the event to all children with one pipeline and waits until every child
+        has responded
+        """
+        messages = []
         for child in sorted(self.area.children, key=lambda _: random()):
-            self.publish_area_event(child.uuid, event_type, **kwargs)
-            self.redis.wait()
+            transaction_uuid = str(uuid4())
+            self.pending_responses.add(transaction_uuid)
+            send_data = {"event_type": event_type.value, "kwargs": kwargs,
+                         "transaction_uuid": transaction_uuid}
+            messages.append((f"{child.uuid}/area_event", json.dumps(send_data)))
+        self.redis.publish_pipelined(messages)
+        self.pending_responses.wait()
+
+    def broadcast_event_redis(self, event_type: AreaEvent, **kwargs):
+        if d3a.constants.REDIS_PIPELINED_DISPATCH:
+            self.publish_area_event_to_children(event_type, **kwargs)
             self.root_dispatcher.market_event_dispatcher.wait_for_futures()
             self.root_dispatcher.market_notify_event_dispatcher.wait_for_futures()
+        else:
+            for child in sorted(self.area.children, key=lambda _: random()):
+                self.publish_area_event(child.uuid, event_type, **kwargs)
+                self.redis.wait()
+                self.root_dispatcher.market_event_dispatcher.wait_for_futures()
+                self.root_dispatcher.market_notify_event_dispatcher.wait_for_futures()
 
         for time_slot, agents in self.root_dispatcher._inter_area_agents.items():
             if time_slot not in self.area._markets.markets:
@@ -53,7 +79,10 @@ class RedisAreaEventDispatcher(RedisEventDispatcherBase):
         kwargs = data["kwargs"]
         event_type = AreaEvent(data["event_type"])
         response_channel = f"{self.area.parent.uuid}/area_event_response"
-        response_data = json.dumps({"response": event_type.name.lower()})
+        response = {"response": event_type.name.lower()}
+        if "transaction_uuid" in data:
+            response["transaction_uuid"] = data["transaction_uuid"]
+        response_data = json.dumps(response)
 
         self.root_dispatcher.event_listener(event_type=event_type, **kwargs)
         self.redis.publish(response_channel, response_data)
@@ -1,9 +1,10 @@
 from uuid import uuid4
-import json
+import d3a.constants
 from d3a.d3a_core.exceptions import D3ARedisException
 from d3a_interface.constants_limits import ConstSettings
 from d3a.constants import REDIS_PUBLISH_RESPONSE_TIMEOUT
 from d3a.d3a_core.redis_connections.redis_area_market_communicator import BlockingCommunicator
+from d3a.models.market.market_serialization import encode_payload, decode_payload
 
 
 class AreaToMarketEventPublisher:
@@ -13,7 +14,7 @@ class AreaToMarketEventPublisher:
         self.event_response_uuids = []
 
     def response_callback(self, payload):
-        response = json.loads(payload["data"])
+        response = decode_payload(payload["data"])
         if response["status"] != "ready":
             raise D3ARedisException(
                 f"{self.area.name} received an incorrect response from Redis: {response}"
@@ -27,13 +28,16 @@ class AreaToMarketEventPublisher:
     def publish_markets_clearing(self):
         if ConstSettings.IAASettings.MARKET_TYPE == 1:
             return
+        if d3a.constants.REDIS_PIPELINED_DISPATCH:
+            self._publish_markets_clearing_pipelined()
+            return
         for market in self.area._markets.markets.values():
             response_channel = f"{market.id}/CLEAR/RESPONSE"
             market_channel = f"{market.id}/CLEAR"
 
             data = {"transaction_uuid": str(uuid4())}
             self.redis.sub_to_channel(response_channel, self.response_callback)
-            self.redis.publish(market_channel, json.dumps(data))
+            self.redis.publish(market_channel, encode_payload(data))
 
             def event_response_was_received_callback():
                 return data["transaction_uuid"] in self.event_response_uuids
@@ -46,3 +50,31 @@ class AreaToMarketEventPublisher:
                     f"seconds: Clearing event on {self.area.name}, {market.id}")
             else:
                 self.event_response_uuids.remove(data["transaction_uuid"])
+
+    def _publish_markets_clearing_pipelined(self):
+        """
+        Publishes the clearing event to all markets with one pipeline and waits for the
+        responses of all markets at once
+        """
+        pending_markets = {}
+        messages = []
+        for market in self.area._markets.markets.values():
+            data = {"transaction_uuid": str(uuid4())}
+            pending_markets[data["transaction_uuid"]] = market.id
+            self.redis.sub_to_channel(f"{market.id}/CLEAR/RESPONSE", self.response_callback)
+            messages.append((f"{market.id}/CLEAR", encode_payload(data)))
+        self.redis.publish_pipelined(messages)
+
+        def event_responses_were_received_callback():
+            return all(transaction_uuid in self.event_response_uuids
+                       for transaction_uuid in pending_markets)
+
+        self.redis.poll_until_response_received(event_responses_were_received_callback)
+
+        for transaction_uuid, market_id in pending_markets.items():
+            if transaction_uuid not in self.event_response_uuids:
+                self.area.log.error(
+                    f"Transaction ID not found after {REDIS_PUBLISH_RESPONSE_TIMEOUT} "
+                    f"seconds: Clearing event on {self.area.name}, {market_id}")
+            else:
+                self.event_response_uuids.remove(transaction_uuid)
@@ -2,12 +2,16 @@ import json
 import logging
 from random import random
 from threading import Event
+from uuid import uuid4
 from concurrent.futures import TimeoutError, ThreadPoolExecutor
+import d3a.constants
 from d3a.events import MarketEvent
 from d3a.d3a_core.exceptions import D3ARedisException
 from d3a.constants import MAX_WORKER_THREADS
+from d3a.d3a_core.redis_connections.redis_area_market_communicator import PendingResponses
 from d3a.models.area.redis_dispatcher import RedisEventDispatcherBase
-from d3a.models.market.market_structures import parse_event_and_parameters_from_json_string
+from d3a.models.market.market_serialization import encode_payload, \
+    parse_event_and_parameters_from_payload
 
 
 class AreaRedisMarketEventDispatcher(RedisEventDispatcherBase):
@@ -18,6 +22,7 @@ class AreaRedisMarketEventDispatcher(RedisEventDispatcherBase):
         self.futures = []
         self.executor = ThreadPoolExecutor(max_workers=MAX_WORKER_THREADS)
         self.child_response_events = {t.value: Event() for t in MarketEvent}
+        self.pending_responses = PendingResponses()
 
     def wait_for_futures(self):
         for future in self.futures:
@@ -36,9 +41,11 @@ class AreaRedisMarketEventDispatcher(RedisEventDispatcherBase):
     def event_listener_redis(self, payload):
         event_type, kwargs = self.parse_market_event_from_event_payload(payload)
 
+        transaction_uuid = kwargs.pop("transaction_uuid", None)
+
         def executor_func():
             self.root_dispatcher.event_listener(event_type=event_type, **kwargs)
-            self.publish_response(event_type)
+            self.publish_response(event_type, transaction_uuid)
 
         self.futures.append(self.executor.submit(executor_func))
 
@@ -51,23 +58,39 @@ class AreaRedisMarketEventDispatcher(RedisEventDispatcherBase):
             if event_type not in self.str_market_events:
                 raise D3ARedisException(
                     "AreaRedisMarketEventDispatcher: Should never reach this point")
+            elif "transaction_uuid" in data:
+                self.pending_responses.received(data["transaction_uuid"])
             else:
                 self.child_response_events[event_type_id].set()
 
     def publish_event(self, area_uuid, event_type: MarketEvent, **kwargs):
         dispatch_channel = f"{area_uuid}/market_event"
-        for key in ["offer", "trade", "new_offer", "existing_offer",
-                    "bid", "new_bid", "existing_bid", "bid_trade"]:
-            if key in kwargs:
-                kwargs[key] = kwargs[key].to_JSON_string()
         send_data = {"event_type": event_type.value, "kwargs": kwargs}
-        self.redis.publish(dispatch_channel, json.dumps(send_data))
+        self.redis.publish(dispatch_channel, encode_payload(send_data))
+
+    def publish_event_to_children(self, event_type: MarketEvent, **kwargs):
+        """
+        Publishes the event to all children with one pipeline and waits until every child
+        has responded
+        """
+        messages = []
+        for child in sorted(self.area.children, key=lambda _: random()):
+            transaction_uuid = str(uuid4())
+            self.pending_responses.add(transaction_uuid)
+            send_data = {"event_type": event_type.value,
+                         "kwargs": {**kwargs, "transaction_uuid": transaction_uuid}}
+            messages.append((f"{child.uuid}/market_event", encode_payload(send_data)))
+        self.redis.publish_pipelined(messages)
+        self.pending_responses.wait()
 
     def broadcast_event_redis(self, event_type: MarketEvent, **kwargs):
-        for child in sorted(self.area.children, key=lambda _: random()):
-            self.publish_event(child.uuid, event_type, **kwargs)
-            self.child_response_events[event_type.value].wait()
-            self.child_response_events[event_type.value].clear()
+        if d3a.constants.REDIS_PIPELINED_DISPATCH:
+            self.publish_event_to_children(event_type, **kwargs)
+        else:
+            for child in sorted(self.area.children, key=lambda _: random()):
+                self.publish_event(child.uuid, event_type, **kwargs)
+                self.child_response_events[event_type.value].wait()
+                self.child_response_events[event_type.value].clear()
 
         for time_slot, agents in self.root_dispatcher._inter_area_agents.items():
             if time_slot not in self.area._markets.markets:
@@ -79,11 +102,13 @@ class AreaRedisMarketEventDispatcher(RedisEventDispatcherBase):
             for area_name in sorted(agents, key=lambda _: random()):
                 agents[area_name].event_listener(event_type, **kwargs)
 
-    def publish_response(self, event_type):
+    def publish_response(self, event_type, transaction_uuid=None):
         response_channel = f"{self.area.parent.uuid}/market_event_response"
-        response_data = json.dumps({"response": event_type.name.lower(),
-                                    "event_type": event_type.value})
+        response = {"response": event_type.name.lower(), "event_type": event_type.value}
+        if transaction_uuid is not None:
+            response["transaction_uuid"] = transaction_uuid
+        response_data = json.dumps(response)
         self.redis.publish(response_channel, response_data)
 
     def parse_market_event_from_event_payload(self, payload):
-        return parse_event_and_parameters_from_json_string(payload)
+        return parse_event_and_parameters_from_payload(payload)
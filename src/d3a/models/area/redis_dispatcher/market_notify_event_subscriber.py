@@ -2,8 +2,11 @@ import json
 import logging
 from concurrent.futures import ThreadPoolExecutor
 from d3a.constants import MAX_WORKER_THREADS
-from d3a.models.market.market_structures import parse_event_and_parameters_from_json_string
-from d3a.d3a_core.redis_connections.redis_area_market_communicator import ResettableCommunicator
+from d3a.models.market.market_serialization import decode_payload, \
+    parse_event_and_parameters_from_payload
+from d3a.events import MarketEvent
+from d3a.d3a_core.redis_connections.redis_area_market_communicator import \
+    MultiplexedCommunicator
 
 
 class MarketNotifyEventSubscriber:
@@ -14,7 +17,7 @@ class MarketNotifyEventSubscriber:
     def __init__(self, area, root_dispatcher):
         self.area = area
         self.root_dispatcher = root_dispatcher
-        self.redis = ResettableCommunicator()
+        self.redis = MultiplexedCommunicator()
         self.futures = []
         self.executor = ThreadPoolExecutor(max_workers=MAX_WORKER_THREADS)
 
@@ -36,7 +39,6 @@ class MarketNotifyEventSubscriber:
     def cycle_market_channels(self):
         self.wait_for_futures()
         self.redis.terminate_connection()
-        self.redis = ResettableCommunicator()
         self.subscribe_to_events()
 
     def subscribe_to_events(self):
@@ -45,8 +47,9 @@ class MarketNotifyEventSubscriber:
             channel_name = f"market/{market.id}/notify_event"
 
             def generate_notify_callback(payload):
-                event_type, kwargs = self.parse_market_event_from_event_payload(payload)
-                data = json.loads(payload["data"])
+                data = decode_payload(payload["data"])
+                event_type = MarketEvent(data["event_type"])
+                kwargs = data["kwargs"]
                 kwargs["market_id"] = market.id
 
                 def executor_func():
@@ -61,4 +64,4 @@ class MarketNotifyEventSubscriber:
         self.redis.sub_to_multiple_channels(channels_callbacks_dict)
 
     def parse_market_event_from_event_payload(self, payload):
-        return parse_event_and_parameters_from_json_string(payload)
+        return parse_event_and_parameters_from_payload(payload)
@@ -1,13 +1,12 @@
-from redis import StrictRedis
 import json
-from d3a.d3a_core.redis_connections.redis_communication import REDIS_URL
+from d3a.d3a_core.redis_connections.redis_area_market_communicator import shared_redis_db
 from d3a.models.strategy.external_strategy import ExternalStrategy
 
 
 class RedisAreaExternalConnection:
     def __init__(self, area):
         self.area = area
-        self.redis_db = StrictRedis.from_url(REDIS_URL, retry_on_timeout=True)
+        self.redis_db = shared_redis_db()
         self.pubsub = self.redis_db.pubsub()
         self.sub_to_area_event()
         self.areas_to_register = []
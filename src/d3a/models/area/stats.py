@@ -22,9 +22,10 @@ from statistics import mean, median
 from d3a_interface.constants_limits import DATE_TIME_FORMAT
 from d3a.constants import TIME_ZONE
 from d3a import limit_float_precision
-from d3a.d3a_core.util import area_name_from_area_or_iaa_name, add_or_create_key, \
-    area_sells_to_child, child_buys_from_area
+from d3a.d3a_core.util import area_name_from_area_or_iaa_name, area_sells_to_child, \
+    child_buys_from_area
 from d3a_interface.utils import convert_pendulum_to_str_in_dict, convert_str_to_pendulum_in_dict
+from d3a.models.area.markets import last_market
 
 default_trade_stats_dict = {
     "min_trade_rate": None,
@@ -94,7 +95,8 @@ class AreaStats:
     def cheapest_offers(self):
         cheapest_offers = []
         for market in self._markets.markets.values():
-            cheapest_offers.extend(market.sorted_offers[0:1])
+            if market.cheapest_offer is not None:
+                cheapest_offers.append(market.cheapest_offer)
         return cheapest_offers
 
     def _get_market_bills(self, time_slot):
@@ -115,6 +117,8 @@ class AreaStats:
 
     def min_max_avg_median_rate_current_market(self):
         out_dict = copy(default_trade_stats_dict)
+        if not self.current_market.trades:
+            return out_dict
         trade_volumes = [trade.offer.energy for trade in self.current_market.trades]
         trade_rates = [trade.offer.price/trade.offer.energy
                        for trade in self.current_market.trades]
@@ -128,8 +132,7 @@ class AreaStats:
 
     @property
     def current_market(self):
-        past_markets = list(self._markets.past_markets.values())
-        return past_markets[-1] if len(past_markets) > 0 else None
+        return last_market(self._markets.past_markets)
 
     def get_market_stats(self, market_slot_list, dso=False):
         out_dict = {}
@@ -152,23 +155,17 @@ class AreaStats:
         if self._area.current_market is None:
             return None
 
-        self.imported_energy = {}
-        self.exported_energy = {}
-        self.net_energy_flow = {}
+        time_slot = self.current_market.time_slot
+        self.imported_energy = {time_slot: 0.}
+        self.exported_energy = {time_slot: 0.}
 
-        child_names = [area_name_from_area_or_iaa_name(c.name) for c in self._area.children]
-        if getattr(self.current_market, 'trades', None) is not None:
-            for trade in self.current_market.trades:
+        trades = getattr(self.current_market, 'trades', None)
+        if trades:
+            child_names = [area_name_from_area_or_iaa_name(c.name) for c in self._area.children]
+            for trade in trades:
                 if child_buys_from_area(trade, self._area.name, child_names):
-                    add_or_create_key(self.exported_energy, self.current_market.time_slot,
-                                      trade.offer.energy)
+                    self.exported_energy[time_slot] += trade.offer.energy
                 if area_sells_to_child(trade, self._area.name, child_names):
-                    add_or_create_key(self.imported_energy, self.current_market.time_slot,
-                                      trade.offer.energy)
-        if self.current_market.time_slot not in self.imported_energy:
-            self.imported_energy[self.current_market.time_slot] = 0.
-        if self.current_market.time_slot not in self.exported_energy:
-            self.exported_energy[self.current_market.time_slot] = 0.
-        self.net_energy_flow[self.current_market.time_slot] = \
-            self.imported_energy[self.current_market.time_slot] - \
-            self.exported_energy[self.current_market.time_slot]
+                    self.imported_energy[time_slot] += trade.offer.energy
+        self.net_energy_flow = {
+            time_slot: self.imported_energy[time_slot] - self.exported_energy[time_slot]}
@@ -29,6 +29,8 @@ from threading import RLock
 from d3a.d3a_core.device_registry import DeviceRegistry
 from d3a.constants import FLOATING_POINT_TOLERANCE, DATE_TIME_FORMAT
 from d3a.models.market.market_structures import Offer, Trade, Bid  # noqa
+from d3a.models.market.order_book import OrderBook
+from d3a.models.market.trade_book import TradeBook
 from d3a.d3a_core.util import add_or_create_key, subtract_or_create_key
 from d3a_interface.constants_limits import ConstSettings, GlobalConfig
 from d3a.models.market.market_redis_connection import MarketRedisEventSubscriber, \
@@ -76,12 +78,12 @@ class Market:
             else None
         self.readonly = readonly
         # offer-id -> Offer
-        self.offers = {}  # type: Dict[str, Offer]
+        self.offers = OrderBook()  # type: Dict[str, Offer]
         self.offer_history = []  # type: List[Offer]
         self.notification_listeners = []
-        self.bids = {}  # type: Dict[str, Bid]
+        self.bids = OrderBook()  # type: Dict[str, Bid]
         self.bid_history = []  # type: List[Bid]
-        self.trades = []  # type: List[Trade]
+        self.trades = TradeBook()  # type: List[Trade]
         self.const_fee_rate = None
 
         self._create_fee_handler(grid_fee_type, transfer_fees)
@@ -128,6 +130,42 @@ class Market:
                     transfer_fees.grid_fee_percentage / 100
                 )
 
+    @property
+    def offers(self):
+        return self._offers
+
+    @offers.setter
+    def offers(self, offers):
+        self._offers = offers if isinstance(offers, OrderBook) else OrderBook(offers)
+
+    @offers.deleter
+    def offers(self):
+        del self._offers
+
+    @property
+    def bids(self):
+        return self._bids
+
+    @bids.setter
+    def bids(self, bids):
+        self._bids = bids if isinstance(bids, OrderBook) else OrderBook(bids)
+
+    @bids.deleter
+    def bids(self):
+        del self._bids
+
+    @property
+    def trades(self):
+        return self._trades
+
+    @trades.setter
+    def trades(self, trades):
+        self._trades = trades if isinstance(trades, TradeBook) else TradeBook(trades)
+
+    @trades.deleter
+    def trades(self):
+        del self._trades
+
     @property
     def _is_constant_fees(self):
         return isinstance(self.fee_class, ConstantGridFees)
@@ -163,10 +201,9 @@ class Market:
 
     def _update_min_max_avg_offer_prices(self):
         self._avg_offer_price = None
-        offer_prices = [o.energy_rate for o in self.offers.values()]
-        if offer_prices:
-            self.min_offer_price = round(min(offer_prices), 4)
-            self.max_offer_price = round(max(offer_prices), 4)
+        if self.offers:
+            self.min_offer_price = round(self.offers.first_by_rate().energy_rate, 4)
+            self.max_offer_price = round(self.offers.last_by_rate().energy_rate, 4)
 
     def _update_min_max_avg_trade_prices(self, price):
         self.max_trade_price = round(max(self.max_trade_price, price), 4)
@@ -187,6 +224,9 @@ class Market:
 
     @staticmethod
     def sorting(obj, reverse_order=False):
+        if isinstance(obj, OrderBook):
+            # Order books are kept sorted by energy rate, no need to sort them again
+            return obj.sorted_by_rate(reverse_order)
         if reverse_order:
             # Sorted bids in descending order
             return list(reversed(sorted(
@@ -219,12 +259,17 @@ class Market:
     def sorted_offers(self):
         return self.sorting(self.offers)
 
+    @property
+    def cheapest_offer(self):
+        return self.offers.first_by_rate()
+
+    @property
+    def most_expensive_bid(self):
+        return self.bids.last_by_rate()
+
     @property
     def most_affordable_offers(self):
-        cheapest_offer = self.sorted_offers[0]
-        rate = cheapest_offer.energy_rate
-        return [o for o in self.sorted_offers if
-                abs(o.energy_rate - rate) < FLOATING_POINT_TOLERANCE]
+        return self.offers.lowest_rate_values(FLOATING_POINT_TOLERANCE)
 
     def update_clock(self, current_tick_in_slot):
         self.current_tick_in_slot = current_tick_in_slot
@@ -245,16 +290,16 @@ class Market:
         return self.accumulated_actual_energy_agg
 
     def bought_energy(self, buyer):
-        return sum(trade.offer.energy for trade in self.trades if trade.buyer == buyer)
+        return self.trades.bought_energy(buyer)
 
     def sold_energy(self, seller):
-        return sum(trade.offer.energy for trade in self.trades if trade.offer.seller == seller)
+        return self.trades.sold_energy(seller)
 
     def total_spent(self, buyer):
-        return sum(trade.offer.price for trade in self.trades if trade.buyer == buyer)
+        return self.trades.total_spent(buyer)
 
     def total_earned(self, seller):
-        return sum(trade.offer.price for trade in self.trades if trade.seller == seller)
+        return self.trades.total_earned(seller)
 
     @property
     def info(self):
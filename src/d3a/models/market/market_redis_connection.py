@@ -1,12 +1,12 @@
-import json
 import logging
 from concurrent.futures import ThreadPoolExecutor
 from uuid import uuid4
 
-from d3a.d3a_core.redis_connections.redis_area_market_communicator import ResettableCommunicator, \
-    BlockingCommunicator
+from d3a.d3a_core.redis_connections.redis_area_market_communicator import \
+    MultiplexedCommunicator, BlockingCommunicator
 from d3a.events import MarketEvent
 from d3a.models.market.market_structures import offer_from_JSON_string, bid_from_JSON_string
+from d3a.models.market.market_serialization import encode_payload, decode_payload
 from d3a.constants import REDIS_PUBLISH_RESPONSE_TIMEOUT, MAX_WORKER_THREADS
 
 
@@ -27,23 +27,22 @@ class MarketRedisEventPublisher:
         return f"market/{self.market_id}/notify_event/response"
 
     def response_callback(self, payload):
-        data = json.loads(payload["data"])
+        data = decode_payload(payload["data"])
 
         if "response" in data:
             self.event_response_uuids.append(data["transaction_uuid"])
 
     def publish_event(self, event_type: MarketEvent, **kwargs):
-        for key in ["offer", "trade", "new_offer", "existing_offer",
-                    "bid", "new_bid", "existing_bid", "bid_trade"]:
-            if key in kwargs:
-                kwargs[key] = kwargs[key].to_JSON_string()
         send_data = {"event_type": event_type.value, "kwargs": kwargs,
                      "transaction_uuid": str(uuid4())}
 
         self.redis.sub_to_channel(self.event_response_channel_name(), self.response_callback)
-        self.redis.publish(self.event_channel_name(), json.dumps(send_data))
+        self.redis.publish(self.event_channel_name(), encode_payload(send_data))
         self._wait_for_event_response(send_data)
 
+    def stop(self):
+        self.redis.terminate_connection()
+
     def _wait_for_event_response(self, send_data):
         def event_response_was_received_callback():
             return send_data["transaction_uuid"] in self.event_response_uuids
@@ -60,7 +59,7 @@ class MarketRedisEventPublisher:
 class MarketRedisEventSubscriber:
     def __init__(self, market):
         self.market_object = market
-        self.redis_db = ResettableCommunicator()
+        self.redis_db = MultiplexedCommunicator()
         self.sub_to_external_requests()
         self.executor = ThreadPoolExecutor(max_workers=MAX_WORKER_THREADS)
         self.futures = []
@@ -91,7 +90,7 @@ class MarketRedisEventSubscriber:
         self.redis_db.terminate_connection()
 
     def publish(self, channel, data):
-        self.redis_db.publish(channel, json.dumps(data))
+        self.redis_db.publish(channel, encode_payload(data))
 
     @property
     def _offer_channel(self):
@@ -118,8 +117,8 @@ class MarketRedisEventSubscriber:
         return f"{self._accept_offer_channel}/RESPONSE"
 
     def _parse_payload(self, payload):
-        data_dict = json.loads(payload["data"])
-        return MarketRedisEventSubscriber.sanitize_parameters(data_dict, self.market.now)
+        data_dict = decode_payload(payload["data"])
+        return self.sanitize_parameters(data_dict, self.market.now)
 
     @classmethod
     def sanitize_parameters(cls, data_dict, current_time):
@@ -144,7 +143,7 @@ class MarketRedisEventSubscriber:
         try:
             trade = self.market.accept_offer(**arguments)
             self.publish(self._accept_offer_response_channel,
-                         {"status": "ready", "trade": trade.to_JSON_string(),
+                         {"status": "ready", "trade": trade,
                           "transaction_uuid": transaction_uuid})
         except Exception as e:
             logging.error(f"Error when handling accept_offer on market {self.market.name}: "
@@ -164,7 +163,7 @@ class MarketRedisEventSubscriber:
         try:
             offer = self.market.offer(**arguments)
             self.publish(self._offer_response_channel,
-                         {"status": "ready", "offer": offer.to_JSON_string(),
+                         {"status": "ready", "offer": offer,
                           "transaction_uuid": transaction_uuid})
         except Exception as e:
             logging.error(f"Error when handling offer on market {self.market.name}: "
@@ -242,8 +241,8 @@ class TwoSidedMarketRedisEventSubscriber(MarketRedisEventSubscriber):
         return f"{self._clear_market_channel}/RESPONSE"
 
     @classmethod
-    def sanitize_parameters(cls, data_dict):
-        data_dict = super().sanitize_parameters(data_dict)
+    def sanitize_parameters(cls, data_dict, current_time):
+        data_dict = super().sanitize_parameters(data_dict, current_time)
         if "bid_or_id" in data_dict and data_dict["bid_or_id"] is not None:
             if isinstance(data_dict["bid_or_id"], str):
                 data_dict["bid_or_id"] = bid_from_JSON_string(data_dict["bid_or_id"])
@@ -263,7 +262,7 @@ class TwoSidedMarketRedisEventSubscriber(MarketRedisEventSubscriber):
         try:
             trade = self.market.accept_bid(**arguments)
             self.publish(self._accept_bid_response_channel,
-                         {"status": "ready", "trade": trade.to_JSON_string(),
+                         {"status": "ready", "trade": trade,
                           "transaction_uuid": transaction_uuid})
         except Exception as e:
             logging.error(f"Error when handling accept_bid on market {self.market.name}: "
@@ -283,7 +282,7 @@ class TwoSidedMarketRedisEventSubscriber(MarketRedisEventSubscriber):
         try:
             bid = self.market.bid(**arguments)
             self.publish(self._bid_response_channel,
-                         {"status": "ready", "bid": bid.to_JSON_string(),
+                         {"status": "ready", "bid": bid,
                           "transaction_uuid": transaction_uuid})
         except Exception as e:
             logging.error(f"Error when handling bid create on market {self.market.name}: "
@@ -0,0 +1,140 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+Encoding of the payloads that are exchanged via Redis between areas, markets and strategies.
+
+Offers, bids, trades and timestamps are embedded in the payload as tagged dicts, so that the
+whole payload is encoded / decoded at once instead of nesting the JSON string of every market
+object in the JSON string of the payload. The payload is encoded as JSON or msgpack, depending
+on d3a.constants.REDIS_WIRE_FORMAT. Decoding detects the format of every message, therefore
+publishers of different channels can use different formats.
+"""
+import json
+from pendulum import DateTime, parse
+
+from d3a import constants
+from d3a.d3a_core.exceptions import D3AException
+from d3a.events import MarketEvent
+from d3a.models.market.market_structures import Offer, BalancingOffer, Bid, Trade, \
+    BalancingTrade, TradeBidOfferInfo
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+TYPE_KEY = "__market_object__"
+
+
+def _offer_to_wire(offer):
+    return {
+        TYPE_KEY: offer.__class__.__name__,
+        "id": offer.id,
+        "real_id": offer.real_id,
+        "time": _to_wire(offer.time),
+        "price": offer.price,
+        "energy": offer.energy,
+        "seller": offer.seller,
+        "original_offer_price": offer.original_offer_price,
+        "seller_origin": offer.seller_origin,
+    }
+
+
+def _namedtuple_to_wire(record):
+    record_dict = {TYPE_KEY: record.__class__.__name__}
+    for field, value in zip(record._fields, record):
+        record_dict[field] = _to_wire(value)
+    return record_dict
+
+
+_ENCODERS = {
+    Offer: _offer_to_wire,
+    BalancingOffer: _offer_to_wire,
+    Bid: _namedtuple_to_wire,
+    Trade: _namedtuple_to_wire,
+    BalancingTrade: _namedtuple_to_wire,
+    TradeBidOfferInfo: _namedtuple_to_wire,
+    DateTime: lambda time: {TYPE_KEY: "DateTime", "value": time.isoformat()},
+}
+
+
+def _to_wire(value):
+    encoder = _ENCODERS.get(type(value))
+    if encoder is not None:
+        return encoder(value)
+    if isinstance(value, dict):
+        return {key: _to_wire(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_wire(item) for item in value]
+    return value
+
+
+def _offer_from_wire(offer_class, record_dict):
+    real_id = record_dict.pop("real_id")
+    offer = offer_class(**record_dict)
+    offer.real_id = real_id
+    return offer
+
+
+_DECODERS = {
+    "Offer": lambda record_dict: _offer_from_wire(Offer, record_dict),
+    "BalancingOffer": lambda record_dict: _offer_from_wire(BalancingOffer, record_dict),
+    "Bid": lambda record_dict: Bid(**record_dict),
+    "Trade": lambda record_dict: Trade(**record_dict),
+    "BalancingTrade": lambda record_dict: BalancingTrade(**record_dict),
+    "TradeBidOfferInfo": lambda record_dict: TradeBidOfferInfo(**record_dict),
+    "DateTime": lambda record_dict: parse(record_dict["value"]),
+}
+
+
+def _from_wire(record_dict):
+    # Called for every decoded dict, innermost first
+    object_type = record_dict.pop(TYPE_KEY, None)
+    if object_type is None:
+        return record_dict
+    return _DECODERS[object_type](record_dict)
+
+
+def encode_payload(data, wire_format=None):
+    """
+    Encode a payload that may contain market objects, as str (json) or bytes (msgpack).
+    """
+    if wire_format is None:
+        wire_format = constants.REDIS_WIRE_FORMAT
+    if wire_format == "json":
+        return json.dumps(_to_wire(data))
+    if wire_format == "msgpack":
+        if msgpack is None:
+            raise D3AException("The msgpack Redis wire format requires the msgpack package.")
+        return msgpack.packb(_to_wire(data), use_bin_type=True)
+    raise D3AException(f"Unknown Redis wire format {wire_format}.")
+
+
+def decode_payload(raw_data):
+    """
+    Decode a payload that was encoded by encode_payload or is plain JSON.
+    """
+    if isinstance(raw_data, (bytes, bytearray)) and raw_data[:1] not in (b"{", b"[", b'"'):
+        if msgpack is None:
+            raise D3AException("Received a msgpack payload, but msgpack is not installed.")
+        return msgpack.unpackb(raw_data, object_hook=_from_wire, raw=False)
+    return json.loads(raw_data, object_hook=_from_wire)
+
+
+def parse_event_and_parameters_from_payload(payload):
+    data = decode_payload(payload["data"])
+    return MarketEvent(data["event_type"]), data["kwargs"]
@@ -15,12 +15,11 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
+import sys
 from collections import namedtuple
 from typing import Dict  # noqa
-from copy import deepcopy
 import json
 from pendulum import DateTime, parse
-from d3a.events import MarketEvent
 from d3a_interface.utils import datetime_to_string_incl_seconds, key_in_dict_and_not_none
 
 Clearing = namedtuple('Clearing', ('rate', 'energy'))
@@ -31,7 +30,18 @@ def my_converter(o):
         return o.isoformat()
 
 
+def intern_name(name):
+    """
+    Area and IAA names are repeated in every offer, bid and trade of the simulation, share
+    one string object per name instead of keeping a copy per record.
+    """
+    return sys.intern(name) if type(name) is str else name
+
+
 class Offer:
+    __slots__ = ('id', 'real_id', 'price', 'original_offer_price', 'energy', 'seller',
+                 'seller_origin', 'energy_rate', 'time')
+
     def __init__(self, id, time, price, energy, seller,
                  original_offer_price=None, seller_origin=None):
         self.id = str(id)
@@ -39,8 +49,8 @@ class Offer:
         self.price = price
         self.original_offer_price = original_offer_price
         self.energy = energy
-        self.seller = seller
-        self.seller_origin = seller_origin
+        self.seller = intern_name(seller)
+        self.seller_origin = intern_name(seller_origin)
         self.energy_rate = price / energy
         self.time = time
 
@@ -58,9 +68,9 @@ class Offer:
             .format(s=self, rate=self.energy_rate)
 
     def to_JSON_string(self):
-        offer_dict = deepcopy(self.__dict__)
+        offer_dict = {field: getattr(self, field) for field in Offer.__slots__
+                      if field != 'energy_rate'}
         offer_dict["type"] = "Offer"
-        offer_dict.pop('energy_rate', None)
         return json.dumps(offer_dict, default=my_converter)
 
     def serializable_dict(self):
@@ -112,13 +122,16 @@ def offer_from_JSON_string(offer_string, current_time):
 
 class Bid(namedtuple('Bid', ('id', 'time', 'price', 'energy', 'buyer', 'seller',
                              'original_bid_price', 'buyer_origin', 'energy_rate'))):
+    __slots__ = ()
+
     def __new__(cls, id, time, price, energy, buyer, seller, original_bid_price=None,
                 buyer_origin=None, energy_rate=None):
         if energy_rate is None:
             energy_rate = price / energy
         # overridden to give the residual field a default value
-        return super(Bid, cls).__new__(cls, str(id), time, price, energy, buyer, seller,
-                                       original_bid_price, buyer_origin, energy_rate)
+        return super(Bid, cls).__new__(cls, str(id), time, price, energy, intern_name(buyer),
+                                       intern_name(seller), original_bid_price,
+                                       intern_name(buyer_origin), energy_rate)
 
     def __repr__(self):
         return (
@@ -182,6 +195,8 @@ class TradeBidOfferInfo(namedtuple('TradeBidOfferInfo', ('original_bid_rate',
                                                          'original_offer_rate',
                                                          'propagated_offer_rate',
                                                          'trade_rate'))):
+    __slots__ = ()
+
     def to_JSON_string(self):
         return json.dumps(self._asdict(), default=my_converter)
 
@@ -198,13 +213,16 @@ def trade_bid_info_from_JSON_string(info_string):
 class Trade(namedtuple('Trade', ('id', 'time', 'offer', 'seller', 'buyer', 'residual',
                                  'already_tracked', 'offer_bid_trade_info', 'seller_origin',
                                  'buyer_origin', 'fee_price'))):
+    __slots__ = ()
+
     def __new__(cls, id, time, offer, seller, buyer, residual=None,
                 already_tracked=False, offer_bid_trade_info=None,
                 seller_origin=None, buyer_origin=None, fee_price=None):
         # overridden to give the residual field a default value
-        return super(Trade, cls).__new__(cls, id, time, offer, seller, buyer, residual,
-                                         already_tracked, offer_bid_trade_info, seller_origin,
-                                         buyer_origin, fee_price)
+        return super(Trade, cls).__new__(cls, id, time, offer, intern_name(seller),
+                                         intern_name(buyer), residual, already_tracked,
+                                         offer_bid_trade_info, intern_name(seller_origin),
+                                         intern_name(buyer_origin), fee_price)
 
     def __str__(self):
         return (
@@ -271,6 +289,7 @@ def trade_from_JSON_string(trade_string, current_time):
 
 
 class BalancingOffer(Offer):
+    __slots__ = ()
 
     def __repr__(self):
         return "<BalancingOffer('{s.id!s:.6s}', '{s.energy} kWh@{s.price}', '{s.seller} {rate}'>"\
@@ -285,12 +304,16 @@ class BalancingOffer(Offer):
 class BalancingTrade(namedtuple('BalancingTrade', ('id', 'time', 'offer', 'seller',
                                                    'buyer', 'residual', 'offer_bid_trade_info',
                                                    'seller_origin', 'buyer_origin', 'fee_price'))):
+    __slots__ = ()
+
     def __new__(cls, id, time, offer, seller, buyer, residual=None, offer_bid_trade_info=None,
                 seller_origin=None, buyer_origin=None, fee_price=None):
         # overridden to give the residual field a default value
-        return super(BalancingTrade, cls).__new__(cls, id, time, offer, seller,
-                                                  buyer, residual, offer_bid_trade_info,
-                                                  seller_origin, buyer_origin, fee_price)
+        return super(BalancingTrade, cls).__new__(cls, id, time, offer, intern_name(seller),
+                                                  intern_name(buyer), residual,
+                                                  offer_bid_trade_info,
+                                                  intern_name(seller_origin),
+                                                  intern_name(buyer_origin), fee_price)
 
     def __str__(self):
         return (
@@ -321,20 +344,3 @@ class MarketClearingState:
 
 
 BidOfferMatch = namedtuple('BidOfferMatch', ['bid', 'bid_energy', 'offer', 'offer_energy'])
-
-
-def parse_event_and_parameters_from_json_string(payload):
-    data = json.loads(payload["data"])
-    kwargs = data["kwargs"]
-    for key in ["offer", "existing_offer", "new_offer"]:
-        if key in kwargs:
-            kwargs[key] = offer_from_JSON_string(kwargs[key])
-    if "trade" in kwargs:
-        kwargs["trade"] = trade_from_JSON_string(kwargs["trade"])
-    for key in ["bid", "existing_bid", "new_bid"]:
-        if key in kwargs:
-            kwargs[key] = bid_from_JSON_string(kwargs[key])
-    if "bid_trade" in kwargs:
-        kwargs["bid_trade"] = trade_from_JSON_string(kwargs["bid_trade"])
-    event_type = MarketEvent(data["event_type"])
-    return event_type, kwargs
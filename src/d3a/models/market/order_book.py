@@ -0,0 +1,137 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from itertools import count
+from sortedcontainers import SortedList
+
+_MISSING = object()
+
+
+class OrderBook(dict):
+    """
+    Dict of offers or bids (id -> Offer / Bid) that keeps its values indexed by energy rate.
+
+    The index is updated on every insertion / removal, therefore the cheapest and most
+    expensive entries are available in O(log n) and the sorted view does not need to
+    re-sort the whole book. Entries with equal energy rates keep their insertion order,
+    the same order that sorted() on the plain dict values would return.
+
+    The index stores the energy rate that the entry had when it was inserted. Entries that
+    are modified in place (e.g. via Offer.update_price) have to be re-inserted in order to
+    be re-indexed.
+
+    The keys of new entries are also appended to an insertion log, therefore consumers that
+    only need the entries added since they last looked (e.g. the inter area agents) do not
+    have to scan the whole book. The log is kept for the lifetime of the book.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self._rate_index = SortedList()
+        # id -> (energy_rate, insertion_position, id)
+        self._index_keys = {}
+        self._insertion_counter = count()
+        self._insertion_log = []
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, key, value):
+        index_key = self._index_keys.pop(key, None)
+        if index_key is None:
+            position = next(self._insertion_counter)
+            self._insertion_log.append(key)
+        else:
+            # Overwriting an existing key does not change its position in the dict
+            self._rate_index.remove(index_key)
+            position = index_key[1]
+        index_key = (value.energy_rate, position, key)
+        self._rate_index.add(index_key)
+        self._index_keys[key] = index_key
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._remove_from_index(key)
+
+    def _remove_from_index(self, key):
+        self._rate_index.remove(self._index_keys.pop(key))
+
+    def pop(self, key, default=_MISSING):
+        if key in self:
+            value = super().pop(key)
+            self._remove_from_index(key)
+            return value
+        if default is _MISSING:
+            raise KeyError(key)
+        return default
+
+    def popitem(self):
+        key, value = super().popitem()
+        self._remove_from_index(key)
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        super().clear()
+        self._rate_index.clear()
+        self._index_keys.clear()
+
+    def copy(self):
+        return self.__class__(self)
+
+    def __reduce__(self):
+        return self.__class__, (dict(self), )
+
+    def inserted_since(self, log_position):
+        """
+        Keys that were inserted after log_position and are still in the book, together with
+        the log position to pass on the next call
+        """
+        keys = [key for key in self._insertion_log[log_position:] if key in self]
+        return keys, len(self._insertion_log)
+
+    def sorted_by_rate(self, reverse=False):
+        """Values sorted by energy rate, in ascending order unless reverse is set"""
+        index = reversed(self._rate_index) if reverse else self._rate_index
+        return [self[index_key[2]] for index_key in index]
+
+    def first_by_rate(self):
+        """Value with the lowest energy rate, None if the order book is empty"""
+        return self[self._rate_index[0][2]] if self._rate_index else None
+
+    def last_by_rate(self):
+        """Value with the highest energy rate, None if the order book is empty"""
+        return self[self._rate_index[-1][2]] if self._rate_index else None
+
+    def lowest_rate_values(self, tolerance):
+        """Values whose energy rate differs less than tolerance from the lowest rate"""
+        if not self._rate_index:
+            return []
+        lowest_rate = self._rate_index[0][0]
+        values = []
+        for rate, _, key in self._rate_index:
+            if abs(rate - lowest_rate) >= tolerance:
+                break
+            values.append(self[key])
+        return values
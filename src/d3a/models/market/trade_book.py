@@ -0,0 +1,131 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+class TradeBook(list):
+    """
+    List of the trades of a market that keeps them indexed by participant.
+
+    The trades of every seller / buyer and their running energy and price totals are
+    updated on every appended trade, therefore the accounting of a single participant does
+    not need to scan the trades of all participants. Sold energy is accounted to the seller
+    of the offer / bid (trade.offer.seller), earnings to the seller of the trade
+    (trade.seller), the same way as the scans in Market did.
+    """
+
+    def __init__(self, trades=()):
+        super().__init__()
+        self._reset_index()
+        self.extend(trades)
+
+    def _reset_index(self):
+        self._trades_by_participant = {}
+        self._bought_energy = {}
+        self._sold_energy = {}
+        self._spent = {}
+        self._earned = {}
+
+    def _index(self, trade):
+        self._trades_by_participant.setdefault(trade.seller, []).append(trade)
+        if trade.buyer != trade.seller:
+            self._trades_by_participant.setdefault(trade.buyer, []).append(trade)
+        offer = trade.offer
+        self._bought_energy[trade.buyer] = self._bought_energy.get(trade.buyer, 0) + offer.energy
+        self._sold_energy[offer.seller] = self._sold_energy.get(offer.seller, 0) + offer.energy
+        self._spent[trade.buyer] = self._spent.get(trade.buyer, 0) + offer.price
+        self._earned[trade.seller] = self._earned.get(trade.seller, 0) + offer.price
+
+    def _rebuild_index(self):
+        self._reset_index()
+        for trade in self:
+            self._index(trade)
+
+    def append(self, trade):
+        super().append(trade)
+        self._index(trade)
+
+    def extend(self, trades):
+        for trade in trades:
+            self.append(trade)
+
+    def __iadd__(self, trades):
+        self.extend(trades)
+        return self
+
+    # Trades are only appended during the simulation, the other mutations re-index all trades
+    def insert(self, index, trade):
+        super().insert(index, trade)
+        self._rebuild_index()
+
+    def remove(self, trade):
+        super().remove(trade)
+        self._rebuild_index()
+
+    def pop(self, index=-1):
+        trade = super().pop(index)
+        self._rebuild_index()
+        return trade
+
+    def clear(self):
+        super().clear()
+        self._reset_index()
+
+    def __setitem__(self, index, trade):
+        super().__setitem__(index, trade)
+        self._rebuild_index()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._rebuild_index()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._rebuild_index()
+
+    def reverse(self):
+        super().reverse()
+        self._rebuild_index()
+
+    def copy(self):
+        return self.__class__(self)
+
+    def __reduce__(self):
+        return self.__class__, (list(self), )
+
+    def trades_of(self, participant):
+        """Trades in which participant is the seller or the buyer, in trade order"""
+        return self._trades_by_participant.get(participant, [])
+
+    def bought_energy(self, buyer):
+        return self._bought_energy.get(buyer, 0)
+
+    def sold_energy(self, seller):
+        return self._sold_energy.get(seller, 0)
+
+    def total_spent(self, buyer):
+        return self._spent.get(buyer, 0)
+
+    def total_earned(self, seller):
+        return self._earned.get(seller, 0)
+
+
+def trades_of(trades, participant):
+    """Trades in which participant is the seller or the buyer, for any sequence of trades"""
+    if isinstance(trades, TradeBook):
+        return trades.trades_of(participant)
+    return [t for t in trades if t.seller == participant or t.buyer == participant]
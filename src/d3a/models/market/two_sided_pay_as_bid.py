@@ -211,16 +211,36 @@ class TwoSidedPayAsBid(OneSidedMarket):
         # Sorted offers in descending order
         sorted_offers = self.sorting(self.offers, True)
 
-        already_selected_bids = set()
+        # Each offer is matched with the most expensive bid that is not selected yet and
+        # that does not belong to the seller of the offer. Both lists are sorted, therefore
+        # a single sweep over the bids is sufficient. Bids that were skipped because their
+        # buyer is the seller of the offer stay available for the following offers.
+        skipped_bids = []
+        bid_index = 0
         offer_bid_pairs = []
         for offer in sorted_offers:
-            for bid in sorted_bids:
-                if bid.id not in already_selected_bids and \
-                        (offer.energy_rate - bid.energy_rate) <= \
-                        FLOATING_POINT_TOLERANCE and offer.seller != bid.buyer:
-                    already_selected_bids.add(bid.id)
-                    offer_bid_pairs.append(tuple((bid, offer)))
+            candidate_bid, skipped_index = None, None
+            for index, bid in enumerate(skipped_bids):
+                if offer.seller != bid.buyer:
+                    candidate_bid, skipped_index = bid, index
                     break
+            while candidate_bid is None and bid_index < len(sorted_bids):
+                bid = sorted_bids[bid_index]
+                bid_index += 1
+                if offer.seller != bid.buyer:
+                    candidate_bid = bid
+                else:
+                    skipped_bids.append(bid)
+            if candidate_bid is None:
+                continue
+            if (offer.energy_rate - candidate_bid.energy_rate) <= FLOATING_POINT_TOLERANCE:
+                offer_bid_pairs.append(tuple((candidate_bid, offer)))
+                if skipped_index is not None:
+                    skipped_bids.pop(skipped_index)
+            elif skipped_index is None:
+                # Bids are sorted, the following bids are cheaper than the candidate bid.
+                # Keep the candidate for the following (cheaper) offers.
+                bid_index -= 1
         return offer_bid_pairs
 
     def accept_bid_offer_pair(self, bid, offer, clearing_rate, trade_bid_info, selected_energy):
@@ -244,8 +264,11 @@ class TwoSidedPayAsBid(OneSidedMarket):
         return bid_trade, trade
 
     def match_offers_bids(self):
-        while len(self._perform_pay_as_bid_matching()) > 0:
-            for bid, offer in self._perform_pay_as_bid_matching():
+        # Every round matches each offer at most once, partially traded offers and bids
+        # leave residuals in the order books that are matched on the following rounds.
+        offer_bid_pairs = self._perform_pay_as_bid_matching()
+        while len(offer_bid_pairs) > 0:
+            for bid, offer in offer_bid_pairs:
                 selected_energy = bid.energy if bid.energy < offer.energy else offer.energy
                 original_bid_rate = bid.original_bid_price / bid.energy
                 matched_rate = bid.energy_rate
@@ -259,3 +282,4 @@ class TwoSidedPayAsBid(OneSidedMarket):
 
                 self.accept_bid_offer_pair(bid, offer, matched_rate,
                                            trade_bid_info, selected_energy)
+            offer_bid_pairs = self._perform_pay_as_bid_matching()
@@ -22,6 +22,8 @@ from collections import OrderedDict
 from d3a.models.market.two_sided_pay_as_bid import TwoSidedPayAsBid
 from d3a.models.market.market_structures import MarketClearingState, BidOfferMatch, \
     TradeBidOfferInfo, Clearing
+from d3a.models.market.vectorized_clearing import continuous_clearing_point, \
+    discrete_clearing_point
 from d3a_interface.constants_limits import ConstSettings, GlobalConfig
 from d3a.d3a_core.util import add_or_create_key
 from d3a.constants import FLOATING_POINT_TOLERANCE
@@ -130,6 +132,16 @@ class TwoSidedPayAsClear(TwoSidedPayAsBid):
             max_rate = self._populate_market_cumulative_offer_and_bid(cumulative_bids,
                                                                       cumulative_offers)
             return self._get_clearing_point(max_rate)
+        elif ConstSettings.IAASettings.PAY_AS_CLEAR_AGGREGATION_ALGORITHM in (3, 4):
+            # NumPy implementations of the algorithms 1 and 2 respectively
+            clearing_point_functor = continuous_clearing_point \
+                if ConstSettings.IAASettings.PAY_AS_CLEAR_AGGREGATION_ALGORITHM == 3 \
+                else discrete_clearing_point
+            clearing, (cumulative_bids, cumulative_offers) = \
+                clearing_point_functor(self.sorted_bids, self.sorted_offers)
+            self.state.cumulative_bids[self.now] = cumulative_bids
+            self.state.cumulative_offers[self.now] = cumulative_offers
+            return clearing
 
     def _populate_market_cumulative_offer_and_bid(self, cumulative_bids, cumulative_offers):
         max_rate = max(
@@ -0,0 +1,125 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+NumPy implementations of the pay as clear supply / demand curve aggregation.
+
+Both functions expect the bids sorted by energy rate in descending order and the offers
+sorted by energy rate in ascending order, as returned by Market.sorting(). They return the
+clearing point as (rate, energy) or None, together with the cumulative supply and demand
+curves as {rate: cumulative energy} dicts, for the market clearing state.
+"""
+import numpy as np
+
+from d3a.constants import FLOATING_POINT_TOLERANCE
+
+
+def _rates_and_energies(orders):
+    rates = np.fromiter((o.price / o.energy for o in orders), dtype=float, count=len(orders))
+    energies = np.fromiter((o.energy for o in orders), dtype=float, count=len(orders))
+    return rates, energies
+
+
+def _last_of_equal_values(values):
+    """Mask that selects the last element of every run of equal values"""
+    return np.append(values[1:] != values[:-1], True)
+
+
+def _curve_dict(rates, energies):
+    return dict(zip(rates.tolist(), energies.tolist()))
+
+
+def continuous_clearing_point(sorted_bids, sorted_offers):
+    """
+    Equivalent of PAY_AS_CLEAR_AGGREGATION_ALGORITHM 1: the clearing rate is the lowest bid
+    rate, for which the offers that are cheaper than this rate can cover the demand of all
+    bids that are at least as expensive.
+    """
+    bid_rates, bid_energies = _rates_and_energies(sorted_bids)
+    offer_rates, offer_energies = _rates_and_energies(sorted_offers)
+
+    # Cumulative demand / supply, one point per distinct rate
+    demand = np.cumsum(bid_energies)
+    bid_mask = _last_of_equal_values(bid_rates)
+    bid_rates, demand = bid_rates[bid_mask], demand[bid_mask]
+    supply = np.cumsum(offer_energies)
+    offer_mask = _last_of_equal_values(offer_rates)
+    offer_rates, supply = offer_rates[offer_mask], supply[offer_mask]
+    curves = _curve_dict(bid_rates, demand), _curve_dict(offer_rates, supply)
+
+    # Bid rates in ascending order
+    bid_rates, demand = bid_rates[::-1], demand[::-1]
+    # Most expensive offer that can be matched with each bid rate
+    offer_index = np.searchsorted(
+        offer_rates, bid_rates + FLOATING_POINT_TOLERANCE, side='right') - 1
+    matchable = offer_index >= 0
+    if not matchable.any():
+        return None, curves
+    matched_supply = np.where(matchable, supply[np.maximum(offer_index, 0)], 0.0)
+
+    # Cumulative supply is greater than cumulative demand
+    cleared = matchable & (matched_supply >= demand)
+    if cleared.any():
+        index = int(np.argmax(cleared))
+        return (float(bid_rates[index]), float(demand[index])), curves
+    index = int(np.flatnonzero(matchable)[-1])
+    return (float(bid_rates[index]), float(matched_supply[index])), curves
+
+
+def discrete_clearing_point(sorted_bids, sorted_offers):
+    """
+    Equivalent of PAY_AS_CLEAR_AGGREGATION_ALGORITHM 2: bid rates are rounded down and offer
+    rates are rounded up to integers, the clearing rate is the first integer rate for which
+    supply covers demand. Instead of evaluating every integer rate, the curves are only
+    evaluated on the rates where supply or demand changes.
+    """
+    bid_rates = np.floor([b.energy_rate for b in sorted_bids]).astype(int)
+    bid_energies = np.fromiter((b.energy for b in sorted_bids), dtype=float,
+                               count=len(sorted_bids))
+    offer_rates = np.ceil([o.energy_rate for o in sorted_offers]).astype(int)
+    offer_energies = np.fromiter((o.energy for o in sorted_offers), dtype=float,
+                                 count=len(sorted_offers))
+    max_rate = max(offer_rates[-1], bid_rates[0])
+
+    demand = np.cumsum(bid_energies)
+    supply = np.cumsum(offer_energies)
+    bid_mask = _last_of_equal_values(bid_rates)
+    offer_mask = _last_of_equal_values(offer_rates)
+    curves = (_curve_dict(bid_rates[bid_mask], demand[bid_mask]),
+              _curve_dict(offer_rates[offer_mask], supply[offer_mask]))
+
+    def _supply_at(rates):
+        index = np.searchsorted(offer_rates, rates, side='right')
+        return np.where(index > 0, supply[np.maximum(index - 1, 0)], 0.0)
+
+    def _demand_at(rates):
+        # Bid rates are sorted in descending order
+        index = np.searchsorted(-bid_rates, -rates, side='right')
+        return np.where(index > 0, demand[np.maximum(index - 1, 0)], 0.0)
+
+    candidates = np.unique(np.concatenate(([1], offer_rates, bid_rates + 1)))
+    candidates = candidates[(candidates >= 1) & (candidates <= max_rate)]
+    if len(candidates) == 0:
+        return None, curves
+    candidate_demand = _demand_at(candidates)
+    cleared = _supply_at(candidates) >= candidate_demand
+    if not cleared.any():
+        return None, curves
+    index = int(np.argmax(cleared))
+    rate = int(candidates[index])
+    if candidate_demand[index] == 0:
+        return (rate - 1, float(_supply_at(np.array([rate - 1]))[0])), curves
+    return (rate, float(candidate_demand[index])), curves
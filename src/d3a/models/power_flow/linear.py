@@ -0,0 +1,194 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import csv
+import os
+from collections import OrderedDict
+from logging import getLogger
+from math import sqrt
+
+import numpy as np
+from pendulum import duration
+from scipy.sparse import csc_matrix
+from scipy.sparse.linalg import splu
+
+from d3a.models.power_flow import PowerFlowBase
+from d3a_interface.utils import mkdir_from_str
+
+log = getLogger(__name__)
+
+# Parameters of the lines between the areas, the same as the lines of PandaPowerFlow
+# (pandapower standard type "NAYY 4x150 SE", 100m)
+LINE_LENGTH_KM = 0.1
+LINE_RESISTANCE_OHM_PER_KM = 0.208
+LINE_MAX_CURRENT_KA = 0.27
+# Allowed deviation of the bus voltages from the nominal voltage (EN 50160)
+VOLTAGE_TOLERANCE_PU = 0.1
+
+
+class LinearPowerFlow(PowerFlowBase):
+    """
+    Linearized (DC) power flow of the area tree, solved for every market slot.
+
+    Every area without strategy is a bus that is connected to the bus of its parent by a line,
+    the external grid (or the root area) is the slack bus. The incidence matrix of the grid is
+    factorized once, the line flows and bus voltages of a market slot are then solved from the
+    energy that the devices of every bus traded in the slot. Reactive power and losses are
+    neglected, the voltage drops are linearized around the nominal voltage.
+    """
+
+    def __init__(self, root_area, root_voltage=400):
+        """
+        :param root_area: contains tree structured hierarchical energy grid
+        :param root_voltage: nominal line to line voltage of the grid in V
+        """
+        self.root_area = root_area
+        self.bus_names = []
+        self.line_names = []
+        self._line_buses = []
+        self._bus_areas = {}
+        self._bus_devices = {}
+        self.slack_bus = None
+        self.line_loading_percent = OrderedDict()
+        self.bus_voltage_pu = OrderedDict()
+        super().__init__(root_area, root_voltage)
+        if self.slack_bus is None:
+            self.slack_bus = 0
+        self._factorize_incidence_matrix()
+
+    def create_bus(self, area, voltage):
+        self.bus_names.append(area.name)
+        self._bus_areas[len(self.bus_names) - 1] = area
+        return len(self.bus_names) - 1
+
+    def add_external_grid(self, area):
+        if self.slack_bus is None:
+            self.slack_bus = area.parent.bus
+        return self.slack_bus
+
+    def _add_device(self, area):
+        self._bus_devices.setdefault(area.parent.bus, set()).add(area.name)
+        return area.parent.bus
+
+    def add_load_device(self, area, avg_power_w):
+        return self._add_device(area)
+
+    def add_generation_device(self, area, peak_power_kw):
+        return self._add_device(area)
+
+    def add_storage_device(self, area):
+        return self._add_device(area)
+
+    def add_line(self, source_area, target_area):
+        self.line_names.append(str(source_area.name) + str("->") + str(target_area.name))
+        self._line_buses.append((source_area.bus, target_area.bus))
+        return len(self.line_names) - 1
+
+    def _factorize_incidence_matrix(self):
+        """
+        The lines of the area tree connect every bus to the slack bus on exactly one path, the
+        incidence matrix without the column of the slack bus is therefore square and regular.
+        """
+        line_count = len(self.line_names)
+        self._other_buses = np.array(
+            [bus for bus in range(len(self.bus_names)) if bus != self.slack_bus], dtype=int)
+        self._incidence_lu = None
+        if line_count == 0:
+            return
+        incidence = csc_matrix(
+            (np.tile([1., -1.], line_count),
+             (np.repeat(np.arange(line_count), 2), np.array(self._line_buses).ravel())),
+            shape=(line_count, len(self.bus_names)))
+        self._slack_incidence = incidence[:, self.slack_bus].toarray().ravel()
+        self._incidence_lu = splu(incidence[:, self._other_buses].tocsc())
+
+    def _bus_power_kW(self, time_slot):
+        """
+        Net power that the devices of every bus consumed in time_slot (negative if the devices
+        produced more than they consumed)
+        """
+        slot_hours = self.root_area.config.slot_length / duration(hours=1)
+        bus_power_kW = np.zeros(len(self.bus_names))
+        for bus, device_names in self._bus_devices.items():
+            try:
+                market = self._bus_areas[bus].get_past_market(time_slot)
+            except KeyError:
+                continue
+            for trade in market.trades:
+                if trade.buyer in device_names:
+                    bus_power_kW[bus] += trade.offer.energy / slot_hours
+                if trade.seller in device_names:
+                    bus_power_kW[bus] -= trade.offer.energy / slot_hours
+        return bus_power_kW
+
+    def run_slot_power_flow(self, time_slot):
+        """
+        Solves the line loadings and bus voltages of the traded energy of time_slot
+        """
+        bus_voltage_pu = np.ones(len(self.bus_names))
+        line_loading_percent = np.zeros(len(self.line_names))
+        if self._incidence_lu is not None:
+            bus_power_kW = self._bus_power_kW(time_slot)
+            # Every bus consumes the difference between the flows of its lines
+            line_flow_kW = self._incidence_lu.solve(-bus_power_kW[self._other_buses],
+                                                    trans='T')
+            voltage_drop_pu = LINE_RESISTANCE_OHM_PER_KM * LINE_LENGTH_KM * \
+                line_flow_kW * 1000 / self.root_voltage ** 2
+            bus_voltage_pu[self._other_buses] = \
+                self._incidence_lu.solve(voltage_drop_pu - self._slack_incidence)
+            line_current_kA = np.abs(line_flow_kW) / (sqrt(3) * self.root_voltage)
+            line_loading_percent = line_current_kA / LINE_MAX_CURRENT_KA * 100
+        self.bus_voltage_pu[time_slot] = bus_voltage_pu
+        self.line_loading_percent[time_slot] = line_loading_percent
+        self._log_violated_constraints(time_slot)
+
+    def _log_violated_constraints(self, time_slot):
+        overloaded_lines = [name for name, loading in
+                            zip(self.line_names, self.line_loading_percent[time_slot])
+                            if loading > 100]
+        if overloaded_lines:
+            log.warning(f"Overloaded lines in market slot {time_slot}: {overloaded_lines}")
+        voltage_violations = [name for name, voltage in
+                              zip(self.bus_names, self.bus_voltage_pu[time_slot])
+                              if abs(voltage - 1) > VOLTAGE_TOLERANCE_PU]
+        if voltage_violations:
+            log.warning(f"Bus voltages out of tolerance in market slot {time_slot}: "
+                        f"{voltage_violations}")
+
+    def run_power_flow(self):
+        """
+        Solves the power flow of the market slot that closed last, if it was not solved yet
+        """
+        market = self.root_area.current_market
+        if market is None or market.time_slot in self.bus_voltage_pu:
+            return
+        self.run_slot_power_flow(market.time_slot)
+
+    def export_power_flow_results(self, directory):
+        mkdir_from_str(directory)
+        self._export_time_series(os.path.join(directory, 'power_flow_line_loading.csv'),
+                                 self.line_names, self.line_loading_percent)
+        self._export_time_series(os.path.join(directory, 'power_flow_bus_voltage.csv'),
+                                 self.bus_names, self.bus_voltage_pu)
+
+    @staticmethod
+    def _export_time_series(file_path, names, time_series):
+        with open(file_path, 'w') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(['slot'] + names)
+            for time_slot, values in time_series.items():
+                writer.writerow([time_slot] + [round(value, 4) for value in values])
@@ -16,15 +16,19 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 import os
-import platform
 
 from d3a.models.power_flow import PowerFlowBase
 from d3a.d3a_core.util import convert_unit_to_mega, convert_kilo_to_mega, convert_percent_to_ratio
 from d3a.d3a_core.export import mkdir_from_str
-from d3a_interface.constants_limits import GlobalConfig
-if platform.python_implementation() != "PyPy" and GlobalConfig.POWER_FLOW is True:
+try:
     import pandapower as pp
     from pandapower.plotting import to_html
+except ImportError:
+    pp = None
+
+# pandapower is optional, it is used to cross-check the power flow with the nominal powers
+# of the devices
+PANDAPOWER_INSTALLED = pp is not None
 
 
 class PandaPowerFlow(PowerFlowBase):
@@ -18,13 +18,21 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 import csv
 import os
 import ast
+import re
+from collections import namedtuple
 from enum import Enum
+from hashlib import sha1
+from logging import getLogger
+import numpy as np
 from pendulum import duration, from_format, from_timestamp, today, DateTime
 from typing import Dict
+from d3a import constants
 from d3a.constants import TIME_FORMAT, DATE_TIME_FORMAT, TIME_ZONE
 from d3a_interface.constants_limits import GlobalConfig, DATE_TIME_FORMAT_SECONDS
 from d3a.d3a_core.util import generate_market_slot_list, convert_kW_to_kWh
 
+log = getLogger(__name__)
+
 """
 Exposes mixins that can be used from strategy classes.
 """
@@ -35,6 +43,32 @@ class InputProfileTypes(Enum):
     POWER = 2
 
 
+# Slot values of a profile, time_slots is shared between profiles and must not be modified
+ProfileArray = namedtuple('ProfileArray', ('time_slots', 'values'))
+
+# Time / value pairs of a parsed profile. The times are Unix timestamps, or offsets from the
+# start date of the simulation if relative is set. hhmm (hour * 100 + minute of every time)
+# is only set if it can not be derived from the timestamps in UTC.
+_ProfileSource = namedtuple('_ProfileSource', ('seconds', 'values', 'relative', 'hhmm'))
+# Times of the slots of the current simulation config, see _slot_grid()
+_SlotGrid = namedtuple('_SlotGrid', ('time_slots', 'seconds', 'market_slot_seconds',
+                                     'market_slot_hhmm', 'utc_time_slots'))
+
+# Parsed profiles by content hash
+_profile_source_cache = {}  # type: Dict[str, _ProfileSource]
+# Slot values by (content hash or single value, profile type, simulation config)
+_slot_values_cache = {}
+# Slot grids by simulation config
+_slot_grid_cache = {}  # type: Dict[tuple, _SlotGrid]
+
+# Time formats that are parsed without pendulum, pendulum format -> pattern of the time strings
+_FAST_TIME_FORMATS = {
+    "HH:mm": re.compile(r"(\d{2}):(\d{2})"),
+    "YYYY-MM-DDTHH:mm": re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}"),
+    "YYYY-MM-DDTHH:mm:ss": re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}"),
+}
+
+
 def _str_to_datetime(time_str, time_format) -> DateTime:
     """
     Converts time_str into a pendulum (DateTime) object that either takes the global start date or
@@ -117,6 +151,25 @@ def _eval_time_format(time_dict: Dict) -> str:
                                 f"'{DATE_TIME_FORMAT}', '{DATE_TIME_FORMAT_SECONDS}')")
 
 
+def _read_csv_rows(csv_file, path: str) -> Dict[str, float]:
+    """
+    Read the rows of a 2-column csv profile file. First column is the time, second column
+    is the value (power, energy, rate, ...). Rows without a numeric value (header) are skipped.
+    :return: Dict[time string, value]
+    """
+    profile_data = {}
+    for row in csv.reader(csv_file):
+        if len(row) == 0:
+            raise Exception(f"There must not be an empty line in the profile file {path}")
+        if len(row) != 2:
+            row = row[0].split(";")
+        try:
+            profile_data[row[0]] = float(row[1])
+        except ValueError:
+            pass
+    return profile_data
+
+
 def _readCSV(path: str) -> Dict:
     """
     Read a 2-column csv profile file. First column is the time, second column
@@ -124,86 +177,104 @@ def _readCSV(path: str) -> Dict:
     :param path: path to csv file
     :return: Dict[DateTime, value]
     """
-    profile_data = {}
     with open(path) as csv_file:
-        csv_rows = csv.reader(csv_file)
-        for row in csv_rows:
-            if len(row) == 0:
-                raise Exception(f"There must not be an empty line in the profile file {path}")
-            if len(row) != 2:
-                row = row[0].split(";")
-            try:
-                profile_data[row[0]] = float(row[1])
-            except ValueError:
-                pass
+        profile_data = _read_csv_rows(csv_file, path)
     time_format = _eval_time_format(profile_data)
     return dict((_str_to_datetime(time_str, time_format), value)
                 for time_str, value in profile_data.items())
 
 
-def _calculate_energy_from_power_profile(profile_data_W: Dict[str, float],
-                                         slot_length: duration) -> Dict[DateTime, float]:
+def _parse_time_strings(time_strings):
     """
-    Calculates energy from power profile. Does not use numpy, calculates avg power for each
-    market slot and based on that calculates energy.
-    :param profile_data_W: Power profile in W
-    :param slot_length: slot length duration
-    :return: a mapping from time to energy values in kWh
+    Converts time strings to Unix timestamps, or to offsets from the simulation start date for
+    TIME_FORMAT. The common formats are parsed with NumPy, all others with pendulum.
+    :return: (np.ndarray of seconds, relative)
     """
+    time_strings = [str(time_str) for time_str in time_strings]
+    for time_format in (TIME_FORMAT, DATE_TIME_FORMAT, DATE_TIME_FORMAT_SECONDS):
+        pattern = _FAST_TIME_FORMATS.get(time_format)
+        if pattern is None or not all(pattern.fullmatch(t) for t in time_strings):
+            continue
+        try:
+            if time_format == "HH:mm":
+                hours_minutes = np.array([t.split(":") for t in time_strings],
+                                         dtype=int).reshape(-1, 2)
+                if (hours_minutes[:, 0] > 23).any() or (hours_minutes[:, 1] > 59).any():
+                    raise ValueError("Invalid time")
+                return hours_minutes[:, 0] * 3600. + hours_minutes[:, 1] * 60., True
+            return np.array(time_strings, dtype="datetime64[s]").astype(np.int64) * 1., False
+        except ValueError:
+            # Let pendulum report the invalid time stamp
+            break
 
-    input_time_list = list(profile_data_W.keys())
-    input_power_list_W = [float(dp) for dp in profile_data_W.values()]
+    time_format = _eval_time_format(dict.fromkeys(time_strings))
+    seconds = np.array([_str_to_datetime(t, time_format).timestamp() for t in time_strings])
+    if time_format == TIME_FORMAT:
+        return seconds - GlobalConfig.start_date.timestamp(), True
+    return seconds, False
 
-    time0 = from_timestamp(0)
-    input_time_seconds_list = [(ti - time0).in_seconds()
-                               for ti in input_time_list]
 
-    slot_time_list = [i for i in range(input_time_seconds_list[0], input_time_seconds_list[-1],
-                                       slot_length.in_seconds())]
+def _source_from_time_strings(profile: Dict) -> _ProfileSource:
+    seconds, relative = _parse_time_strings(profile.keys())
+    return _ProfileSource(seconds, tuple(profile.values()), relative, None)
 
-    second_power_list_W = [
-        input_power_list_W[index - 1]
-        for index, seconds in enumerate(input_time_seconds_list)
-        for _ in range(seconds - input_time_seconds_list[index - 1])
-    ]
 
-    avg_power_kW = []
-    for index, slot in enumerate(slot_time_list):
-        first_index = index * slot_length.in_seconds()
-        if first_index <= len(second_power_list_W):
-            avg_power_kW.append(second_power_list_W[first_index] / 1000.)
+def _source_from_datetimes(times, values) -> _ProfileSource:
+    return _ProfileSource(np.array([t.timestamp() for t in times]), tuple(values), False,
+                          np.array([t.hour * 100 + t.minute for t in times], dtype=int))
 
-    slot_energy_kWh = list(map(lambda x: convert_kW_to_kWh(x, slot_length), avg_power_kW))
 
-    return {from_timestamp(slot_time_list[ii]): energy
-            for ii, energy in enumerate(slot_energy_kWh)
-            }
+def _disk_cache_path(content_hash):
+    if constants.PROFILE_CACHE_DIR is None:
+        return None
+    return os.path.join(constants.PROFILE_CACHE_DIR, f"{content_hash}.npz")
 
 
-def _fill_gaps_in_profile(input_profile: Dict = None) -> Dict:
-    """
-    Fills time steps, where no value is provided, with the value value of the
-    last available time step.
-    :param input_profile: Dict[Datetime: float, int, tuple]
-    :return: continuous profile Dict[Datetime: float, int, tuple]
-    """
+def _load_disk_cached_source(content_hash):
+    path = _disk_cache_path(content_hash)
+    if path is None or not os.path.isfile(path):
+        return None
+    try:
+        with np.load(path) as cached:
+            return _ProfileSource(cached["seconds"], tuple(cached["values"].tolist()),
+                                  bool(cached["relative"]), None)
+    except (OSError, ValueError, KeyError) as e:
+        log.warning(f"Could not read cached profile {path}: {e}")
+        return None
+
+
+def _store_disk_cached_source(content_hash, source):
+    path = _disk_cache_path(content_hash)
+    if path is None:
+        return
+    # Written to a temporary file first, simulations that run in parallel share the cache
+    temp_path = f"{path}.{os.getpid()}.tmp.npz"
+    try:
+        os.makedirs(constants.PROFILE_CACHE_DIR, exist_ok=True)
+        np.savez(temp_path, seconds=source.seconds, values=np.array(source.values, dtype=float),
+                 relative=np.array(source.relative))
+        os.replace(temp_path, path)
+    except OSError as e:
+        log.warning(f"Could not cache profile {path}: {e}")
 
-    out_profile = default_profile_dict()
 
-    if isinstance(list(input_profile.values())[0], tuple):
-        current_val = (0, 0)
-    else:
-        current_val = 0
+def _cached_source(content_hash, parse, use_disk_cache=False) -> _ProfileSource:
+    source = _profile_source_cache.get(content_hash)
+    if source is None and use_disk_cache:
+        source = _load_disk_cached_source(content_hash)
+    if source is None:
+        source = parse()
+        if use_disk_cache:
+            _store_disk_cached_source(content_hash, source)
+    _profile_source_cache[content_hash] = source
+    return source
 
-    for time in out_profile.keys():
-        if time in input_profile.keys():
-            current_val = input_profile[time]
-        out_profile[time] = current_val
 
-    return out_profile
+def _content_hash(prefix, content: str):
+    return f"{prefix}-{sha1(content.encode('utf-8', 'surrogatepass')).hexdigest()}"
 
 
-def _read_from_different_sources_todict(input_profile) -> Dict[DateTime, float]:
+def _read_profile_source(input_profile):
     """
     Reads arbitrary profile.
     Handles csv, dict and string input.
@@ -211,45 +282,55 @@ def _read_from_different_sources_todict(input_profile) -> Dict[DateTime, float]:
     or a dict with hourly data (Dict[int, float])
     or a dict with arbitrary time data (Dict[str, float])
     or a string containing a serialized dict of the aforementioned structure
-    :return:
+    :return: (_ProfileSource, cache key), the source is None for single values and the
+    cache key is None for profiles that are not cached
     """
 
     if os.path.isfile(str(input_profile)):
         # input is csv file
-        profile = _readCSV(input_profile)
+        with open(input_profile) as csv_file:
+            content = csv_file.read()
+        content_hash = _content_hash("csv", content)
+        return _cached_source(
+            content_hash,
+            lambda: _source_from_time_strings(
+                _read_csv_rows(content.splitlines(), input_profile)),
+            use_disk_cache=True), content_hash
 
     elif isinstance(input_profile, dict) or isinstance(input_profile, str):
         # input is profile
 
         if isinstance(input_profile, str):
             # input in JSON formatting
-            profile = ast.literal_eval(input_profile.encode('utf-8').decode("utf-8-sig"))
-            # Remove filename entry to support d3a-web profiles
-            profile.pop("filename", None)
-            profile = _remove_header(profile)
-            time_format = _eval_time_format(profile)
-            profile = {_str_to_datetime(key, time_format): val
-                       for key, val in profile.items()}
+            def _parse_string_profile():
+                profile = ast.literal_eval(input_profile.encode('utf-8').decode("utf-8-sig"))
+                # Remove filename entry to support d3a-web profiles
+                profile.pop("filename", None)
+                return _source_from_time_strings(_remove_header(profile))
+
+            content_hash = _content_hash("str", input_profile)
+            return _cached_source(content_hash, _parse_string_profile), content_hash
+
         elif isinstance(list(input_profile.keys())[0], DateTime):
-            return input_profile
+            return _source_from_datetimes(input_profile.keys(), input_profile.values()), None
 
         elif isinstance(list(input_profile.keys())[0], str):
             # input is dict with string keys that are properly formatted time stamps
-            input_profile = _remove_header(input_profile)
-            # Remove filename from profile
-            input_profile.pop("filename", None)
-            time_format = _eval_time_format(input_profile)
-            profile = {_str_to_datetime(key, time_format): val
-                       for key, val in input_profile.items()}
+            def _parse_dict_profile():
+                profile = _remove_header(input_profile)
+                # Remove filename from profile
+                profile.pop("filename", None)
+                return _source_from_time_strings(profile)
+
+            content_hash = _content_hash("dict", repr(list(input_profile.items())))
+            return _cached_source(content_hash, _parse_dict_profile), content_hash
 
         elif isinstance(list(input_profile.keys())[0], int) or \
                 isinstance(list(input_profile.keys())[0], float):
             # input is hourly profile
-
-            profile = dict(
-                (today(tz=TIME_ZONE).add(hours=hour), val)
-                for hour, val in input_profile.items()
-            )
+            start = today(tz=TIME_ZONE)
+            return _source_from_datetimes([start.add(hours=hour) for hour in input_profile],
+                                          input_profile.values()), None
 
         else:
             raise TypeError("Unsupported input type : " + str(list(input_profile.keys())[0]))
@@ -258,20 +339,17 @@ def _read_from_different_sources_todict(input_profile) -> Dict[DateTime, float]:
             isinstance(input_profile, float) or \
             isinstance(input_profile, tuple):
         # input is single value
-        profile = default_profile_dict(val=input_profile)
+        return None, ("value", type(input_profile), input_profile)
 
     else:
         raise TypeError(f"Unsupported input type: {str(input_profile)}")
 
-    return profile
 
-
-def _eval_time_period_consensus(input_profile: Dict):
+def _eval_time_period_consensus(input_time_list):
     """
     Checks whether the provided profile is providing information for the simulation time period
     :return:
     """
-    input_time_list = list(input_profile.keys())
     simulation_time_list = [GlobalConfig.start_date,
                             GlobalConfig.start_date + GlobalConfig.sim_duration
                             - GlobalConfig.slot_length]
@@ -285,18 +363,104 @@ def _eval_time_period_consensus(input_profile: Dict):
                          f"{simulation_time_list[-1].format(DATE_TIME_FORMAT)})")
 
 
-def time_str(hour, minute):
-    return "{:02d}{:02d}".format(hour, minute)
+def _slot_grid_key():
+    return (GlobalConfig.start_date, GlobalConfig.sim_duration, GlobalConfig.slot_length,
+            GlobalConfig.market_count)
+
 
+def _slot_grid() -> _SlotGrid:
+    """
+    Times of the profile slots (the keys of default_profile_dict()) and of the market slots of
+    the current simulation config, created once per config
+    """
+    grid_key = _slot_grid_key()
+    grid = _slot_grid_cache.get(grid_key)
+    if grid is None:
+        time_slots = tuple(default_profile_dict().keys())
+        _eval_time_period_consensus(time_slots)
+        market_slots = generate_market_slot_list()
+        grid = _SlotGrid(
+            time_slots=time_slots,
+            seconds=np.array([t.timestamp() for t in time_slots]),
+            market_slot_seconds=np.array([t.timestamp() for t in market_slots]),
+            market_slot_hhmm=np.array([t.hour * 100 + t.minute for t in market_slots],
+                                      dtype=int).reshape(-1),
+            utc_time_slots=tuple(from_timestamp(t.timestamp()) for t in time_slots))
+        _slot_grid_cache[grid_key] = grid
+    return grid
+
+
+def _lookup(keys, queries):
+    """Index of the last occurrence of every query in keys, -1 if it does not occur"""
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    position = np.searchsorted(sorted_keys, queries, side="right") - 1
+    found = position >= 0
+    position = np.maximum(position, 0)
+    found &= sorted_keys[position] == queries
+    return np.where(found, order[position], -1)
+
+
+def _utc_hhmm(seconds):
+    minute_of_day = (seconds // 60).astype(np.int64) % 1440
+    return minute_of_day // 60 * 100 + minute_of_day % 60
+
+
+def _fill_slots(source: _ProfileSource, grid: _SlotGrid) -> list:
+    """
+    Values of the profile slots. Profiles of one day are repeated on every day of longer
+    simulations, slots without a value take the value of the previous slot.
+    """
+    seconds = source.seconds + GlobalConfig.start_date.timestamp() \
+        if source.relative else source.seconds
+    profile_duration = seconds[-1] - seconds[0]
+    value_index = np.arange(len(seconds))
+
+    if GlobalConfig.sim_duration > duration(days=1) and \
+            profile_duration <= duration(days=1).in_seconds():
+        # Copy the value of the same time of day to the market slots without value
+        hhmm = source.hhmm if source.hhmm is not None else _utc_hhmm(seconds)
+        unique_hhmm, reversed_index = np.unique(hhmm[::-1], return_index=True)
+        last_index_of_hhmm = np.full(2400, -1)
+        last_index_of_hhmm[unique_hhmm] = len(hhmm) - 1 - reversed_index
+        copy_from = last_index_of_hhmm[grid.market_slot_hhmm]
+        copied = (_lookup(seconds, grid.market_slot_seconds) < 0) & (copy_from >= 0)
+        seconds = np.concatenate((seconds, grid.market_slot_seconds[copied]))
+        value_index = np.concatenate((value_index, copy_from[copied]))
+
+    grid_index = _lookup(seconds, grid.seconds)
+    last_value_slot = np.maximum.accumulate(
+        np.where(grid_index >= 0, np.arange(len(grid_index)), -1))
+    slot_value_index = np.where(last_value_slot >= 0,
+                                value_index[grid_index[last_value_slot]], -1)
+
+    default_value = (0, 0) if isinstance(source.values[0], tuple) else 0
+    return [source.values[i] if i >= 0 else default_value for i in slot_value_index.tolist()]
+
+
+def _read_slot_values(profile_type: InputProfileTypes, input_profile) -> ProfileArray:
+    grid = _slot_grid()
+    source, cache_key = _read_profile_source(input_profile)
+    if cache_key is not None:
+        values_key = (cache_key, profile_type, _slot_grid_key())
+        if values_key in _slot_values_cache:
+            return _slot_values_cache[values_key]
+
+    if source is None:
+        values = [input_profile] * len(grid.time_slots)
+    else:
+        values = _fill_slots(source, grid)
 
-def copy_profile_to_multiple_days(profile):
-    daytime_dict = dict((time_str(time.hour, time.minute), time) for time in profile.keys())
-    for slot_time in generate_market_slot_list():
-        if slot_time not in profile.keys():
-            time_key = time_str(slot_time.hour, slot_time.minute)
-            if time_key in daytime_dict:
-                profile[slot_time] = profile[daytime_dict[time_key]]
+    if profile_type == InputProfileTypes.POWER:
+        # The energy of a slot is based on the power at the start of the slot
+        power_kW = np.array(values[:-1], dtype=float) / 1000.
+        slot_hours = convert_kW_to_kWh(1, GlobalConfig.slot_length)
+        profile = ProfileArray(grid.utc_time_slots[:-1], tuple((slot_hours * power_kW).tolist()))
+    else:
+        profile = ProfileArray(grid.time_slots, tuple(values))
 
+    if cache_key is not None:
+        _slot_values_cache[values_key] = profile
     return profile
 
 
@@ -306,29 +470,28 @@ def read_arbitrary_profile(profile_type: InputProfileTypes,
     Reads arbitrary profile.
     Handles csv, dict and string input.
     Fills gaps in the profile.
+    Files, strings and single values are parsed and resampled once per simulation config,
+    later calls only copy the cached slot values into a new dict.
     :param profile_type: Can be either rate or power
     :param input_profile: Can be either a csv file path,
     or a dict with hourly data (Dict[int, float])
     or a dict with arbitrary time data (Dict[str, float])
     or a string containing a serialized dict of the aforementioned structure
-    :param copy:
     :return: a mapping from time to profile values
     """
+    time_slots, values = _read_slot_values(profile_type, input_profile)
+    return dict(zip(time_slots, values))
 
-    profile = _read_from_different_sources_todict(input_profile)
-    profile_time_list = list(profile.keys())
-    profile_duration = profile_time_list[-1] - profile_time_list[0]
-    if GlobalConfig.sim_duration > duration(days=1) and profile_duration <= duration(days=1):
-        copy_profile_to_multiple_days(profile)
-
-    if profile is not None:
-        filled_profile = _fill_gaps_in_profile(profile)
-        _eval_time_period_consensus(filled_profile)
 
-        if profile_type == InputProfileTypes.POWER:
-            return _calculate_energy_from_power_profile(filled_profile, GlobalConfig.slot_length)
-        else:
-            return filled_profile
+def read_profile_array(profile_type: InputProfileTypes, input_profile) -> ProfileArray:
+    """
+    Reads arbitrary profile like read_arbitrary_profile, but returns the slot times and a
+    read-only array of the slot values, indexed by slot.
+    """
+    time_slots, values = _read_slot_values(profile_type, input_profile)
+    values = np.array(values)
+    values.setflags(write=False)
+    return ProfileArray(time_slots, values)
 
 
 def read_and_convert_identity_profile_to_float(profile):
@@ -23,7 +23,8 @@ from math import isclose
 from d3a_interface.constants_limits import ConstSettings
 from d3a_interface.utils import convert_pendulum_to_str_in_dict, convert_str_to_pendulum_in_dict
 from d3a import limit_float_precision
-from d3a.d3a_core.util import generate_market_slot_list, convert_kW_to_kWh
+from d3a.d3a_core.util import convert_kW_to_kWh
+from d3a.d3a_core.time_axis import SlotSeries, market_time_axis
 
 StorageSettings = ConstSettings.StorageSettings
 
@@ -44,8 +45,7 @@ StorageSettings = ConstSettings.StorageSettings
 
 class PVState:
     def __init__(self):
-        self.available_energy_kWh = \
-            {slot: 0. for slot in generate_market_slot_list()}
+        self.available_energy_kWh = SlotSeries.full(0.)
 
     def get_state(self):
         return {"available_energy_kWh": convert_pendulum_to_str_in_dict(self.available_energy_kWh)}
@@ -56,8 +56,7 @@ class PVState:
 
 class LoadState:
     def __init__(self):
-        self.desired_energy_Wh = \
-            {slot: 0. for slot in generate_market_slot_list()}
+        self.desired_energy_Wh = SlotSeries.full(0.)
         self.total_energy_demanded_wh = 0
 
     def get_state(self):
@@ -96,33 +95,25 @@ class StorageState:
         self.max_abs_battery_power_kW = max_abs_battery_power_kW
 
         # storage capacity, that is already sold:
-        self.pledged_sell_kWh = \
-            {slot: 0. for slot in generate_market_slot_list()}
+        self.pledged_sell_kWh = SlotSeries.full(0.)
         # storage capacity, that has been offered (but not traded yet):
-        self.offered_sell_kWh = \
-            {slot: 0. for slot in generate_market_slot_list()}
+        self.offered_sell_kWh = SlotSeries.full(0.)
         # energy, that has been bought:
-        self.pledged_buy_kWh = \
-            {slot: 0. for slot in generate_market_slot_list()}
+        self.pledged_buy_kWh = SlotSeries.full(0.)
         # energy, that the storage wants to buy (but not traded yet):
-        self.offered_buy_kWh = \
-            {slot: 0. for slot in generate_market_slot_list()}
-        self.time_series_ess_share = \
-            {slot: {ESSEnergyOrigin.UNKNOWN: 0.,
-                    ESSEnergyOrigin.LOCAL: 0.,
-                    ESSEnergyOrigin.EXTERNAL: 0.}
-             for slot in generate_market_slot_list()}
-
-        self.charge_history = \
-            {slot: 100.0 * initial_capacity_kWh / capacity for slot in generate_market_slot_list()}
-        self.charge_history_kWh = \
-            {slot: initial_capacity_kWh for slot in generate_market_slot_list()}
-        self.offered_history = \
-            {slot: '-' for slot in generate_market_slot_list()}
-        self.used_history = \
-            {slot: '-' for slot in generate_market_slot_list()}  # type: Dict[DateTime, float]
-        self.energy_to_buy_dict = {slot: 0. for slot in generate_market_slot_list()}
-        self.energy_to_sell_dict = {slot: 0. for slot in generate_market_slot_list()}
+        self.offered_buy_kWh = SlotSeries.full(0.)
+        self.time_series_ess_share = SlotSeries.from_values(
+            {ESSEnergyOrigin.UNKNOWN: 0.,
+             ESSEnergyOrigin.LOCAL: 0.,
+             ESSEnergyOrigin.EXTERNAL: 0.}
+            for _ in market_time_axis())
+
+        self.charge_history = SlotSeries.full(100.0 * initial_capacity_kWh / capacity)
+        self.charge_history_kWh = SlotSeries.full(initial_capacity_kWh)
+        self.offered_history = SlotSeries.full('-')
+        self.used_history = SlotSeries.full('-')  # type: Dict[DateTime, float]
+        self.energy_to_buy_dict = SlotSeries.full(0.)
+        self.energy_to_sell_dict = SlotSeries.full(0.)
 
         self._used_storage = initial_capacity_kWh
         self._battery_energy_per_slot = 0.0
@@ -145,17 +136,26 @@ class StorageState:
         }
 
     def restore_state(self, state_dict):
-        self.pledged_sell_kWh = convert_str_to_pendulum_in_dict(state_dict["pledged_sell_kWh"])
-        self.offered_sell_kWh = convert_str_to_pendulum_in_dict(state_dict["offered_sell_kWh"])
-        self.pledged_buy_kWh = convert_str_to_pendulum_in_dict(state_dict["pledged_buy_kWh"])
-        self.offered_buy_kWh = convert_str_to_pendulum_in_dict(state_dict["offered_buy_kWh"])
-        self.charge_history = convert_str_to_pendulum_in_dict(state_dict["charge_history"])
-        self.charge_history_kWh = convert_str_to_pendulum_in_dict(state_dict["charge_history_kWh"])
-        self.offered_history = convert_str_to_pendulum_in_dict(state_dict["offered_history"])
-        self.used_history = convert_str_to_pendulum_in_dict(state_dict["used_history"])
-        self.energy_to_buy_dict = convert_str_to_pendulum_in_dict(state_dict["energy_to_buy_dict"])
-        self.energy_to_sell_dict = convert_str_to_pendulum_in_dict(
-            state_dict["energy_to_sell_dict"])
+        self.pledged_sell_kWh = SlotSeries(
+            convert_str_to_pendulum_in_dict(state_dict["pledged_sell_kWh"]))
+        self.offered_sell_kWh = SlotSeries(
+            convert_str_to_pendulum_in_dict(state_dict["offered_sell_kWh"]))
+        self.pledged_buy_kWh = SlotSeries(
+            convert_str_to_pendulum_in_dict(state_dict["pledged_buy_kWh"]))
+        self.offered_buy_kWh = SlotSeries(
+            convert_str_to_pendulum_in_dict(state_dict["offered_buy_kWh"]))
+        self.charge_history = SlotSeries(
+            convert_str_to_pendulum_in_dict(state_dict["charge_history"]))
+        self.charge_history_kWh = SlotSeries(
+            convert_str_to_pendulum_in_dict(state_dict["charge_history_kWh"]))
+        self.offered_history = SlotSeries(
+            convert_str_to_pendulum_in_dict(state_dict["offered_history"]))
+        self.used_history = SlotSeries(
+            convert_str_to_pendulum_in_dict(state_dict["used_history"]))
+        self.energy_to_buy_dict = SlotSeries(
+            convert_str_to_pendulum_in_dict(state_dict["energy_to_buy_dict"]))
+        self.energy_to_sell_dict = SlotSeries(
+            convert_str_to_pendulum_in_dict(state_dict["energy_to_sell_dict"]))
         self._used_storage = state_dict["used_storage"]
         self._battery_energy_per_slot = state_dict["battery_energy_per_slot"]
 
@@ -15,7 +15,6 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
-import json
 import sys
 from logging import getLogger
 from typing import List, Dict, Any, Union  # noqa
@@ -30,8 +29,10 @@ from d3a.d3a_core.device_registry import DeviceRegistry
 from d3a.events.event_structures import Trigger, TriggerMixin, AreaEvent, MarketEvent
 from d3a.events import EventMixin
 from d3a.d3a_core.exceptions import D3ARedisException
-from d3a.d3a_core.util import append_or_create_key
-from d3a.models.market.market_structures import trade_from_JSON_string, offer_from_JSON_string
+from d3a.d3a_core.profiler import profiler
+from d3a.models.market.market_serialization import encode_payload, decode_payload
+from d3a.models.market.trade_book import trades_of
+from d3a.models.strategy.offer_index import PostedOffers, SoldOffers
 from d3a.d3a_core.redis_connections.redis_area_market_communicator import BlockingCommunicator
 from d3a.constants import FLOATING_POINT_TOLERANCE
 from d3a import constants
@@ -47,10 +48,7 @@ class _TradeLookerUpper:
         self.owner_name = owner_name
 
     def __getitem__(self, market):
-        for trade in market.trades:
-            owner_name = self.owner_name
-            if trade.seller == owner_name or trade.buyer == owner_name:
-                yield trade
+        yield from trades_of(market.trades, self.owner_name)
 
 
 class Offers:
@@ -62,15 +60,34 @@ class Offers:
 
     posted_in_market() yields all offers that have been posted,
     open_in_market() only those who have not been sold.
+
+    Posted and sold offers are indexed by market and offer id, therefore the queries for
+    one market do not iterate over the offers of the other markets.
     """
 
     def __init__(self, strategy):
         self.strategy = strategy
         self.bought = {}  # type: Dict[Offer, str]
-        self.posted = {}  # type: Dict[Offer, str]
-        self.sold = {}  # type: Dict[str, List[Offer]]
+        self.posted = PostedOffers()  # type: Dict[Offer, str]
+        self.sold = SoldOffers()  # type: Dict[str, List[Offer]]
         self.split = {}  # type: Dict[str, Offer]
 
+    @property
+    def posted(self):
+        return self._posted
+
+    @posted.setter
+    def posted(self, posted):
+        self._posted = posted if isinstance(posted, PostedOffers) else PostedOffers(posted)
+
+    @property
+    def sold(self):
+        return self._sold
+
+    @sold.setter
+    def sold(self, sold):
+        self._sold = sold if isinstance(sold, SoldOffers) else SoldOffers(sold)
+
     @property
     def area(self):
         # TODO: Remove the owner and area distinction from the AreaBehaviorBase class
@@ -85,55 +102,45 @@ class Offers:
         return offers
 
     def delete_past_markets_offers(self):
-        self.posted = self._delete_past_offers(self.posted)
+        for market_id in list(self.posted.market_ids()):
+            if self.area.get_future_market_from_id(market_id) is None:
+                for offer in list(self.posted.in_market(market_id)):
+                    del self.posted[offer]
         self.bought = self._delete_past_offers(self.bought)
         self.split = {}
 
     @property
     def open(self):
-        open_offers = {}
-        for offer, market_id in self.posted.items():
-            if market_id not in self.sold:
-                self.sold[market_id] = []
-            if offer not in self.sold[market_id]:
-                open_offers[offer] = market_id
-        return open_offers
+        return {offer: market_id for offer, market_id in self.posted.items()
+                if not self.sold.is_sold(market_id, offer)}
 
     def bought_offer(self, offer, market_id):
         self.bought[offer] = market_id
 
     def sold_offer(self, offer, market_id):
-        self.sold = append_or_create_key(self.sold, market_id, offer)
+        self.sold.add(market_id, offer)
 
     def is_offer_posted(self, market_id, offer_id):
-        return offer_id in [offer.id for offer, _market in self.posted.items()
-                            if market_id == _market]
+        return market_id in self.posted.with_id(offer_id).values()
 
     def get_sold_offer_ids_in_market(self, market_id):
-        sold_offer_ids = []
-        for sold_offer in self.sold.get(market_id, []):
-            sold_offer_ids.append(sold_offer.id)
-        return sold_offer_ids
+        return list(self.sold.sold_ids(market_id))
 
     def open_in_market(self, market_id):
-        open_offers = []
-        sold_offer_ids = self.get_sold_offer_ids_in_market(market_id)
-        for offer, _market in self.posted.items():
-            if offer.id not in sold_offer_ids and market_id == _market:
-                open_offers.append(offer)
-        return open_offers
+        return [offer for offer in self.posted.in_market(market_id)
+                if not self.sold.is_id_sold(market_id, offer.id)]
 
     def open_offer_energy(self, market_id):
         return sum(o.energy for o in self.open_in_market(market_id))
 
     def posted_in_market(self, market_id):
-        return [offer for offer, _market in self.posted.items() if market_id == _market]
+        return list(self.posted.in_market(market_id))
 
     def posted_offer_energy(self, market_id):
-        return sum(o.energy for o in self.posted_in_market(market_id))
+        return self.posted.energy(market_id)
 
     def sold_offer_energy(self, market_id):
-        return sum(o.energy for o in self.sold_in_market(market_id))
+        return self.sold.energy(market_id)
 
     def can_offer_be_posted(self, offer_energy, offer_price, available_energy, market):
         posted_energy = (offer_energy
@@ -156,7 +163,7 @@ class Offers:
         if offer_id is None:
             to_delete_offers = self.open_in_market(market.id)
         else:
-            to_delete_offers = [o for o, m in self.posted.items() if o.id == offer_id]
+            to_delete_offers = list(self.posted.with_id(offer_id))
         deleted_offer_ids = []
         for offer in to_delete_offers:
             market.delete_offer(offer.id)
@@ -166,16 +173,16 @@ class Offers:
 
     def remove_offer_by_id(self, market_id, offer_id=None):
         try:
-            offer = [o for o, m in self.posted.items() if o.id == offer_id][0]
+            offer = next(iter(self.posted.with_id(offer_id)))
             self.remove(offer)
-        except (IndexError, KeyError):
+        except (StopIteration, KeyError):
             self.strategy.warning(f"Could not find offer to remove: {offer_id}")
 
     def remove(self, offer):
         try:
             market_id = self.posted.pop(offer)
             assert type(market_id) == str
-            if market_id in self.sold and offer in self.sold[market_id]:
+            if self.sold.is_sold(market_id, offer):
                 self.strategy.log.warning("Offer already sold, cannot remove it.")
                 self.posted[offer] = market_id
             else:
@@ -232,7 +239,7 @@ class BaseStrategy(TriggerMixin, EventMixin, AreaBehaviorBase):
 
         data["transaction_uuid"] = str(uuid4())
         self.redis.sub_to_channel(response_channel, callback)
-        self.redis.publish(market_channel, json.dumps(data))
+        self.redis.publish(market_channel, encode_payload(data))
 
         def event_response_was_received_callback():
             return data["transaction_uuid"] in self.event_response_uuids
@@ -292,12 +299,9 @@ class BaseStrategy(TriggerMixin, EventMixin, AreaBehaviorBase):
         return offer
 
     def _offer_response(self, payload):
-        data = json.loads(payload["data"])
-        # TODO: is this additional parsing needed?
-        if isinstance(data, str):
-            data = json.loads(data)
+        data = decode_payload(payload["data"])
         if data["status"] == "ready":
-            self.offer_buffer = offer_from_JSON_string(data["offer"])
+            self.offer_buffer = data["offer"]
             self.event_response_uuids.append(data["transaction_uuid"])
         else:
             raise D3ARedisException(
@@ -323,7 +327,7 @@ class BaseStrategy(TriggerMixin, EventMixin, AreaBehaviorBase):
         if ConstSettings.GeneralSettings.EVENT_DISPATCHING_VIA_REDIS:
             if not isinstance(market_or_id, str):
                 market_or_id = market_or_id.id
-            data = {"offer_or_id": offer.to_JSON_string(),
+            data = {"offer_or_id": offer,
                     "buyer": buyer,
                     "energy": energy,
                     "trade_rate": trade_rate,
@@ -345,12 +349,9 @@ class BaseStrategy(TriggerMixin, EventMixin, AreaBehaviorBase):
                                              buyer_origin=buyer_origin)
 
     def _accept_offer_response(self, payload):
-        data = json.loads(payload["data"])
-        # TODO: is this additional parsing needed?
-        if isinstance(data, str):
-            data = json.loads(data)
+        data = decode_payload(payload["data"])
         if data["status"] == "ready":
-            self.trade_buffer = trade_from_JSON_string(data["trade"])
+            self.trade_buffer = data["trade"]
             self.event_response_uuids.append(data["transaction_uuid"])
         else:
             raise D3ARedisException(
@@ -378,17 +379,14 @@ class BaseStrategy(TriggerMixin, EventMixin, AreaBehaviorBase):
 
     def delete_offer(self, market_or_id, offer):
         if ConstSettings.GeneralSettings.EVENT_DISPATCHING_VIA_REDIS:
-            data = {"offer_or_id": offer.to_JSON_string()}
+            data = {"offer_or_id": offer}
             self._send_events_to_market("DELETE_OFFER", market_or_id, data,
                                         self._delete_offer_response)
         else:
             market_or_id.delete_offer(offer)
 
     def _delete_offer_response(self, payload):
-        data = json.loads(payload["data"])
-        # TODO: is this additional parsing needed?
-        if isinstance(data, str):
-            data = json.loads(data)
+        data = decode_payload(payload["data"])
         if data["status"] == "ready":
             self.event_response_uuids.append(data["transaction_uuid"])
 
@@ -399,6 +397,10 @@ class BaseStrategy(TriggerMixin, EventMixin, AreaBehaviorBase):
 
     def event_listener(self, event_type: Union[AreaEvent, MarketEvent], **kwargs):
         if self.enabled or event_type in self._allowed_disable_events:
+            if event_type is AreaEvent.TICK and profiler.enabled:
+                with profiler.phase(f"event_tick {self.__class__.__name__}"):
+                    super().event_listener(event_type, **kwargs)
+                return
             super().event_listener(event_type, **kwargs)
 
     def event_trade(self, *, market_id, trade):
@@ -414,7 +416,8 @@ class BaseStrategy(TriggerMixin, EventMixin, AreaBehaviorBase):
 
     def assert_if_trade_offer_price_is_too_low(self, market_id, trade):
         if isinstance(trade.offer, Offer) and trade.offer.seller == self.owner.name:
-            offer = [o for o in self.offers.sold[market_id] if o.id == trade.offer.id][0]
+            offer = self.offers.sold.first_with_id(market_id, trade.offer.id)
+            assert offer is not None
             assert trade.offer.energy_rate >= \
                 offer.energy_rate - FLOATING_POINT_TOLERANCE
 
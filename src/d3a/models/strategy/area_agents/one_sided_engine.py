@@ -15,13 +15,15 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
-from collections import namedtuple
+from collections import namedtuple, deque
 from typing import Dict, Set  # noqa
 from d3a.constants import FLOATING_POINT_TOLERANCE
 from d3a_interface.constants_limits import ConstSettings
 from d3a.d3a_core.util import short_offer_bid_log_str
 from d3a.d3a_core.exceptions import MarketException, OfferNotFoundException
 from d3a.models.market.market_structures import copy_offer
+from d3a.models.market.order_book import OrderBook
+from d3a.d3a_core.profiler import profiler
 
 
 OfferInfo = namedtuple('OfferInfo', ('source_offer', 'target_offer'))
@@ -29,6 +31,50 @@ Markets = namedtuple('Markets', ('source', 'target'))
 ResidualInfo = namedtuple('ResidualInfo', ('forwarded', 'age'))
 
 
+class PendingOrders:
+    """
+    Offers / bids of a source market that wait until they are old enough to be forwarded.
+
+    New orders are taken from the insertion log of the source market's OrderBook and queued
+    in the order of their age, therefore a tick only visits the orders that were added since
+    the previous tick and the orders that have reached min_age, instead of the whole book.
+    Orders stay due until the engine discards them (forwarded, gone or not forwardable).
+    """
+
+    def __init__(self, ages, min_age):
+        # Shared with the engine, order id -> tick in which the order was first seen
+        self.ages = ages
+        self.min_age = min_age
+        self._book = None
+        self._log_position = 0
+        self._waiting = deque()
+        self._due = {}
+
+    def _new_order_ids(self, orders):
+        if not isinstance(orders, OrderBook):
+            return list(orders.keys())
+        if orders is not self._book:
+            self._book = orders
+            self._log_position = 0
+        order_ids, self._log_position = orders.inserted_since(self._log_position)
+        return order_ids
+
+    def due(self, orders, current_tick):
+        """Ids of the orders that are at least min_age ticks old, oldest first"""
+        for order_id in self._new_order_ids(orders):
+            if order_id not in self.ages:
+                self.ages[order_id] = current_tick
+                self._waiting.append((current_tick, order_id))
+        while self._waiting and current_tick - self._waiting[0][0] >= self.min_age:
+            order_id = self._waiting.popleft()[1]
+            if order_id in self.ages:
+                self._due[order_id] = None
+        return list(self._due)
+
+    def discard(self, order_id):
+        self._due.pop(order_id, None)
+
+
 class IAAEngine:
     def __init__(self, name: str, market_1, market_2, min_offer_age: int,
                  owner):
@@ -38,6 +84,7 @@ class IAAEngine:
         self.owner = owner
 
         self.offer_age = {}  # type: Dict[str, int]
+        self.pending_offers = PendingOrders(self.offer_age, min_offer_age)
         # Offer.id -> OfferInfo
         self.forwarded_offers = {}  # type: Dict[str, OfferInfo]
         self.trade_residual = {}  # type Dict[str, Offer]
@@ -94,21 +141,17 @@ class IAAEngine:
         self.forwarded_offers.pop(offer_info.source_offer.id, None)
 
     def tick(self, *, area):
-        self.propagate_offer(area.current_tick)
+        with profiler.phase("IAA propagate_offer"):
+            self.propagate_offer(area.current_tick)
 
     def propagate_offer(self, current_tick):
-        # Store age of offer
-        for offer in self.markets.source.offers.values():
-            if offer.id not in self.offer_age:
-                self.offer_age[offer.id] = current_tick
-
-        # Use `list()` to avoid in place modification errors
-        for offer_id, age in list(self.offer_age.items()):
-            if offer_id in self.forwarded_offers:
-                continue
-            if current_tick - age < self.min_offer_age:
+        source_offers = self.markets.source.offers
+        # Only the offers that reached min_offer_age and have not been forwarded yet are due
+        for offer_id in self.pending_offers.due(source_offers, current_tick):
+            if offer_id not in self.offer_age or offer_id in self.forwarded_offers:
+                self.pending_offers.discard(offer_id)
                 continue
-            offer = self.markets.source.offers.get(offer_id)
+            offer = source_offers.get(offer_id)
             if not offer:
                 # Offer has gone - remove from age dict
                 # Because an offer forwarding might trigger a trade event, the offer_age dict might
@@ -116,10 +159,12 @@ class IAAEngine:
                 # if the offer is no longer in the offer_age dict, the execution should continue
                 # normally.
                 self.offer_age.pop(offer_id, None)
+                self.pending_offers.discard(offer_id)
                 continue
             if not self.owner.usable_offer(offer):
                 # Forbidden offer (i.e. our counterpart's)
                 self.offer_age.pop(offer_id, None)
+                self.pending_offers.discard(offer_id)
                 continue
 
             # Should never reach this point.
@@ -127,10 +172,12 @@ class IAAEngine:
             # If we ever again reach a situation like this, we should never forward the offer.
             if self.owner.name == offer.seller:
                 self.offer_age.pop(offer_id, None)
+                self.pending_offers.discard(offer_id)
                 continue
 
             forwarded_offer = self._forward_offer(offer)
             if forwarded_offer:
+                self.pending_offers.discard(offer_id)
                 self.owner.log.debug(f"Forwarded offer to {self.markets.source.name} "
                                      f"{self.owner.name}, {self.name} {forwarded_offer}")
 
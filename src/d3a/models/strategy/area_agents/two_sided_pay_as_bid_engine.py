@@ -18,7 +18,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 from collections import namedtuple
 from typing import Dict  # NOQA
 from d3a.models.strategy.area_agents.inter_area_agent import InterAreaAgent  # NOQA
-from d3a.models.strategy.area_agents.one_sided_engine import IAAEngine
+from d3a.models.strategy.area_agents.one_sided_engine import IAAEngine, PendingOrders
 from d3a.d3a_core.exceptions import BidNotFound, MarketException
 from d3a.models.market.market_structures import Bid
 from d3a.d3a_core.util import short_offer_bid_log_str
@@ -36,6 +36,7 @@ class TwoSidedPayAsBidEngine(IAAEngine):
         self.bid_trade_residual = {}  # type: Dict[str, Bid]
         self.min_bid_age = min_bid_age
         self.bid_age = {}
+        self.pending_bids = PendingOrders(self.bid_age, min_bid_age)
 
     def __repr__(self):
         return "<TwoSidedPayAsBidEngine [{s.owner.name}] {s.name} " \
@@ -96,12 +97,17 @@ class TwoSidedPayAsBidEngine(IAAEngine):
     def tick(self, *, area):
         super().tick(area=area)
 
-        for bid_id, bid in self.markets.source.get_bids().items():
-            if bid.id not in self.bid_age:
-                self.bid_age[bid.id] = area.current_tick
-
-            if self.should_forward_bid(bid, area.current_tick):
-                self._forward_bid(bid)
+        source_bids = self.markets.source.get_bids()
+        # Only the bids that reached min_bid_age and have not been forwarded yet are due
+        for bid_id in self.pending_bids.due(source_bids, area.current_tick):
+            bid = source_bids.get(bid_id)
+            if bid is None or bid_id not in self.bid_age or bid_id in self.forwarded_bids or \
+                    not self.owner.usable_bid(bid) or self.owner.name == bid.buyer:
+                self.pending_bids.discard(bid_id)
+                continue
+
+            if self.should_forward_bid(bid, area.current_tick) and self._forward_bid(bid):
+                self.pending_bids.discard(bid_id)
 
     def delete_forwarded_bids(self, bid_info):
         try:
@@ -23,6 +23,7 @@ from typing import Union, Dict  # NOQA
 from collections import namedtuple
 
 from d3a.d3a_core.util import generate_market_slot_list, convert_W_to_Wh
+from d3a.d3a_core.time_axis import SlotSeries
 from d3a.d3a_core.exceptions import MarketException
 from d3a.models.state import LoadState
 from d3a.models.strategy import BidEnabledStrategy
@@ -82,7 +83,7 @@ class LoadHoursStrategy(BidEnabledStrategy):
         self.daily_energy_required = None
         # Energy consumed during the day ideally should not exceed daily_energy_required
         self.energy_per_slot_Wh = None
-        self.energy_requirement_Wh = {}  # type: Dict[DateTime, float]
+        self.energy_requirement_Wh = SlotSeries()  # type: Dict[DateTime, float]
         self.hrs_per_day = {}  # type: Dict[int, int]
 
         self.assign_hours_of_per_day(hrs_of_day, hrs_per_day)
@@ -0,0 +1,219 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+_MISSING = object()
+
+
+class PostedOffers(dict):
+    """
+    Dict of the offers that a strategy has posted (Offer -> market id), that keeps its
+    offers indexed by market and by offer id.
+
+    The offers of one market and the offers with a given id are available without iterating
+    over the offers of all markets. The offers of a market keep the order in which they were
+    posted. The posted energy of a market is cached until the offers of the market change.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        # market id -> {offer: offer}
+        self._by_market = {}
+        # offer id -> {offer: market id}
+        self._by_id = {}
+        # market id -> posted energy, cached until the offers of the market change
+        self._energy = {}
+        self.update(*args, **kwargs)
+
+    def _index(self, offer, market_id):
+        self._by_market.setdefault(market_id, {})[offer] = offer
+        self._by_id.setdefault(offer.id, {})[offer] = market_id
+        self._energy.pop(market_id, None)
+
+    def _remove_from_index(self, offer, market_id):
+        market_offers = self._by_market[market_id]
+        del market_offers[offer]
+        if not market_offers:
+            del self._by_market[market_id]
+        self._energy.pop(market_id, None)
+        id_offers = self._by_id[offer.id]
+        del id_offers[offer]
+        if not id_offers:
+            del self._by_id[offer.id]
+
+    def __setitem__(self, offer, market_id):
+        if offer in self:
+            self._remove_from_index(offer, self[offer])
+        super().__setitem__(offer, market_id)
+        self._index(offer, market_id)
+
+    def __delitem__(self, offer):
+        market_id = self[offer]
+        super().__delitem__(offer)
+        self._remove_from_index(offer, market_id)
+
+    def pop(self, offer, default=_MISSING):
+        if offer in self:
+            market_id = super().pop(offer)
+            self._remove_from_index(offer, market_id)
+            return market_id
+        if default is _MISSING:
+            raise KeyError(offer)
+        return default
+
+    def popitem(self):
+        offer, market_id = super().popitem()
+        self._remove_from_index(offer, market_id)
+        return offer, market_id
+
+    def setdefault(self, offer, default=None):
+        if offer not in self:
+            self[offer] = default
+        return self[offer]
+
+    def update(self, *args, **kwargs):
+        for offer, market_id in dict(*args, **kwargs).items():
+            self[offer] = market_id
+
+    def clear(self):
+        super().clear()
+        self._by_market.clear()
+        self._by_id.clear()
+        self._energy.clear()
+
+    def copy(self):
+        return self.__class__(self)
+
+    def __reduce__(self):
+        return self.__class__, (dict(self), )
+
+    def market_ids(self):
+        """Ids of the markets that have posted offers"""
+        return self._by_market.keys()
+
+    def in_market(self, market_id):
+        """Offers posted in market_id, in the order in which they were posted"""
+        return self._by_market.get(market_id, {}).values()
+
+    def with_id(self, offer_id):
+        """Posted offers with offer_id (offer -> market id)"""
+        return self._by_id.get(offer_id, {})
+
+    def energy(self, market_id):
+        if market_id not in self._energy:
+            self._energy[market_id] = sum(o.energy for o in self.in_market(market_id))
+        return self._energy[market_id]
+
+
+class SoldOffers(dict):
+    """
+    Dict of the offers that a strategy has sold (market id -> list of Offers), that keeps
+    the sold offers of every market indexed by offer id. The sold energy of a market is
+    cached until the offers of the market change.
+
+    Offers should be added via add(), lists that are assigned to a market are re-indexed.
+    Lists that are mutated in place are not re-indexed.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        # market id -> {offer id: first sold offer with this id}
+        self._by_id = {}
+        # market id -> set of sold offers
+        self._offers = {}
+        # market id -> sold energy, cached until the offers of the market change
+        self._energy = {}
+        self.update(*args, **kwargs)
+
+    def _index(self, market_id, offer):
+        self._by_id.setdefault(market_id, {}).setdefault(offer.id, offer)
+        self._offers.setdefault(market_id, set()).add(offer)
+        self._energy.pop(market_id, None)
+
+    def _remove_from_index(self, market_id):
+        self._by_id.pop(market_id, None)
+        self._offers.pop(market_id, None)
+        self._energy.pop(market_id, None)
+
+    def add(self, market_id, offer):
+        if market_id not in self:
+            super().__setitem__(market_id, [])
+        self[market_id].append(offer)
+        self._index(market_id, offer)
+
+    def __setitem__(self, market_id, offers):
+        super().__setitem__(market_id, offers)
+        self._remove_from_index(market_id)
+        for offer in offers:
+            self._index(market_id, offer)
+
+    def __delitem__(self, market_id):
+        super().__delitem__(market_id)
+        self._remove_from_index(market_id)
+
+    def pop(self, market_id, default=_MISSING):
+        if market_id in self:
+            offers = super().pop(market_id)
+            self._remove_from_index(market_id)
+            return offers
+        if default is _MISSING:
+            raise KeyError(market_id)
+        return default
+
+    def popitem(self):
+        market_id, offers = super().popitem()
+        self._remove_from_index(market_id)
+        return market_id, offers
+
+    def setdefault(self, market_id, default=None):
+        if market_id not in self:
+            self[market_id] = [] if default is None else default
+        return self[market_id]
+
+    def update(self, *args, **kwargs):
+        for market_id, offers in dict(*args, **kwargs).items():
+            self[market_id] = offers
+
+    def clear(self):
+        super().clear()
+        self._by_id.clear()
+        self._offers.clear()
+        self._energy.clear()
+
+    def copy(self):
+        return self.__class__({market_id: list(offers) for market_id, offers in self.items()})
+
+    def __reduce__(self):
+        return self.__class__, (dict(self), )
+
+    def is_sold(self, market_id, offer):
+        return offer in self._offers.get(market_id, ())
+
+    def is_id_sold(self, market_id, offer_id):
+        return offer_id in self._by_id.get(market_id, {})
+
+    def sold_ids(self, market_id):
+        return self._by_id.get(market_id, {}).keys()
+
+    def first_with_id(self, market_id, offer_id):
+        """First offer with offer_id that was sold in market_id, None if there is none"""
+        return self._by_id.get(market_id, {}).get(offer_id)
+
+    def energy(self, market_id):
+        if market_id not in self._energy:
+            self._energy[market_id] = sum(o.energy for o in self.get(market_id, []))
+        return self._energy[market_id]
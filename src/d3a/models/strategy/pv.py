@@ -23,6 +23,7 @@ from pendulum import duration
 from logging import getLogger
 
 from d3a.d3a_core.util import generate_market_slot_list, convert_W_to_kWh
+from d3a.d3a_core.time_axis import SlotSeries
 from d3a.models.strategy import BaseStrategy
 from d3a_interface.constants_limits import ConstSettings
 from d3a_interface.device_validator import validate_pv_device_energy, validate_pv_device_price
@@ -68,7 +69,7 @@ class PVStrategy(BaseStrategy):
 
         self.panel_count = panel_count
         self.max_panel_power_W = max_panel_power_W
-        self.energy_production_forecast_kWh = {}  # type: Dict[Time, float]
+        self.energy_production_forecast_kWh = SlotSeries()  # type: Dict[Time, float]
         self.state = PVState()
 
         self._init_price_update(update_interval, initial_selling_rate, final_selling_rate,
@@ -534,9 +534,9 @@ class StorageStrategy(BidEnabledStrategy):
                 max_rate = 0.0
                 most_expensive_market = self.area.all_markets[0]
                 for market in self.area.all_markets:
-                    if len(market.sorted_offers) > 0 and \
-                       market.sorted_offers[0].energy_rate > max_rate:
-                        max_rate = market.sorted_offers[0].price / market.sorted_offers[0].energy
+                    cheapest_offer = market.cheapest_offer
+                    if cheapest_offer is not None and cheapest_offer.energy_rate > max_rate:
+                        max_rate = cheapest_offer.price / cheapest_offer.energy
                         most_expensive_market = market
             except IndexError:
                 try:
@@ -21,7 +21,7 @@ from pendulum import duration
 from d3a.d3a_core.exceptions import MarketException
 from d3a_interface.constants_limits import ConstSettings, GlobalConfig
 from d3a.models.read_user_profile import read_arbitrary_profile, InputProfileTypes
-from d3a.d3a_core.util import generate_market_slot_list
+from d3a.d3a_core.time_axis import SlotSeries, market_time_axis
 
 
 class UpdateFrequencyMixin:
@@ -45,6 +45,45 @@ class UpdateFrequencyMixin:
         self.number_of_available_updates = 0
         self.rate_limit_object = rate_limit_object
 
+    @property
+    def initial_rate(self):
+        return self._initial_rate
+
+    @initial_rate.setter
+    def initial_rate(self, initial_rate):
+        self._initial_rate = self._to_slot_series(initial_rate)
+
+    @property
+    def final_rate(self):
+        return self._final_rate
+
+    @final_rate.setter
+    def final_rate(self, final_rate):
+        self._final_rate = self._to_slot_series(final_rate)
+
+    @property
+    def energy_rate_change_per_update(self):
+        return self._energy_rate_change_per_update
+
+    @energy_rate_change_per_update.setter
+    def energy_rate_change_per_update(self, energy_rate_change_per_update):
+        self._energy_rate_change_per_update = \
+            self._to_slot_series(energy_rate_change_per_update)
+
+    @property
+    def update_counter(self):
+        return self._update_counter
+
+    @update_counter.setter
+    def update_counter(self, update_counter):
+        self._update_counter = self._to_slot_series(update_counter)
+
+    @staticmethod
+    def _to_slot_series(profile):
+        if profile is None or isinstance(profile, SlotSeries):
+            return profile
+        return SlotSeries(profile)
+
     def reassign_mixin_arguments(self, time_slot, initial_rate=None, final_rate=None,
                                  fit_to_limit=None, energy_rate_change_per_update=None,
                                  update_interval=None):
@@ -63,8 +102,8 @@ class UpdateFrequencyMixin:
         self.update_on_activate()
 
     def _set_or_update_energy_rate_change_per_update(self):
-        energy_rate_change_per_update = {}
-        for slot in generate_market_slot_list():
+        energy_rate_change_per_update = SlotSeries()
+        for slot in market_time_axis():
             if self.fit_to_limit:
                 energy_rate_change_per_update[slot] = \
                     (self.initial_rate[slot] - self.final_rate[slot]) / \
@@ -121,13 +160,16 @@ class UpdateFrequencyMixin:
                self.update_interval.seconds * (self.update_counter[time_slot])
 
     def update_energy_price(self, market, strategy):
-        if market.id not in strategy.offers.open.values():
+        if market is None:
+            return
+        open_offers = strategy.offers.open_in_market(market.id)
+        if not open_offers:
+            return
+        iterated_market = strategy.area.get_future_market_from_id(market.id)
+        if iterated_market is None or iterated_market.id != market.id:
             return
 
-        for offer, iterated_market_id in strategy.offers.open.items():
-            iterated_market = strategy.area.get_future_market_from_id(iterated_market_id)
-            if market is None or iterated_market is None or iterated_market.id != market.id:
-                continue
+        for offer in open_offers:
             try:
                 iterated_market.delete_offer(offer.id)
                 updated_price = round(offer.energy * self.get_updated_rate(market.time_slot), 10)
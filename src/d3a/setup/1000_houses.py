@@ -26,6 +26,10 @@ from d3a.models.strategy.load_hours import LoadHoursStrategy
 
 
 def get_setup(config):
+    return houses_setup(config, house_count=999)
+
+
+def houses_setup(config, house_count):
     area = Area(
         'Grid',
         [*[Area('House ' + str(i), [
@@ -39,7 +43,7 @@ def get_setup(config):
             Area(f'H{i} Storage',
                  strategy=StorageStrategy(initial_soc=50),
                  appliance=SimpleAppliance())
-        ]) for i in range(1, 1000)],
+        ]) for i in range(1, house_count + 1)],
          Area('Commercial Energy Producer',
               strategy=CommercialStrategy(energy_rate=30),
               appliance=SimpleAppliance()
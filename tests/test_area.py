@@ -130,6 +130,25 @@ class TestAreaClass(unittest.TestCase):
         self.area._markets.rotate_markets(current_time, self.stats, self.dispatcher)
         assert len(self.area.past_markets) == 2
 
+    def test_indexed_future_markets_follow_market_rotation(self):
+        self.area = Area(name="Street", children=[Area(name="House")],
+                         config=GlobalConfig, grid_fee_percentage=5)
+        self.area.config.market_count = 2
+        self.area.activate()
+        self.area._bc = None
+
+        self.area.cycle_markets(False, False, False)
+        first_market = self.area.next_market
+        assert self.area.get_future_market_from_id(first_market.id) is first_market
+
+        current_time = today(tz=TIME_ZONE).add(hours=1)
+        assert self.area._markets.rotate_markets(current_time, self.stats, self.dispatcher)
+        self.area._markets.create_future_markets(current_time, True, self.area)
+        assert self.area.get_future_market_from_id(first_market.id) is None
+        assert self.area._markets.indexed_future_markets == \
+            {m.id: m for m in self.area._markets.markets.values()}
+        assert not self.area._markets.rotate_markets(current_time, self.stats, self.dispatcher)
+
     def test_market_with_most_expensive_offer(self):
         m1 = MagicMock(spec=Market)
         m1.in_sim_duration = True
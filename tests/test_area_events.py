@@ -0,0 +1,62 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from unittest.mock import MagicMock
+
+from pendulum import datetime
+
+from d3a.models.area.events import Events
+from d3a.models.area.event_types import DisableAreaEvent, EnableAreaEvent, \
+    DisconnectIntervalAreaEvent, StrategyEvents
+
+
+def _at(hour, minute=0, day=1):
+    return datetime(2020, 1, day, hour, minute)
+
+
+def test_isolated_events_are_applied_in_time_order():
+    events = Events([EnableAreaEvent(10), DisableAreaEvent(6), DisableAreaEvent(14)],
+                    MagicMock())
+    expected_enabled = {0: True, 6: False, 9: False, 10: True, 13: True, 14: False, 23: False}
+    for hour, enabled in expected_enabled.items():
+        events.update_events(_at(hour))
+        assert events.is_enabled is enabled
+    events.update_events(_at(0, day=2))
+    assert events.is_enabled is True
+
+
+def test_interval_events_depend_on_the_hour_of_the_day():
+    events = Events([DisconnectIntervalAreaEvent(2, 4)], MagicMock())
+    for hour, connected in [(1, True), (2, False), (3, False), (4, True)]:
+        events.update_events(_at(hour, 45))
+        assert events.is_connected is connected
+
+
+def test_strategy_events_are_triggered_once_per_hour():
+    area = MagicMock()
+    events = Events([StrategyEvents(12, {'avg_power_W': 400})], area)
+    for minute in range(0, 60, 15):
+        events.update_events(_at(11, minute))
+        events.update_events(_at(12, minute))
+    events.update_events(_at(12, day=2))
+    area.strategy.area_reconfigure_event.assert_called_once_with(avg_power_W=400)
+
+
+def test_areas_without_events_are_not_updated():
+    events = Events([], MagicMock())
+    events.update_events(None)
+    assert events.is_enabled and events.is_connected
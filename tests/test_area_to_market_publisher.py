@@ -1,6 +1,7 @@
 import unittest
 from unittest.mock import MagicMock
 import json
+import d3a.constants
 from d3a_interface.constants_limits import ConstSettings
 from d3a.d3a_core.exceptions import D3ARedisException
 from d3a.models.market.one_sided import OneSidedMarket
@@ -64,3 +65,15 @@ class TestAreaToMarketPublisher(unittest.TestCase):
     def test_publish_market_clearing_waits_until_response_received(self):
         self.publisher.publish_markets_clearing()
         assert self.publisher.redis.poll_until_response_received.call_count == 2
+
+    def test_pipelined_market_clearing_publishes_once_and_waits_for_all_markets(self):
+        d3a.constants.REDIS_PIPELINED_DISPATCH = True
+        try:
+            self.publisher.publish_markets_clearing()
+        finally:
+            d3a.constants.REDIS_PIPELINED_DISPATCH = False
+        self.publisher.redis.publish.assert_not_called()
+        messages = self.publisher.redis.publish_pipelined.call_args[0][0]
+        assert [channel for channel, _ in messages] == ["id1/CLEAR", "id2/CLEAR"]
+        assert all("transaction_uuid" in json.loads(data) for _, data in messages)
+        assert self.publisher.redis.poll_until_response_received.call_count == 1
@@ -24,3 +24,12 @@ def test_offer_id_stringified():
 
     assert isinstance(bid.id, str)
     assert "<object object at" in bid.id
+
+
+def test_bid_interns_buyer_and_seller_names():
+    bids = [Bid(i, pendulum.now(), 10, 20, ''.join(['IAA ', 'House']), ''.join(['IAA ', 'Grid']))
+            for i in range(2)]
+
+    assert bids[0].buyer is bids[1].buyer
+    assert bids[0].seller is bids[1].seller
+    assert not hasattr(bids[0], '__dict__')
@@ -0,0 +1,45 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import csv
+from collections import namedtuple
+from pendulum import datetime, duration
+
+from d3a.d3a_core.export_writer import CSVExportWriter, ExportedMarkets
+
+FakeMarket = namedtuple("FakeMarket", ("time_slot",))
+MARKETS = [FakeMarket(datetime(2019, 1, 1) + duration(hours=i)) for i in range(4)]
+
+
+def test_exported_markets_returns_every_market_once():
+    exported_markets = ExportedMarkets()
+    assert exported_markets.new_markets("grid.csv", MARKETS[:2]) == MARKETS[:2]
+    assert exported_markets.new_markets("grid.csv", MARKETS[:2]) == []
+    assert exported_markets.new_markets("grid.csv", MARKETS[1:]) == MARKETS[2:]
+    assert exported_markets.new_markets("grid-trades.csv", MARKETS[-1:]) == MARKETS[-1:]
+
+
+def test_csv_export_writer_appends_rows_in_order(tmpdir):
+    file_path = str(tmpdir.join("grid-offers.csv"))
+    writer = CSVExportWriter()
+    writer.append(file_path, [(1, "a")], labels=("slot", "id"))
+    writer.append(file_path, [])
+    writer.append(file_path, [(2, "b"), (3, "c")])
+    writer.flush()
+    with open(file_path) as csv_file:
+        assert list(csv.reader(csv_file)) == [["slot", "id"], ["1", "a"], ["2", "b"],
+                                              ["3", "c"]]
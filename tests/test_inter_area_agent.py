@@ -24,7 +24,9 @@ from d3a.constants import TIME_FORMAT
 from d3a.constants import TIME_ZONE
 from d3a.models.area import DEFAULT_CONFIG
 from d3a.models.market.market_structures import Offer, Trade, Bid
+from d3a.models.market.order_book import OrderBook
 from d3a.models.strategy.area_agents.one_sided_agent import OneSidedAgent
+from d3a.models.strategy.area_agents.one_sided_engine import PendingOrders
 from d3a.models.strategy.area_agents.two_sided_pay_as_bid_agent import TwoSidedPayAsBidAgent
 from d3a.models.strategy.area_agents.two_sided_pay_as_bid_engine import BidInfo
 from d3a_interface.constants_limits import ConstSettings
@@ -275,6 +277,39 @@ def test_iaa_forwards_offers(iaa):
     assert iaa.higher_market.offer_call_count == 1
 
 
+def test_pending_orders_are_due_after_min_age_in_age_order():
+    offers = OrderBook({'id1': Offer('id1', pendulum.now(), 1, 1, 'other')})
+    ages = {}
+    pending = PendingOrders(ages, min_age=2)
+    assert pending.due(offers, 0) == []
+    offers['id2'] = Offer('id2', pendulum.now(), 1, 1, 'other')
+    assert pending.due(offers, 1) == []
+    assert ages == {'id1': 0, 'id2': 1}
+    assert pending.due(offers, 2) == ['id1']
+    assert pending.due(offers, 3) == ['id1', 'id2']
+    pending.discard('id1')
+    ages.pop('id2')
+    assert pending.due(offers, 4) == ['id2']
+    pending.discard('id2')
+    assert pending.due(offers, 5) == []
+
+
+def test_iaa_forwards_offers_added_to_the_order_book_after_min_offer_age(iaa):
+    engine = next(e for e in iaa.engines if e.markets.source is iaa.lower_market)
+    iaa.lower_market.offers = OrderBook(iaa.lower_market.offers)
+    iaa.owner.current_tick = 15
+    iaa.event_tick()
+    assert iaa.higher_market.offer_call_count == 1
+
+    iaa.lower_market.offers['id4'] = Offer('id4', pendulum.now(), 1, 1, 'other', 1)
+    iaa.event_tick()
+    assert engine.offer_age['id4'] == 15
+    iaa.owner.current_tick = 15 + engine.min_offer_age
+    iaa.event_tick()
+    assert 'id4' in engine.forwarded_offers
+    assert iaa.higher_market.offer_call_count == 2
+
+
 def test_iaa_forwarded_offers_complied_to_transfer_fee(iaa_grid_fee):
     source_offer = [o for o in iaa_grid_fee.lower_market.sorted_offers if o.id == "id"][0]
     target_offer = [o for o in iaa_grid_fee.higher_market.sorted_offers if o.id == "uuid"][0]
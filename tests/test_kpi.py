@@ -0,0 +1,53 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from math import isclose
+
+from d3a.d3a_core.sim_results.kpi import KPIState
+
+
+def _device(name, strategy):
+    return {'name': name, 'uuid': name, 'parent_uuid': 'House 1', 'type': strategy,
+            'children': []}
+
+
+def _trade(seller, buyer, energy):
+    return {'seller': seller, 'seller_origin': seller, 'buyer': buyer, 'buyer_origin': buyer,
+            'energy': energy}
+
+
+AREA_DICT = {'name': 'Grid', 'uuid': 'Grid', 'type': 'Area', 'children': [
+    {'name': 'House 1', 'uuid': 'House 1', 'parent_uuid': 'Grid', 'type': 'Area',
+     'children': [_device('PV', 'PVStrategy'), _device('Load', 'LoadHoursStrategy'),
+                  _device('Storage', 'StorageStrategy')]},
+    _device('Infinite Bus', 'InfiniteBusStrategy')]}
+
+
+def test_kpi_state_accounts_trades_by_device_role():
+    state = KPIState()
+    state.accumulate_devices(AREA_DICT)
+    core_stats = {
+        'Load': {'total_energy_demanded_wh': 3000},
+        'House 1': {'trades': [_trade('PV', 'Load', 1), _trade('PV', 'Storage', 1),
+                               _trade('Storage', 'Load', 0.5), _trade('Storage', 'IAA House 1', 1),
+                               _trade('Load', 'PV', 1), _trade('PV', 'Infinite Bus', 0.2)]}}
+    state.update_area_kpi(AREA_DICT, core_stats)
+    assert isclose(state.total_energy_demanded_wh, 3000)
+    assert isclose(state.total_energy_produced_wh, 2200)
+    assert isclose(state.total_self_consumption_wh, 1700)
+    assert isclose(state.demanded_buffer_wh, 200)
+    assert isclose(state.self_consumption_buffer_wh, 0)
@@ -0,0 +1,112 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from math import isclose, sqrt
+from unittest.mock import MagicMock
+
+from pendulum import duration, datetime
+
+from d3a.models.power_flow.linear import LinearPowerFlow, LINE_LENGTH_KM, \
+    LINE_RESISTANCE_OHM_PER_KM, LINE_MAX_CURRENT_KA
+from d3a.models.strategy.infinite_bus import InfiniteBusStrategy
+from d3a.models.strategy.load_hours import LoadHoursStrategy
+from d3a.models.strategy.pv import PVStrategy
+
+TIME_SLOT = datetime(2020, 1, 1, 12)
+
+
+class FakeMarket:
+    def __init__(self, trades):
+        self.time_slot = TIME_SLOT
+        self.trades = [MagicMock(seller=seller, buyer=buyer, offer=MagicMock(energy=energy))
+                       for seller, buyer, energy in trades]
+
+
+class FakeArea:
+    def __init__(self, name, children=None, strategy=None, trades=()):
+        self.name = name
+        self.children = children or []
+        self.strategy = strategy
+        self.parent = None
+        self.config = MagicMock(slot_length=duration(minutes=15))
+        self.current_market = FakeMarket(trades)
+        for child in self.children:
+            child.parent = self
+
+    def get_past_market(self, time_slot):
+        if time_slot != self.current_market.time_slot:
+            raise KeyError(time_slot)
+        return self.current_market
+
+
+def _device(name, strategy_class):
+    strategy = MagicMock(spec=strategy_class)
+    strategy.avg_power_W = 100
+    strategy.max_panel_power_W = 250
+    return FakeArea(name, strategy=strategy)
+
+
+def _grid():
+    house1 = FakeArea('House 1', [_device('H1 Load', LoadHoursStrategy),
+                                  _device('H1 PV', PVStrategy)],
+                      trades=[('H1 PV', 'H1 Load', 0.4), ('IAA House 1', 'H1 Load', 0.6),
+                              ('H1 PV', 'IAA House 1', 0.1)])
+    house2 = FakeArea('House 2', [_device('H2 Load', LoadHoursStrategy)],
+                      trades=[('IAA House 2', 'H2 Load', 0.5)])
+    street = FakeArea('Street', [house2])
+    return FakeArea('Grid', [house1, street, _device('DSO', InfiniteBusStrategy)])
+
+
+def _loading_percent(power_kW):
+    return power_kW / (sqrt(3) * 400) / LINE_MAX_CURRENT_KA * 100
+
+
+def _voltage_drop_pu(power_kW):
+    return LINE_RESISTANCE_OHM_PER_KM * LINE_LENGTH_KM * power_kW * 1000 / 400 ** 2
+
+
+def test_line_loadings_and_bus_voltages_follow_the_traded_energy():
+    power_flow = LinearPowerFlow(_grid())
+    power_flow.run_power_flow()
+    assert power_flow.bus_names == ['Grid', 'House 1', 'Street', 'House 2']
+    assert power_flow.line_names == ['Grid->House 1', 'Grid->Street', 'Street->House 2']
+    # 15 minute slots: House 1 consumes 0.5 kWh (2 kW), House 2 0.5 kWh (2 kW)
+    loading = dict(zip(power_flow.line_names, power_flow.line_loading_percent[TIME_SLOT]))
+    for line_name in power_flow.line_names:
+        assert isclose(loading[line_name], _loading_percent(2))
+    voltage = dict(zip(power_flow.bus_names, power_flow.bus_voltage_pu[TIME_SLOT]))
+    assert isclose(voltage['Grid'], 1)
+    assert isclose(voltage['House 1'], 1 - _voltage_drop_pu(2))
+    assert isclose(voltage['Street'], 1 - _voltage_drop_pu(2))
+    assert isclose(voltage['House 2'], 1 - 2 * _voltage_drop_pu(2))
+
+
+def test_power_flow_is_solved_once_per_market_slot():
+    power_flow = LinearPowerFlow(_grid())
+    power_flow.run_power_flow()
+    power_flow.run_power_flow()
+    assert list(power_flow.bus_voltage_pu.keys()) == [TIME_SLOT]
+
+
+def test_export_writes_time_series(tmpdir):
+    power_flow = LinearPowerFlow(_grid())
+    power_flow.run_power_flow()
+    power_flow.export_power_flow_results(str(tmpdir))
+    with open(tmpdir.join('power_flow_bus_voltage.csv')) as csv_file:
+        lines = csv_file.read().splitlines()
+    assert lines[0] == 'slot,Grid,House 1,Street,House 2'
+    assert len(lines) == 2
@@ -61,7 +61,8 @@ class TestLiveEvents(unittest.TestCase):
         }
 
         self.live_events.add_event(event_dict)
-        self.live_events.handle_all_events(self.area_grid)
+        assert self.live_events.handle_all_events(self.area_grid) is True
+        assert self.live_events.handle_all_events(self.area_grid) is False
 
         new_load = [c for c in self.area_house1.children if c.name == "new_load"][0]
         assert type(new_load.strategy) == LoadHoursStrategy
@@ -16,12 +16,13 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 import string
+import random
 from math import isclose
 from copy import deepcopy
 import pytest
 from pendulum import DateTime, now
 
-from d3a.constants import TIME_ZONE
+from d3a.constants import TIME_ZONE, FLOATING_POINT_TOLERANCE
 from d3a.events.event_structures import MarketEvent
 
 from hypothesis import strategies as st
@@ -543,6 +544,69 @@ def test_market_most_affordable_offers(market, offer):
     assert {o.price for o in market.most_affordable_offers} == {1, 10, 20, 20000}
 
 
+def test_market_order_book_follows_offer_changes(market=OneSidedMarket(time_slot=now())):
+    o1 = market.offer(5, 1, 'A', 'A')
+    o2 = market.offer(3, 1, 'A', 'A')
+    market.offer(4, 1, 'A', 'A')
+    assert market.cheapest_offer == o2
+    market.delete_offer(o2)
+    assert [o.price for o in market.sorted_offers] == [4, 5]
+    trade = market.accept_offer(o1, 'B', energy=0.5)
+    assert [o.energy_rate for o in market.sorted_offers] == [4, 5]
+    assert market.cheapest_offer.price == 4
+    assert market.sorted_offers[-1].id == trade.residual.id
+    assert market.sorted_offers == market.sorting(dict(market.offers))
+
+
+def test_market_order_book_follows_bid_changes(market=TwoSidedPayAsBid(time_slot=now())):
+    b1 = market.bid(5, 1, 'A', 'B', 'A')
+    b2 = market.bid(7, 1, 'A', 'B', 'A')
+    b3 = market.bid(7, 1, 'A', 'B', 'A')
+    market.bid(6, 1, 'A', 'B', 'A')
+    # Equal rates keep the same order as sorting the plain dict
+    assert market.sorting(market.bids, True) == market.sorting(dict(market.bids), True)
+    assert market.most_expensive_bid == b3
+    market.delete_bid(b3)
+    assert market.most_expensive_bid == b2
+    trade_offer_info = TradeBidOfferInfo(7, 7, 7, 7, 7)
+    trade = market.accept_bid(b2, energy=0.5, seller='B', trade_offer_info=trade_offer_info)
+    assert [b.energy_rate for b in market.sorting(market.bids)] == [5, 6, 7]
+    assert market.most_expensive_bid.id == trade.residual.id
+    market.delete_bid(trade.residual)
+    market.delete_bid(b1)
+    assert [b.price for b in market.sorting(market.bids)] == [6]
+
+
+def test_market_order_book_replaced_with_dict(market=OneSidedMarket(time_slot=now())):
+    market.offers = {"offer1": Offer('id1', now(), 3, 1, 'A'),
+                     "offer2": Offer('id2', now(), 1, 1, 'A')}
+    assert market.cheapest_offer.id == 'id2'
+    assert [o.id for o in market.sorted_offers] == ['id2', 'id1']
+
+
+def test_market_trade_book_indexes_trades_by_participant(market=OneSidedMarket(time_slot=now())):
+    trade1 = market.accept_offer(market.offer(10, 20, 'A', 'A'), 'B')
+    trade2 = market.accept_offer(market.offer(6, 2, 'C', 'C'), 'B')
+    trade3 = market.accept_offer(market.offer(4, 1, 'B', 'B'), 'A')
+
+    assert market.trades.trades_of('A') == [trade1, trade3]
+    assert market.trades.trades_of('B') == [trade1, trade2, trade3]
+    assert market.trades.trades_of('D') == []
+    assert market.bought_energy('B') == 22
+    assert market.sold_energy('B') == 1
+    assert market.total_spent('B') == 16
+    assert market.total_earned('A') == 10
+
+
+def test_market_trade_book_replaced_with_list(market=OneSidedMarket(time_slot=now())):
+    offer = Offer('id', now(), 2, 1, 'A')
+    market.trades = [Trade('trade', now(), offer, 'A', 'B')]
+    assert market.bought_energy('B') == 1
+    assert market.total_earned('A') == 2
+    del market.trades[0]
+    assert market.bought_energy('B') == 0
+
+
 @pytest.mark.parametrize("market, offer", [
     (OneSidedMarket, "offer"),
     (BalancingMarket, "balancing_offer")
@@ -678,7 +742,7 @@ def pac_market():
     # ([2, 3, 6, 7, 7, 7, 7], [7, 5, 5, 2, 2, 2, 2], 5, 2),
     # ([2, 2, 4, 4, 4, 4, 6], [6, 6, 6, 6, 2, 2, 2], 4, 4),
 ])
-@pytest.mark.parametrize("algorithm", [1])
+@pytest.mark.parametrize("algorithm", [1, 3])
 def test_double_sided_market_performs_pay_as_clear_matching(pac_market, offer, bid, mcp_rate,
                                                             mcp_energy, algorithm):
     ConstSettings.IAASettings.PAY_AS_CLEAR_AGGREGATION_ALGORITHM = algorithm
@@ -718,6 +782,29 @@ def test_double_sided_pay_as_clear_market_works_with_floats(pac_market):
     assert matched == 2.2
 
 
+@pytest.mark.parametrize("algorithm, vectorized_algorithm", [(1, 3), (2, 4)])
+@pytest.mark.parametrize("seed", range(5))
+def test_vectorized_pay_as_clear_matching_equals_python_implementation(
+        pac_market, algorithm, vectorized_algorithm, seed):
+    random.seed(seed)
+    for index in range(20):
+        energy = random.uniform(0.1, 5)
+        pac_market.offers[f"offer{index}"] = \
+            Offer(f"id{index}", now(), random.uniform(0, 40) * energy, energy, 'other')
+        energy = random.uniform(0.1, 5)
+        pac_market.bids[f"bid{index}"] = \
+            Bid(f"bid_id{index}", now(), random.uniform(0, 40) * energy, energy, 'B', 'S')
+
+    ConstSettings.IAASettings.PAY_AS_CLEAR_AGGREGATION_ALGORITHM = algorithm
+    clearing_rate, clearing_energy = pac_market._perform_pay_as_clear_matching()
+    ConstSettings.IAASettings.PAY_AS_CLEAR_AGGREGATION_ALGORITHM = vectorized_algorithm
+    vectorized_rate, vectorized_energy = pac_market._perform_pay_as_clear_matching()
+    ConstSettings.IAASettings.PAY_AS_CLEAR_AGGREGATION_ALGORITHM = 1
+
+    assert vectorized_rate == clearing_rate
+    assert isclose(vectorized_energy, clearing_energy)
+
+
 @pytest.yield_fixture
 def pab_market():
     return FakeTwoSidedPayAsBid()
@@ -749,6 +836,56 @@ def test_double_sided_pay_as_bid_market_match_offer_bids(pab_market):
     assert bid.price == source_bid.price
 
 
+class NestedScanPayAsBid(TwoSidedPayAsBid):
+    """Reference pay as bid market, that compares every offer with every bid"""
+
+    def _perform_pay_as_bid_matching(self):
+        sorted_bids = self.sorting(dict(self.bids), True)
+        sorted_offers = self.sorting(dict(self.offers), True)
+
+        already_selected_bids = set()
+        offer_bid_pairs = []
+        for offer in sorted_offers:
+            for bid in sorted_bids:
+                if bid.id not in already_selected_bids and \
+                        (offer.energy_rate - bid.energy_rate) <= \
+                        FLOATING_POINT_TOLERANCE and offer.seller != bid.buyer:
+                    already_selected_bids.add(bid.id)
+                    offer_bid_pairs.append(tuple((bid, offer)))
+                    break
+        return offer_bid_pairs
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_pay_as_bid_matching_trades_equal_nested_scan_matching(seed):
+    random.seed(seed)
+    orders = [(random.choice(("offer", "bid")), random.randint(1, 10),
+               random.randint(1, 5), random.choice(('A', 'B', 'C', 'D')))
+              for _ in range(40)]
+    markets = [TwoSidedPayAsBid(time_slot=now()), NestedScanPayAsBid(time_slot=now())]
+    for market in markets:
+        for index, (order_type, rate, energy, participant) in enumerate(orders):
+            if order_type == "offer":
+                market.offer(rate * energy, energy, participant, participant,
+                             offer_id=f"offer{index}")
+            else:
+                market.bid(rate * energy, energy, participant, 'seller', participant,
+                           bid_id=f"bid{index}")
+        market.match_offers_bids()
+
+    trades, reference_trades = (
+        [(t.seller, t.buyer, t.offer.energy, t.offer.energy_rate) for t in market.trades]
+        for market in markets
+    )
+    assert len(reference_trades) > 0
+    assert trades == reference_trades
+    remaining_bids, reference_remaining_bids = (
+        [(b.buyer, b.energy, b.energy_rate) for b in market.bids.values()]
+        for market in markets
+    )
+    assert remaining_bids == reference_remaining_bids
+
+
 class MarketStateMachine(RuleBasedStateMachine):
     offers = Bundle('Offers')
     actors = Bundle('Actors')
@@ -4,17 +4,17 @@ from unittest.mock import MagicMock
 import json
 from time import sleep
 from pendulum import now
-from deepdiff import DeepDiff
 from d3a.events import MarketEvent
 from d3a_interface.constants_limits import ConstSettings
 from d3a.models.market.market_structures import Offer, Trade, Bid
+from d3a.models.market.market_serialization import decode_payload
 from d3a.models.market.market_redis_connection import MarketRedisEventPublisher, \
     MarketRedisEventSubscriber, TwoSidedMarketRedisEventSubscriber
 import d3a.models.market.market_redis_connection
 from d3a.models.market.one_sided import OneSidedMarket
 
 d3a.models.market.market_redis_connection.BlockingCommunicator = MagicMock
-d3a.models.market.market_redis_connection.ResettableCommunicator = MagicMock
+d3a.models.market.market_redis_connection.MultiplexedCommunicator = MagicMock
 
 
 class TestMarketRedisEventPublisher(unittest.TestCase):
@@ -51,13 +51,12 @@ class TestMarketRedisEventPublisher(unittest.TestCase):
             self.publisher.response_callback
         )
 
-        expected_result = {k: v.to_JSON_string() for k, v in kwargs.items()}
         self.publisher.redis.publish.assert_called_once()
         assert self.publisher.redis.publish.call_args_list[0][0][0] == \
             "market/test_id/notify_event"
-        publish_call_args = json.loads(self.publisher.redis.publish.call_args_list[0][0][1])
+        publish_call_args = decode_payload(self.publisher.redis.publish.call_args_list[0][0][1])
         assert publish_call_args["event_type"] == MarketEvent.OFFER.value
-        assert len(DeepDiff(publish_call_args["kwargs"], expected_result)) == 0
+        assert publish_call_args["kwargs"] == kwargs
 
     def test_wait_for_event_response_calls_poll_method(self):
         self.publisher.event_response_uuids = ["test_uuid"]
@@ -143,11 +142,12 @@ class TestMarketRedisEventSubscriber(unittest.TestCase):
         self.subscriber.market.accept_offer.assert_called_once_with(
             offer_or_id=offer, buyer="mykonos", energy=12
         )
-        self.subscriber.redis_db.publish.assert_called_once_with(
-            "id/ACCEPT_OFFER/RESPONSE", json.dumps({
-                "status": "ready", "trade": trade.to_JSON_string(), "transaction_uuid": "trans_id"
-            })
-        )
+        self.subscriber.redis_db.publish.assert_called_once()
+        channel, response = self.subscriber.redis_db.publish.call_args[0]
+        assert channel == "id/ACCEPT_OFFER/RESPONSE"
+        assert decode_payload(response) == {
+            "status": "ready", "trade": trade, "transaction_uuid": "trans_id"
+        }
 
     def test_offer_calls_market_method_and_publishes_response(self):
 
@@ -165,11 +165,12 @@ class TestMarketRedisEventSubscriber(unittest.TestCase):
         self.subscriber.market.offer.assert_called_once_with(
             seller="mykonos", energy=12, price=32
         )
-        self.subscriber.redis_db.publish.assert_called_once_with(
-            "id/OFFER/RESPONSE", json.dumps({
-                "status": "ready", "offer": offer.to_JSON_string(), "transaction_uuid": "trans_id"
-            })
-        )
+        self.subscriber.redis_db.publish.assert_called_once()
+        channel, response = self.subscriber.redis_db.publish.call_args[0]
+        assert channel == "id/OFFER/RESPONSE"
+        assert decode_payload(response) == {
+            "status": "ready", "offer": offer, "transaction_uuid": "trans_id"
+        }
 
     def test_delete_offer_calls_market_method_and_publishes_response(self):
         offer = Offer("o_id", now(), 32, 12, "o_seller")
@@ -228,11 +229,12 @@ class TestTwoSidedMarketRedisEventSubscriber(unittest.TestCase):
         self.market.accept_bid = MagicMock(return_value=trade)
         self.subscriber._accept_bid(payload)
         self.subscriber.market.accept_bid.assert_called_once()
-        self.subscriber.redis_db.publish.assert_called_once_with(
-            "id/ACCEPT_BID/RESPONSE", json.dumps({
-                "status": "ready", "trade": trade.to_JSON_string(), "transaction_uuid": "trans_id"
-            })
-        )
+        self.subscriber.redis_db.publish.assert_called_once()
+        channel, response = self.subscriber.redis_db.publish.call_args[0]
+        assert channel == "id/ACCEPT_BID/RESPONSE"
+        assert decode_payload(response) == {
+            "status": "ready", "trade": trade, "transaction_uuid": "trans_id"
+        }
 
     def test_bid_calls_market_method_and_publishes_response(self):
         payload = {"data": json.dumps({
@@ -248,11 +250,12 @@ class TestTwoSidedMarketRedisEventSubscriber(unittest.TestCase):
         self.subscriber.market.bid.assert_called_once_with(
             buyer="mykonos", energy=12, price=32
         )
-        self.subscriber.redis_db.publish.assert_called_once_with(
-            "id/BID/RESPONSE", json.dumps({
-                "status": "ready", "bid": bid.to_JSON_string(), "transaction_uuid": "trans_id"
-            })
-        )
+        self.subscriber.redis_db.publish.assert_called_once()
+        channel, response = self.subscriber.redis_db.publish.call_args[0]
+        assert channel == "id/BID/RESPONSE"
+        assert decode_payload(response) == {
+            "status": "ready", "bid": bid, "transaction_uuid": "trans_id"
+        }
 
     def test_delete_bid_calls_market_method_and_publishes_response(self):
         bid = Bid("b_id", now(), 32, 12, "b_buyer", "b_seller")
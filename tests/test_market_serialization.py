@@ -0,0 +1,77 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import json
+import pytest
+from pendulum import now
+
+from d3a.d3a_core.exceptions import D3AException
+from d3a.events import MarketEvent
+from d3a.models.market.market_structures import Offer, BalancingOffer, Bid, Trade, \
+    TradeBidOfferInfo
+from d3a.models.market.market_serialization import encode_payload, decode_payload, \
+    parse_event_and_parameters_from_payload
+
+
+def _payload():
+    offer = Offer("offer_id", now(), 10, 2, "IAA House 1", 12, "PV")
+    bid = Bid("bid_id", now(), 9, 3, "Load", "IAA House 1", 8, "Load")
+    trade = Trade("trade_id", now(), offer, "IAA House 1", "Load",
+                  residual=Offer("residual_id", now(), 5, 1, "IAA House 1"),
+                  offer_bid_trade_info=TradeBidOfferInfo(1, 2, 3, 4, 5),
+                  seller_origin="PV", buyer_origin="Load", fee_price=0.5)
+    bid_trade = Trade("bid_trade_id", now(), bid, "IAA House 1", "Load")
+    return {"event_type": MarketEvent.TRADE.value,
+            "kwargs": {"offer": offer, "bid": bid, "trade": trade, "bid_trade": bid_trade,
+                       "balancing_offer": BalancingOffer("b_id", now(), 2, 1, "Storage"),
+                       "market_id": "market", "offers": [offer, offer]}}
+
+
+def test_encode_payload_round_trips_market_objects():
+    payload = _payload()
+    decoded = decode_payload(encode_payload(payload, "json"))
+    assert decoded == payload
+    assert decoded["kwargs"]["offer"].real_id == "offer_id"
+    assert decoded["kwargs"]["offer"].time == payload["kwargs"]["offer"].time
+    assert isinstance(decoded["kwargs"]["balancing_offer"], BalancingOffer)
+    assert isinstance(decoded["kwargs"]["bid_trade"].offer, Bid)
+
+
+def test_encode_payload_does_not_nest_json_strings():
+    encoded = json.loads(encode_payload(_payload(), "json"))
+    assert isinstance(encoded["kwargs"]["trade"]["offer"], dict)
+    assert isinstance(encoded["kwargs"]["trade"]["offer_bid_trade_info"], dict)
+
+
+def test_decode_payload_accepts_plain_json_bytes():
+    assert decode_payload(b'{"status": "ready", "transaction_uuid": "uuid"}') == \
+        {"status": "ready", "transaction_uuid": "uuid"}
+
+
+def test_msgpack_payloads_round_trip_and_are_detected():
+    pytest.importorskip("msgpack")
+    payload = _payload()
+    encoded = encode_payload(payload, "msgpack")
+    assert isinstance(encoded, bytes)
+    event_type, kwargs = parse_event_and_parameters_from_payload({"data": encoded})
+    assert event_type == MarketEvent.TRADE
+    assert kwargs == payload["kwargs"]
+
+
+def test_encode_payload_raises_for_unknown_wire_format():
+    with pytest.raises(D3AException):
+        encode_payload({}, "xml")
@@ -0,0 +1,86 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import gc
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from d3a import constants
+from d3a.d3a_core.memory_telemetry import MemoryTelemetry, configure_garbage_collection, \
+    restore_garbage_collection
+
+
+def test_memory_is_sampled_every_sample_interval_slots():
+    telemetry = MemoryTelemetry(sample_interval_slots=4, background_interval_s=0)
+    telemetry.sample = MagicMock()
+    for slot_no in range(10):
+        telemetry.slot_started(slot_no)
+    assert telemetry.sample.call_count == 3
+
+
+def test_memory_sampling_per_slot_can_be_disabled():
+    telemetry = MemoryTelemetry(sample_interval_slots=0, background_interval_s=0)
+    telemetry.sample = MagicMock()
+    for slot_no in range(10):
+        telemetry.slot_started(slot_no)
+    telemetry.start()
+    assert telemetry.sample.call_count == 0
+    assert telemetry._thread is None
+
+
+def test_memory_is_sampled_in_background_thread_until_stopped():
+    telemetry = MemoryTelemetry(sample_interval_slots=0, background_interval_s=0.01)
+    telemetry.start()
+    time.sleep(0.1)
+    telemetry.stop()
+    assert telemetry._thread is None
+    assert telemetry.last_sample_mb > 0
+    assert telemetry.peak_sample_mb >= telemetry.last_sample_mb
+
+
+def test_garbage_collection_uses_the_configured_thresholds():
+    thresholds = gc.get_threshold()
+    configure_garbage_collection()
+    assert gc.get_threshold() == constants.GC_THRESHOLDS
+    if hasattr(gc, "freeze"):
+        assert gc.get_freeze_count() == 0
+    restore_garbage_collection()
+    assert gc.get_threshold() == thresholds
+
+
+@patch.object(constants, "GC_THRESHOLDS", None)
+def test_garbage_collection_is_not_changed_without_thresholds():
+    thresholds = gc.get_threshold()
+    configure_garbage_collection()
+    assert gc.get_threshold() == thresholds
+    restore_garbage_collection()
+    assert gc.get_threshold() == thresholds
+
+
+@pytest.mark.skipif(not hasattr(gc, "freeze"), reason="gc.freeze requires Python >= 3.7")
+@patch.object(constants, "GC_THRESHOLDS", (50000, 20, 100))
+@patch.object(constants, "GC_FREEZE_SETUP_OBJECTS", True)
+def test_garbage_collection_is_restored_when_the_simulation_finishes():
+    thresholds = gc.get_threshold()
+    configure_garbage_collection()
+    assert gc.get_threshold() == (50000, 20, 100)
+    assert gc.get_freeze_count() > 0
+    restore_garbage_collection()
+    assert gc.get_threshold() == thresholds
+    assert gc.get_freeze_count() == 0
@@ -26,3 +26,20 @@ def test_offer_id_stringified(offer):
 
     assert isinstance(offer.id, str)
     assert "<object object at" in offer.id
+
+
+@pytest.mark.parametrize("offer", [Offer, BalancingOffer])
+def test_offer_has_no_instance_dict(offer):
+    offer = offer('id', pendulum.now(), 10, 20, 'A')
+
+    assert not hasattr(offer, '__dict__')
+    with pytest.raises(AttributeError):
+        offer.unknown_attribute = 1
+
+
+def test_offer_interns_seller_names():
+    offers = [Offer(i, pendulum.now(), 10, 20, ''.join(['IAA ', 'House']), seller_origin='PV')
+              for i in range(2)]
+
+    assert offers[0].seller is offers[1].seller
+    assert offers[0].seller_origin is offers[1].seller_origin
@@ -0,0 +1,64 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import json
+import os
+from unittest.mock import patch
+
+import plotly.graph_objs as go
+
+from d3a.d3a_core.sim_results import plot_renderer
+from d3a.d3a_core.sim_results.plot_renderer import PlotRenderer
+
+
+def _figure(y):
+    return go.Figure(data=[go.Bar(x=[1, 2], y=y)])
+
+
+def test_plots_are_rendered_to_html_by_the_process_pool(tmpdir):
+    renderer = PlotRenderer(processes=2, data_only=False)
+    output_files = [str(tmpdir.join(f"plot_{i}.html")) for i in range(3)]
+    for i, output_file in enumerate(output_files):
+        renderer.submit(_figure([i, i]), output_file)
+    assert not any(os.path.isfile(output_file) for output_file in output_files)
+    renderer.render_pending()
+    for output_file in output_files:
+        with open(output_file) as html_file:
+            assert "<html>" in html_file.read()
+
+
+def test_data_only_mode_writes_figure_json(tmpdir):
+    renderer = PlotRenderer(processes=0, data_only=True)
+    renderer.submit(_figure([1, 2]), str(tmpdir.join("plot.html")))
+    renderer.render_pending()
+    assert tmpdir.listdir() == [tmpdir.join("plot.json")]
+    with open(str(tmpdir.join("plot.json"))) as json_file:
+        assert json.load(json_file)["data"][0]["y"] == [1, 2]
+
+
+def test_unchanged_plots_are_not_written_again(tmpdir):
+    renderer = PlotRenderer(processes=0, data_only=True)
+    output_file = str(tmpdir.join("plot.html"))
+    renderer.submit(_figure([1, 2]), output_file)
+    renderer.render_pending()
+    with patch.object(plot_renderer, "_write_plot") as write_plot:
+        renderer.submit(_figure([1, 2]), output_file)
+        renderer.render_pending()
+        write_plot.assert_not_called()
+        renderer.submit(_figure([1, 3]), output_file)
+        renderer.render_pending()
+        write_plot.assert_called_once()
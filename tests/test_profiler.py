@@ -0,0 +1,64 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import csv
+import json
+import os
+from unittest.mock import MagicMock
+
+from d3a.d3a_core.profiler import SimulationProfiler
+
+
+def test_profiler_does_not_record_phases_if_disabled():
+    profiler = SimulationProfiler()
+    with profiler.phase("tick"):
+        pass
+    assert profiler.phases == {}
+
+
+def test_profiler_accumulates_phase_calls_and_time():
+    profiler = SimulationProfiler()
+    profiler.enabled = True
+    for _ in range(3):
+        with profiler.phase("tick"):
+            pass
+    with profiler.phase("market_cycle"):
+        pass
+    assert profiler.phases["tick"][0] == 3
+    assert profiler.phases["market_cycle"][0] == 1
+    assert all(total_time >= 0 for _, total_time in profiler.phases.values())
+
+
+def test_profiler_writes_phase_and_market_reports(tmpdir):
+    profiler = SimulationProfiler()
+    profiler.enabled = True
+    with profiler.phase("tick"):
+        pass
+    market = MagicMock(time_slot_str="2020-10-15T00:00", offer_history=[1, 2], bid_history=[3],
+                       trades=[])
+    house = MagicMock(children=[], all_markets=[market])
+    house.name = "House 1"
+    profiler.count_market_orders(house)
+    profiler.write_report(str(tmpdir))
+
+    with open(os.path.join(str(tmpdir), "profile.json")) as json_file:
+        report = json.load(json_file)
+    assert [phase["phase"] for phase in report["phases"]] == ["tick"]
+    assert report["markets"] == [{"area": "House 1", "time_slot": "2020-10-15T00:00",
+                                  "offers": 2, "bids": 1, "trades": 0}]
+    with open(os.path.join(str(tmpdir), "profile_markets.csv")) as csv_file:
+        assert list(csv.DictReader(csv_file))[0]["offers"] == "2"
@@ -0,0 +1,68 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import os
+import pytest
+from pendulum import duration
+
+from d3a import constants
+from d3a.d3a_core.util import d3a_path
+from d3a.models import read_user_profile
+from d3a.models.read_user_profile import read_arbitrary_profile, read_profile_array, \
+    InputProfileTypes
+from d3a_interface.constants_limits import GlobalConfig
+
+PROFILE_PATH = os.path.join(d3a_path, "resources", "Solar_Curve_W_sunny.csv")
+
+
+@pytest.fixture(autouse=True)
+def clear_profile_caches():
+    read_user_profile._profile_source_cache.clear()
+    read_user_profile._slot_values_cache.clear()
+    slot_length = GlobalConfig.slot_length
+    GlobalConfig.slot_length = duration(minutes=15)
+    yield
+    GlobalConfig.slot_length = slot_length
+    constants.PROFILE_CACHE_DIR = None
+
+
+def test_cached_profiles_are_returned_as_independent_dicts():
+    profile = read_arbitrary_profile(InputProfileTypes.POWER, PROFILE_PATH)
+    first_slot = next(iter(profile))
+    profile[first_slot] = -1
+    cached_profile = read_arbitrary_profile(InputProfileTypes.POWER, PROFILE_PATH)
+    assert cached_profile is not profile
+    assert cached_profile[first_slot] != -1
+    assert len(read_user_profile._profile_source_cache) == 1
+
+
+def test_profile_array_is_indexed_by_slot():
+    profile = read_arbitrary_profile(InputProfileTypes.POWER, PROFILE_PATH)
+    profile_array = read_profile_array(InputProfileTypes.POWER, PROFILE_PATH)
+    assert list(profile_array.time_slots) == list(profile.keys())
+    assert profile_array.values.tolist() == list(profile.values())
+    with pytest.raises(ValueError):
+        profile_array.values[0] = 1
+
+
+def test_parsed_csv_profiles_are_cached_on_disk(tmpdir):
+    constants.PROFILE_CACHE_DIR = str(tmpdir)
+    profile = read_arbitrary_profile(InputProfileTypes.POWER, PROFILE_PATH)
+    assert len(tmpdir.listdir()) == 1
+    read_user_profile._profile_source_cache.clear()
+    read_user_profile._slot_values_cache.clear()
+    assert read_arbitrary_profile(InputProfileTypes.POWER, PROFILE_PATH) == profile
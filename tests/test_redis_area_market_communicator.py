@@ -0,0 +1,166 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import unittest
+from unittest.mock import MagicMock, patch
+
+from d3a.d3a_core.redis_connections import redis_area_market_communicator
+from d3a.d3a_core.redis_connections.redis_area_market_communicator import \
+    RedisChannelMultiplexer, BlockingCommunicator, MultiplexedCommunicator
+
+
+class TestRedisChannelMultiplexer(unittest.TestCase):
+
+    def setUp(self):
+        self.redis_db = MagicMock()
+        self.redis_db.pubsub.side_effect = lambda: MagicMock()
+        self.shared_redis_db_patch = patch.object(
+            redis_area_market_communicator, "shared_redis_db", return_value=self.redis_db)
+        self.shared_redis_db_patch.start()
+        self.multiplexer = RedisChannelMultiplexer(listener_count=2)
+        self.channels = {f"market/{i}/notify_event": MagicMock() for i in range(10)}
+
+    def tearDown(self):
+        self.shared_redis_db_patch.stop()
+
+    def test_channels_are_routed_to_a_fixed_number_of_listeners(self):
+        self.multiplexer.subscribe(self.channels)
+        self.multiplexer.subscribe({"market/10/notify_event": MagicMock()})
+        assert self.redis_db.pubsub.call_count == 2
+        subscribed_channels = []
+        for pubsub in self.multiplexer._pubsubs.values():
+            pubsub.run_in_thread.assert_called_once()
+            for call in pubsub.subscribe.call_args_list:
+                subscribed_channels.extend(call[1].keys())
+        assert sorted(subscribed_channels) == \
+            sorted(list(self.channels) + ["market/10/notify_event"])
+
+    def test_unsubscribe_is_sent_to_the_listener_of_the_channel(self):
+        self.multiplexer.subscribe(self.channels)
+        self.multiplexer.unsubscribe(
+            [("market/3/notify_event", self.channels["market/3/notify_event"])])
+        index = self.multiplexer._listener_index("market/3/notify_event")
+        self.multiplexer._pubsubs[index].unsubscribe.assert_called_once_with(
+            "market/3/notify_event")
+
+    def _deliver(self, channel, payload):
+        pubsub = self.multiplexer._pubsubs[self.multiplexer._listener_index(channel)]
+        pubsub.subscribe.call_args_list[0][1][channel](payload)
+
+    def test_communicators_on_the_same_channel_receive_all_messages(self):
+        first_callback, second_callback = MagicMock(), MagicMock()
+        with patch.object(redis_area_market_communicator, "channel_multiplexer",
+                          return_value=self.multiplexer):
+            first, second = MultiplexedCommunicator(), MultiplexedCommunicator()
+            first.sub_to_channel("market/1/OFFER/RESPONSE", first_callback)
+            second.sub_to_channel("market/1/OFFER/RESPONSE", second_callback)
+            index = self.multiplexer._listener_index("market/1/OFFER/RESPONSE")
+            self.multiplexer._pubsubs[index].subscribe.assert_called_once()
+
+            self._deliver("market/1/OFFER/RESPONSE", {"data": "first"})
+            first_callback.assert_called_once_with({"data": "first"})
+            second_callback.assert_called_once_with({"data": "first"})
+
+            first.terminate_connection()
+            self.multiplexer._pubsubs[index].unsubscribe.assert_not_called()
+            self._deliver("market/1/OFFER/RESPONSE", {"data": "second"})
+            first_callback.assert_called_once()
+            second_callback.assert_called_with({"data": "second"})
+
+            second.terminate_connection()
+            self.multiplexer._pubsubs[index].unsubscribe.assert_called_once_with(
+                "market/1/OFFER/RESPONSE")
+
+    def test_unsubscribe_market_removes_the_channels_of_all_subscribers(self):
+        with patch.object(redis_area_market_communicator, "channel_multiplexer",
+                          return_value=self.multiplexer):
+            first, second = BlockingCommunicator(), BlockingCommunicator()
+            for communicator in (first, second):
+                communicator.sub_to_channel("market1/OFFER/RESPONSE", MagicMock())
+                communicator.sub_to_channel("market1/BID/RESPONSE", MagicMock())
+                communicator.sub_to_channel("market2/OFFER/RESPONSE", MagicMock())
+
+            self.multiplexer.unsubscribe_market("market1")
+            assert set(self.multiplexer._channel_callbacks) == {"market2/OFFER/RESPONSE"}
+            assert set(self.multiplexer._prefix_channels) == {"market2"}
+            unsubscribed_channels = []
+            for pubsub in self.multiplexer._pubsubs.values():
+                for call in pubsub.unsubscribe.call_args_list:
+                    unsubscribed_channels.extend(call[0])
+            assert sorted(unsubscribed_channels) == \
+                ["market1/BID/RESPONSE", "market1/OFFER/RESPONSE"]
+
+            first.sub_to_channel("market3/OFFER/RESPONSE", MagicMock())
+            assert first.subscribed_channels == \
+                {"market2/OFFER/RESPONSE", "market3/OFFER/RESPONSE"}
+            assert len(first._subscriptions) == 2
+
+    def test_callback_exceptions_do_not_stop_the_listener(self):
+        callback = MagicMock(side_effect=ValueError)
+        self.multiplexer.subscribe({"market/1/notify_event": callback})
+        pubsub = next(iter(self.multiplexer._pubsubs.values()))
+        guarded_callback = pubsub.subscribe.call_args[1]["market/1/notify_event"]
+        guarded_callback({"channel": "market/1/notify_event", "data": "{}"})
+        callback.assert_called_once()
+
+    def test_stop_closes_listeners(self):
+        self.multiplexer.subscribe(self.channels)
+        pubsubs = list(self.multiplexer._pubsubs.values())
+        self.multiplexer.stop()
+        for pubsub in pubsubs:
+            pubsub.run_in_thread.return_value.stop.assert_called_once()
+            pubsub.close.assert_called_once()
+        assert self.multiplexer._pubsubs == {}
+
+
+class TestBlockingCommunicator(unittest.TestCase):
+
+    def setUp(self):
+        self.multiplexer = MagicMock(spec=RedisChannelMultiplexer)
+        self.patches = [
+            patch.object(redis_area_market_communicator, "shared_redis_db"),
+            patch.object(redis_area_market_communicator, "channel_multiplexer",
+                         return_value=self.multiplexer)]
+        for p in self.patches:
+            p.start()
+        self.communicator = BlockingCommunicator()
+        self.responses = []
+        self.communicator.sub_to_channel("id/OFFER/RESPONSE", self.responses.append)
+        self.callback = self.multiplexer.subscribe.call_args[0][0]["id/OFFER/RESPONSE"]
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+
+    def test_subscribes_only_once_per_channel(self):
+        self.communicator.sub_to_channel("id/OFFER/RESPONSE", self.responses.append)
+        self.multiplexer.subscribe.assert_called_once()
+
+    def test_poll_returns_when_response_was_delivered(self):
+        self.callback({"data": "response"})
+        self.communicator.poll_until_response_received(lambda: len(self.responses) == 1)
+        assert self.responses == [{"data": "response"}]
+
+    def test_callback_exception_is_raised_in_the_waiting_thread(self):
+        def failing_callback(payload):
+            raise ValueError("error response")
+        self.communicator.sub_to_channel("id/ACCEPT_OFFER/RESPONSE", failing_callback)
+        callback = self.multiplexer.subscribe.call_args[0][0]["id/ACCEPT_OFFER/RESPONSE"]
+        callback({"data": "response"})
+        with self.assertRaises(ValueError):
+            self.communicator.poll_until_response_received(lambda: False)
+        assert self.communicator.callback_exception is None
@@ -23,6 +23,7 @@ from unittest.mock import MagicMock
 from threading import Event
 from pendulum import now
 
+import d3a.constants
 import d3a.models.area
 from d3a.models.area import Area
 from d3a.models.appliance.simple import SimpleAppliance
@@ -32,8 +33,8 @@ from d3a_interface.constants_limits import ConstSettings, GlobalConfig
 from d3a.models.area.event_dispatcher import RedisAreaDispatcher, AreaDispatcher
 from d3a.d3a_core.redis_connections.redis_area_market_communicator import RedisCommunicator
 from d3a.events.event_structures import AreaEvent, MarketEvent
-from d3a.models.market.market_structures import Offer, Trade, offer_from_JSON_string, \
-    trade_from_JSON_string, TradeBidOfferInfo
+from d3a.models.market.market_structures import Offer, Trade, TradeBidOfferInfo
+from d3a.models.market.market_serialization import decode_payload
 
 log = getLogger(__name__)
 
@@ -127,6 +128,27 @@ class TestRedisEventDispatching(unittest.TestCase):
         self.area.dispatcher.area_event_dispatcher.response_callback(payload)
         mock_redis.resume.assert_called()
 
+    def test_pipelined_broadcast_waits_for_the_responses_of_all_children(self):
+        area_event_dispatcher = self.area.dispatcher.area_event_dispatcher
+
+        def respond_to_messages(messages):
+            for channel, send_data in messages:
+                transaction_uuid = json.loads(send_data)["transaction_uuid"]
+                area_event_dispatcher.response_callback({"data": json.dumps(
+                    {"response": "tick", "transaction_uuid": transaction_uuid})})
+
+        mock_redis.publish_pipelined.side_effect = respond_to_messages
+        d3a.constants.REDIS_PIPELINED_DISPATCH = True
+        try:
+            self.area.dispatcher.broadcast_callback(AreaEvent.TICK)
+        finally:
+            d3a.constants.REDIS_PIPELINED_DISPATCH = False
+            mock_redis.publish_pipelined.side_effect = None
+        messages = mock_redis.publish_pipelined.call_args[0][0]
+        assert {channel for channel, _ in messages} == \
+            {f"{child.uuid}/area_event" for child in self.area.children}
+        assert len(area_event_dispatcher.pending_responses) == 0
+
 
 class TestRedisMarketEventDispatcher(unittest.TestCase):
 
@@ -258,6 +280,33 @@ class TestRedisMarketEventDispatcher(unittest.TestCase):
             dispatcher.wait_for_futures()
             dispatcher.redis.publish.assert_called_once()
 
+    def test_pipelined_broadcast_correlates_responses_by_transaction_id(self):
+        market_dispatcher = self.area.dispatcher.market_event_dispatcher
+        child_dispatchers = {child.uuid: child.dispatcher.market_event_dispatcher
+                             for child in self.area.children}
+
+        def respond_to_messages(messages):
+            for channel, send_data in messages:
+                child_dispatcher = child_dispatchers[channel.split("/")[0]]
+                child_dispatcher.root_dispatcher.event_listener = MagicMock()
+                child_dispatcher.event_listener_redis({"data": send_data})
+                child_dispatcher.wait_for_futures()
+                response_data = child_dispatcher.redis.publish.call_args[0][1]
+                market_dispatcher.response_callback({"data": response_data})
+
+        market_dispatcher.redis.publish_pipelined.side_effect = respond_to_messages
+        d3a.constants.REDIS_PIPELINED_DISPATCH = True
+        try:
+            self.area.dispatcher.broadcast_callback(MarketEvent.OFFER)
+        finally:
+            d3a.constants.REDIS_PIPELINED_DISPATCH = False
+        market_dispatcher.redis.publish_pipelined.assert_called_once()
+        market_dispatcher.redis.publish.assert_not_called()
+        for child_dispatcher in child_dispatchers.values():
+            child_dispatcher.root_dispatcher.event_listener.assert_called_once_with(
+                event_type=MarketEvent.OFFER)
+        assert len(market_dispatcher.pending_responses) == 0
+
     def test_publish_event_converts_python_objects_to_json(self):
         offer = Offer("1", now(), 2, 3, "A")
         trade = Trade("2", now(), Offer("accepted", now(), 7, 8, "Z"), "B", "C",
@@ -273,15 +322,6 @@ class TestRedisMarketEventDispatcher(unittest.TestCase):
                            self.device2.dispatcher.market_event_dispatcher]:
             dispatcher.publish_event(dispatcher.area.uuid, MarketEvent.OFFER, **kwargs)
             assert dispatcher.redis.publish.call_count == 1
-            payload = json.loads(dispatcher.redis.publish.call_args_list[0][0][1])
-            assert isinstance(payload["kwargs"]["offer"], str)
-            assert offer_from_JSON_string(payload["kwargs"]["offer"], offer.time) == offer
-            assert isinstance(payload["kwargs"]["trade"], str)
-            assert trade_from_JSON_string(payload["kwargs"]["trade"], trade.time) == trade
-            assert isinstance(payload["kwargs"]["new_offer"], str)
-            assert offer_from_JSON_string(payload["kwargs"]["new_offer"],
-                                          new_offer.time) == new_offer
-            assert isinstance(payload["kwargs"]["existing_offer"], str)
-            assert offer_from_JSON_string(payload["kwargs"]["existing_offer"],
-                                          existing_offer.time) == \
-                existing_offer
+            payload = decode_payload(dispatcher.redis.publish.call_args_list[0][0][1])
+            assert payload["event_type"] == MarketEvent.OFFER.value
+            assert payload["kwargs"] == kwargs
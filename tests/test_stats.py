@@ -22,7 +22,10 @@ from pendulum import today, now
 from uuid import uuid4
 
 from d3a.models.market.market_structures import Trade
+from d3a.d3a_core.sim_results import trades_by_participant
 from d3a.d3a_core.sim_results.bills import MarketEnergyBills
+from d3a.d3a_core.sim_results.cumulative_grid_trades import CumulativeGridTrades
+from d3a.d3a_core.sim_results.device_statistics import DeviceStatistics
 from d3a.d3a_core.sim_results.endpoint_buffer import SimulationEndpointBuffer
 from d3a.d3a_core.util import make_iaa_name
 from d3a import constants
@@ -189,6 +192,38 @@ def test_energy_bills_last_past_market(grid):
     assert 'children' not in result
 
 
+def test_energy_bills_and_grid_trades_update_only_traded_areas(grid):
+    epb = SimulationEndpointBuffer("1", {"seed": 0}, grid, True)
+    full_bills, delta_bills = MarketEnergyBills(), MarketEnergyBills()
+    full_trades, delta_trades = CumulativeGridTrades(), CumulativeGridTrades()
+
+    def update_slot():
+        epb.traded_area_uuids = []
+        epb.current_market_time_slot_str = grid.current_market.time_slot_str
+        epb._populate_core_stats_and_sim_state(grid)
+        for results in (full_bills, full_trades):
+            results.update(epb.area_result_dict, epb.flattened_area_core_stats_dict)
+        for results in (delta_bills, delta_trades):
+            results.update(epb.area_result_dict, epb.flattened_area_core_stats_dict,
+                           epb.traded_area_uuids)
+
+    update_slot()
+    grid.children[0].past_markets = [FakeMarket((_trade(2, 'fridge', 2, 'pv'),
+                                                 _trade(3, 'fridge', 1, 'iaa')), 'house1',
+                                                fees=1.0)]
+    grid.children[1].past_markets = [FakeMarket((), 'house2')]
+    grid.past_markets = [FakeMarket((), 'grid')]
+    update_slot()
+
+    assert epb.traded_area_uuids == [grid.children[0].uuid]
+    assert delta_bills.bills_results == full_bills.bills_results
+    assert delta_bills.bills_redis_results == full_bills.bills_redis_results
+    assert delta_bills.market_fees == full_bills.market_fees
+    assert delta_trades.current_trades == full_trades.current_trades
+    assert delta_trades.accumulated_trades == full_trades.accumulated_trades
+    assert delta_bills.bills_results['fridge']['bought'] == 5
+
+
 @pytest.fixture
 def grid2():
     house1 = FakeArea('house1')
@@ -301,3 +336,29 @@ def test_energy_bills_report_correctly_market_fees(grid_fees):
     assert result["street"]['Accumulated Trades']["market_fee"] == 0.05
     assert result["house1"]['External Trades']["market_fee"] == 0.0
     assert result["house2"]['External Trades']["market_fee"] == 0.0
+
+
+def test_trades_by_participant_indexes_sellers_and_buyers_in_trade_order():
+    trades = [{'seller': 'pv', 'buyer': 'fridge'},
+              {'seller': 'IAA house', 'buyer': 'fridge'},
+              {'seller': 'pv', 'buyer': 'pv'}]
+    index = trades_by_participant(trades)
+    assert index['fridge'] == trades[:2]
+    assert index['pv'] == [trades[0], trades[2]]
+    assert index['IAA house'] == [trades[1]]
+
+
+def test_device_statistics_keep_min_max_of_previous_slots():
+    device_stats = DeviceStatistics(should_export_plots=True)
+    area_dict = {'name': 'house', 'uuid': 'house', 'type': 'Area', 'children': [
+        {'name': 'fridge', 'uuid': 'fridge', 'type': 'LoadHoursStrategy', 'children': []}]}
+    for slot, rates in (("slot1", (10, 30)), ("slot2", (20, ))):
+        core_stats = {'house': {}, 'fridge': {
+            'trades': [{'seller': 'pv', 'buyer': 'fridge', 'energy': 1, 'energy_rate': rate}
+                       for rate in rates],
+            'load_profile_kWh': 1}}
+        device_stats.update(area_dict, core_stats, slot)
+    fridge_stats = device_stats.device_stats_dict['fridge']
+    assert fridge_stats['min_trade_price_eur'] == {"slot1": 0.1, "slot2": 0.2}
+    assert fridge_stats['max_trade_price_eur'] == {"slot1": 0.3, "slot2": 0.2}
+    assert fridge_stats['max_trade_energy_kWh'] == {"slot1": 2, "slot2": 1}
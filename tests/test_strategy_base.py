@@ -175,6 +175,35 @@ def test_offers_partial_offer(offer1, offers3):
     assert accepted_offer in offers3.sold_in_market('market')
 
 
+def test_offers_are_indexed_by_market_and_id(offer1, offers3):
+    assert offers3.posted_offer_energy('market') == 4
+    assert offers3.posted_offer_energy('market2') == 1
+    assert offers3.is_offer_posted('market', 'id2')
+    assert not offers3.is_offer_posted('market2', 'id2')
+
+    offers3.sold_offer(offer1, 'market')
+    assert [o.id for o in offers3.open_in_market('market')] == ['id2']
+    assert offers3.open_offer_energy('market') == 1
+    assert offers3.sold_offer_energy('market') == 3
+    assert offers3.get_sold_offer_ids_in_market('market') == ['id']
+
+    offers3.remove_offer_by_id('market2', 'id3')
+    assert offers3.posted_in_market('market2') == []
+    assert offers3.posted_offer_energy('market2') == 0
+    assert list(offers3.open.values()) == ['market']
+
+
+def test_offers_reindexes_assigned_posted_and_sold(offer1):
+    offers = Offers(FakeStrategy())
+    offers.posted = {offer1: 'market'}
+    offers.sold['market'] = [offer1]
+    assert offers.posted_in_market('market') == [offer1]
+    assert offers.open_in_market('market') == []
+    offers.posted = {}
+    assert offers.posted_in_market('market') == []
+    assert offers.posted_offer_energy('market') == 0
+
+
 @pytest.fixture
 def offer_to_accept():
     return Offer('new', pendulum.now(), 1.0, 0.5, 'someone')
@@ -10,7 +10,7 @@ from d3a.models.strategy.external_strategy import ExternalStrategy
 import d3a.models.market.market_redis_connection
 
 d3a.models.market.market_redis_connection.BlockingCommunicator = MagicMock
-d3a.models.market.market_redis_connection.ResettableCommunicator = MagicMock
+d3a.models.market.market_redis_connection.MultiplexedCommunicator = MagicMock
 
 
 class TestExternalStrategy(unittest.TestCase):
@@ -140,6 +140,10 @@ class FakeMarket:
         ]
         return offers[self.count]
 
+    @property
+    def cheapest_offer(self):
+        return self.sorted_offers[0]
+
     @property
     def time_slot(self):
         return DateTime.now(tz=TIME_ZONE).start_of('day')
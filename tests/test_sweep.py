@@ -0,0 +1,83 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import json
+import pytest
+
+from d3a.d3a_core.sweep import expand_sweep, read_finished_run_ids, \
+    validate_sweep_parameter, _advanced_settings_from_parameters
+from d3a_interface.exceptions import D3AException
+
+
+def test_expand_sweep_runs_every_parameter_combination_with_every_seed():
+    sweep = {"parameters": {"slot_length": ["15m", "30m"],
+                            "IAASettings.MARKET_TYPE": [1, 2, 3]},
+             "seeds": [0, 1]}
+    runs = expand_sweep(sweep)
+    assert len(runs) == 12
+    assert len({run["run_id"] for run in runs}) == 12
+    assert {"parameters": {"IAASettings.MARKET_TYPE": 2, "slot_length": "30m"}, "seed": 1} in \
+        [{"parameters": run["parameters"], "seed": run["seed"]} for run in runs]
+    # Run ids do not depend on the order of the parameters
+    sweep["parameters"] = dict(reversed(list(sweep["parameters"].items())))
+    assert [run["run_id"] for run in expand_sweep(sweep)] == [run["run_id"] for run in runs]
+
+
+def test_expand_sweep_defaults_to_one_seed():
+    assert [run["seed"] for run in expand_sweep({"parameters": {"market_count": [1, 2]}})] == \
+        [0, 0]
+
+
+def test_run_ids_change_with_the_setup_and_the_fixed_settings():
+    sweep = {"parameters": {"market_count": [1, 2]}, "basic_settings": {"sim_duration": "1d"}}
+    run_ids = [run["run_id"] for run in expand_sweep(sweep, "default_2a")]
+    assert [run["run_id"] for run in expand_sweep(sweep, "default_2a")] == run_ids
+    assert not set(run_ids) & {run["run_id"] for run in expand_sweep(sweep, "default_3")}
+    sweep["basic_settings"]["sim_duration"] = "2d"
+    assert not set(run_ids) & {run["run_id"] for run in expand_sweep(sweep, "default_2a")}
+    sweep["basic_settings"]["sim_duration"] = "1d"
+    sweep["advanced_settings"] = {"IAASettings": {"MARKET_TYPE": 2}}
+    assert not set(run_ids) & {run["run_id"] for run in expand_sweep(sweep, "default_2a")}
+
+
+def test_read_finished_run_ids_skips_failed_and_incomplete_runs(tmpdir):
+    results_file = tmpdir.join("results.jsonl")
+    results_file.write(json.dumps({"run_id": "a", "status": "finished"}) + "\n" +
+                       json.dumps({"run_id": "b", "status": "failed"}) + "\n" +
+                       '{"run_id": "c", "sta')
+    assert read_finished_run_ids(str(results_file)) == {"a"}
+    assert read_finished_run_ids(str(tmpdir.join("missing.jsonl"))) == set()
+
+
+def test_swept_const_settings_are_converted_to_advanced_settings():
+    assert _advanced_settings_from_parameters({
+        "slot_length": "15m",
+        "IAASettings.MARKET_TYPE": 2,
+        "IAASettings.AlternativePricing.PRICING_SCHEME": 1,
+    }) == {"IAASettings": {"MARKET_TYPE": 2, "AlternativePricing": {"PRICING_SCHEME": 1}}}
+
+
+@pytest.mark.parametrize("name", ["slot_length", "IAASettings.MARKET_TYPE",
+                                  "IAASettings.AlternativePricing.PRICING_SCHEME"])
+def test_validate_sweep_parameter_accepts_settings(name):
+    validate_sweep_parameter(name)
+
+
+@pytest.mark.parametrize("name", ["slot_lenght", "IAASettings.MARKET_TYP", "Unknown.VALUE"])
+def test_validate_sweep_parameter_rejects_unknown_settings(name):
+    with pytest.raises(D3AException):
+        validate_sweep_parameter(name)
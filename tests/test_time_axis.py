@@ -0,0 +1,88 @@
+"""
+Copyright 2018 Grid Singularity
+This file is part of D3A.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import pickle
+import pytest
+from pendulum import datetime, duration
+
+from d3a.d3a_core.time_axis import TimeAxis, SlotSeries, market_time_axis
+
+START = datetime(2019, 1, 1)
+SLOTS = [START + duration(minutes=15 * i) for i in range(4)]
+
+
+class FakeConfig:
+    def __init__(self, market_slot_list):
+        self.market_slot_list = market_slot_list
+
+
+class FakeArea:
+    def __init__(self, market_slot_list):
+        self.config = FakeConfig(market_slot_list)
+
+
+@pytest.fixture
+def time_axis():
+    return TimeAxis(SLOTS)
+
+
+def test_time_axis_maps_slots_to_positions(time_axis):
+    assert len(time_axis) == 4
+    assert list(time_axis) == SLOTS
+    assert time_axis.position(SLOTS[2]) == 2
+    assert time_axis.position(datetime(2019, 1, 1, 0, 30)) == 2
+    assert time_axis.position(START - duration(minutes=15)) is None
+
+
+def test_market_time_axis_is_shared_until_slot_list_changes():
+    area = FakeArea(SLOTS)
+    time_axis = market_time_axis(area)
+    assert market_time_axis(area) is time_axis
+    area.config.market_slot_list = SLOTS[:2]
+    assert len(market_time_axis(area)) == 2
+
+
+def test_slot_series_behaves_like_a_dict(time_axis):
+    series = SlotSeries.full(0., time_axis)
+    expected = {slot: 0. for slot in SLOTS}
+    assert series == expected
+    series[SLOTS[1]] += 1.5
+    expected[SLOTS[1]] += 1.5
+    outside_slot = START + duration(days=1)
+    series[outside_slot] = 3.
+    expected[outside_slot] = 3.
+    del series[SLOTS[0]]
+    del expected[SLOTS[0]]
+    assert series == expected
+    assert list(series.items()) == list(expected.items())
+    assert list(series.values()) == list(expected.values())
+    assert len(series) == 4
+    assert SLOTS[0] not in series and outside_slot in series
+    assert series.get(SLOTS[0], -1) == -1
+    with pytest.raises(KeyError):
+        series[SLOTS[0]]
+    assert pickle.loads(pickle.dumps(series)) == expected
+
+
+def test_slot_series_keeps_values_of_other_types(time_axis):
+    series = SlotSeries({SLOTS[0]: 1, SLOTS[1]: 2}, time_axis)
+    assert series[SLOTS[1]] == 2 and isinstance(series[SLOTS[1]], int)
+    series[SLOTS[2]] = '-'
+    assert series == {SLOTS[0]: 1, SLOTS[1]: 2, SLOTS[2]: '-'}
+    series_copy = series.copy()
+    series_copy[SLOTS[0]] = 5
+    assert series[SLOTS[0]] == 1